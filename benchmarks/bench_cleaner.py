@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# مقارنة CacheCleaner بـ find -delete على شجرة اصطناعية (افتراضياً مليون ملف)
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flashboost_cleaner import CacheCleaner, CachePolicies, format_bytes
+
+
+def build_tree(root, files, per_dir, fanout):
+    # مجلدات متداخلة بعمق 3 بحد أقصى per_dir ملف في كل مجلد
+    created = 0; index = 0
+    while created < files:
+        a, b, c = index // (fanout * fanout), (index // fanout) % fanout, index % fanout
+        directory = os.path.join(root, f"app{a}", f"d{b}", f"d{c}")
+        os.makedirs(directory, exist_ok=True)
+        for i in range(min(per_dir, files - created)):
+            with open(os.path.join(directory, f"f{i}"), "wb") as f: f.write(b"x" * 64)
+        created += per_dir; index += 1
+
+
+def timed(label, fn):
+    start = time.perf_counter(); result = fn(); elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f} s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CacheCleaner vs. find -delete on a synthetic tree")
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--per-dir", type=int, default=500)
+    parser.add_argument("--fanout", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dir", default=None, help="parent directory for the synthetic tree")
+    args = parser.parse_args()
+
+    parent = tempfile.mkdtemp(prefix="flashboost-bench-", dir=args.dir)
+    root = os.path.join(parent, "cache")
+    try:
+        timed(f"build tree ({args.files} files)", lambda: build_tree(root, args.files, args.per_dir, args.fanout))
+        report = timed("CacheCleaner dry-run", lambda: CacheCleaner(root, CachePolicies(), args.workers, dry_run=True).run())
+        print(f"  would reclaim {report.files} files, {format_bytes(report.bytes)}")
+        timed("find -mindepth 1 -delete", lambda: subprocess.run(["find", root, "-mindepth", "1", "-delete"], check=True))
+        build_tree(root, args.files, args.per_dir, args.fanout)
+        report = timed("CacheCleaner delete", lambda: CacheCleaner(root, CachePolicies(), args.workers).run())
+        print(f"  reclaimed {report.files} files, {format_bytes(report.bytes)}, {report.dirs_removed} dirs")
+    finally:
+        shutil.rmtree(parent, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
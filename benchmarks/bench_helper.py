@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# زمن تنفيذ عملية (دفعة sysctl) عبر المساعد الدائم مقارنة بإنشاء shell جديد لكل عملية كما في مسار pkexec
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flashboost_helper import PrivilegedHelper
+
+KEYS = {"vm.swappiness": "10", "vm.vfs_cache_pressure": "50", "net.core.netdev_max_backlog": "50000", "net.ipv4.tcp_sack": "1"}
+
+
+def make_fake_root(root):
+    for key, value in KEYS.items():
+        path = os.path.join(root, "proc", "sys", *key.split("."))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f: f.write("0\n")
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter(); fn(); samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(name, samples):
+    ms = [s * 1000 for s in samples]
+    print(f"{name:<34} median {statistics.median(ms):8.3f} ms   p95 {sorted(ms)[int(len(ms) * 0.95) - 1]:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Action latency: persistent helper vs. per-action shell spawn")
+    parser.add_argument("-n", "--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        make_fake_root(root)
+        ops = [{"op": "write_sysctl", "key": k, "value": v} for k, v in KEYS.items()]
+        helper = PrivilegedHelper(socket_path=os.path.join(root, "helper.sock"), launcher=(), root=root)
+        start = time.perf_counter(); helper.ensure_started()
+        print(f"helper startup (once per session)  {(time.perf_counter() - start) * 1000:8.3f} ms")
+        report("helper batch (4 sysctl writes)", timed(lambda: helper.call(ops), args.repeat))
+        helper.close()
+
+        # مسار pkexec بدون نافذة المصادقة: shell جديد وعملية منفصلة لكل مفتاح
+        script = " && ".join(f"echo {v} > {os.path.join(root, 'proc', 'sys', *k.split('.'))}" for k, v in KEYS.items())
+        report("sh -c spawn per action", timed(lambda: subprocess.run(["sh", "-c", script], check=True), args.repeat))
+        print("note: the real pkexec path additionally pays a polkit round-trip per action")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# مقارنة كلفة العينة الواحدة بين psutil والقارئ المباشر لـ /proc
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flashboost_procfs import ProcReader
+
+
+def report(name, seconds, number):
+    print(f"{name:<28} {seconds / number * 1e6:9.2f} us/sample")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-sample cost: psutil vs. direct /proc readers")
+    parser.add_argument("-n", "--number", type=int, default=20000)
+    parser.add_argument("--proc-root", default="/proc", help="procfs root (e.g. a fixture tree)")
+    parser.add_argument("--disk-path", default="/")
+    args = parser.parse_args()
+
+    reader = ProcReader(args.proc_root)
+    reader.cpu_percent()
+    procfs_sample = lambda: (reader.cpu_percent(), reader.ram_percent(), reader.disk_percent(args.disk_path))
+    report("procfs (cpu+ram+disk)", timeit.timeit(procfs_sample, number=args.number), args.number)
+    report("procfs cpu", timeit.timeit(reader.cpu_percent, number=args.number), args.number)
+    report("procfs ram", timeit.timeit(reader.ram_percent, number=args.number), args.number)
+    reader.close()
+
+    if args.proc_root != "/proc":
+        print("psutil: skipped (it always reads the live /proc)")
+        return
+    try:
+        import psutil
+    except ImportError:
+        print("psutil: not installed, skipped")
+        return
+    psutil.cpu_percent(interval=None)
+    psutil_sample = lambda: (psutil.cpu_percent(interval=None), psutil.virtual_memory().percent, psutil.disk_usage(args.disk_path).percent)
+    report("psutil (cpu+ram+disk)", timeit.timeit(psutil_sample, number=args.number), args.number)
+    report("psutil cpu", timeit.timeit(lambda: psutil.cpu_percent(interval=None), number=args.number), args.number)
+    report("psutil ram", timeit.timeit(lambda: psutil.virtual_memory().percent, number=args.number), args.number)
+
+
+if __name__ == "__main__":
+    main()
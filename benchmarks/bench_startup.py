@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# زمن البدء للواجهتين: سطر الأوامر (status --json) والواجهة الرسومية حتى أول إطار
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "flashboost_cli.py")
+# يُنشئ النافذة ويخرج عند أول رسم؛ ضبط الأداء عند البدء معطل كي لا يُطلب pkexec
+GUI_FIRST_FRAME = f"""
+import os, sys
+sys.path.insert(0, {ROOT!r})
+import flashboost_app
+from gi.repository import Gtk
+flashboost_app.FlashBoostApp.optimize_performance = lambda self: False
+app = flashboost_app.FlashBoostApp()
+app.connect_after("draw", lambda *args: os._exit(0))
+app.show_all(); app.spinner.hide()
+Gtk.main()
+"""
+
+
+def measure(argv, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(argv, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0: return None, result.stderr.decode(errors="replace").strip().splitlines()[-1:]
+        times.append(elapsed)
+    return times, None
+
+
+def report(label, argv, runs):
+    times, error = measure(argv, runs)
+    if times is None: print(f"{label:<32} skipped: {' '.join(error) or 'failed'}"); return
+    print(f"{label:<32} min {min(times) * 1000:7.1f} ms   median {statistics.median(times) * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time of the CLI and GUI front ends")
+    parser.add_argument("-n", "--runs", type=int, default=20)
+    parser.add_argument("--no-gui", action="store_true", help="skip the GTK first-frame measurement")
+    args = parser.parse_args()
+
+    python = sys.executable
+    report("python -c pass (baseline)", [python, "-c", "pass"], args.runs)
+    report("import flashboost_core", [python, "-c", "import flashboost_core"], args.runs)
+    report("cli status --json", [python, CLI, "status", "--json", "--interval", "0"], args.runs)
+    report("cli list", [python, CLI, "list"], args.runs)
+    if args.no_gui: return
+    if not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+        print(f"{'gui first frame':<32} skipped: no display"); return
+    report("gui import", [python, "-c", "import flashboost_app"], args.runs)
+    report("gui first frame", [python, "-c", GUI_FIRST_FRAME], max(1, args.runs // 4))
+
+
+if __name__ == "__main__":
+    main()
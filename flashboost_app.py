@@ -1,112 +1,75 @@
 #!/usr/bin/env python3
 import gi
-import threading
 import os
-import subprocess
-import pygame
-import numpy as np
-from datetime import datetime
-import psutil
-import re
+import signal
+import threading
+import time
+from flashboost_core import FlashBoostCore
+from flashboost_sampler import MetricSampler
+from flashboost_sound import ToneBank
+from flashboost_log import LogPipeline
+from flashboost_jobs import QUEUED, RUNNING, DONE, FAILED, CANCELLED, SKIPPED
+from flashboost_trace import TRACER, now as trace_now, default_path as default_trace_path
 
 gi.require_version("Gtk", "3.0")
 from gi.repository import Gtk, GLib, Gdk
 
-class SystemInfo:
-    def get_cpu_usage(self):
-        try:
-            return psutil.cpu_percent(interval=None)
-        except Exception as e:
-            print(f"Error getting CPU usage: {e}")
-            return 0.0
-
-    def get_ram_usage(self):
-        try:
-            return psutil.virtual_memory().percent
-        except Exception as e:
-            print(f"Error getting RAM usage: {e}")
-            return 0.0
-
-    def get_disk_usage(self, path='/'):
-        try:
-            return psutil.disk_usage(path).percent
-        except FileNotFoundError:
-            print(f"Error getting disk usage: Path '{path}' not found.")
-            return 0.0
-        except Exception as e:
-            print(f"Error getting disk usage for '{path}': {e}")
-            return 0.0
-
-    def get_temperature(self):
-        temp_str = "N/A"
-        try:
-            temps = psutil.sensors_temperatures()
-            core_temps = temps.get('coretemp', []) or temps.get('k10temp', []) or temps.get('acpitz', [])
-            if core_temps:
-                package_temp = next((t.current for t in core_temps if 'Package' in t.label or 'Tdie' in t.label), None)
-                if package_temp:
-                    temp_str = f"{package_temp:.0f}°C"
-                else:
-                    temp_str = f"{core_temps[0].current:.0f}°C"
-            else:
-                for sensor_list in temps.values():
-                    if sensor_list:
-                        temp_str = f"{sensor_list[0].current:.0f}°C"; break
-        except AttributeError: pass
-        except Exception as e: print(f"Error getting temperature: {e}")
-        return temp_str
-
-    def find_active_wifi_interface(self):
-        try:
-            result = subprocess.run(['ip', '-o', 'link', 'show', 'up'], capture_output=True, text=True, check=True)
-            match = re.search(r'^\d+:\s+([a-zA-Z0-9]+(?:wl|wifi|wlan)[a-zA-Z0-9]*)\s+.*state UP', result.stdout, re.MULTILINE)
-            if match:
-                return match.group(1)
-            result_iw = subprocess.run(['iw', 'dev'], capture_output=True, text=True, check=True)
-            match_iw = re.search(r'^\s*Interface\s+([a-zA-Z0-9]+(?:wl|wifi|wlan)[a-zA-Z0-9]*)\s*$', result_iw.stdout, re.MULTILINE)
-            if match_iw:
-                 return match_iw.group(1)
-        except FileNotFoundError: print("Error: 'ip' or 'iw' command not found.")
-        except subprocess.CalledProcessError: print("No active WiFi interface found or error executing command.")
-        except Exception as e: print(f"Error finding WiFi interface: {e}")
-        return None
-
-    def check_command_exists(self, command):
-        try:
-            subprocess.run(['which', command], check=True, capture_output=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            return True
-        except (FileNotFoundError, subprocess.CalledProcessError):
-            return False
-
 class FlashBoostApp(Gtk.Window):
     def __init__(self):
         super().__init__(title="⚡ FlashBoost") # عنوان أبسط
         self.set_default_size(800, 620)
         self.set_border_width(0) # إزالة الهامش الرئيسي للنافذة للتحكم الكامل بالتخطيط
         self.connect("destroy", self.on_quit)
-
-        self.system_info = SystemInfo()
+        self.connect("window-state-event", self.on_window_state)
+
+        # العمليات والقياس في النواة (دون GTK)؛ هذه النافذة واجهة فوقها فقط
+        self.core = FlashBoostCore(log=self.log, play_sound=self.play_sound, on_job_update=self._on_job_update)
+        self.system_info = self.core.system_info
+        self.scheduler = self.core.scheduler
+        self.sampler = MetricSampler(self.system_info)
+        self._iconified = False
+        self._shown_values = {} # آخر القيم المعروضة لتجنب تحديث الواجهة دون داعٍ
         self.logview = None # سيتم إنشاؤه في init_ui
         self.log_scroll_window = None # للحفاظ على مرجع لنافذة التمرير
+        self.log_end_mark = None
+        self.log_pipeline = LogPipeline(max_lines=int(os.environ.get("FLASHBOOST_LOG_MAX_LINES", "2000")),
+                                        wakeup=lambda: GLib.timeout_add(33, self._flush_log, trace_now()),
+                                        file_path=os.environ.get("FLASHBOOST_LOG_FILE"))
         self.buttons = []
         self.spinner = Gtk.Spinner()
+        self.cancel_button = None
+        self.verify_check = None
+        self.jobs_store = None
+        self.jobs_view = None
+        self._job_rows = {}
+        self.process_monitor = None # يُنشأ عند فتح نافذة العمليات
+        self.process_dialog = None
+        self.selected_pid = None # العملية المحددة في نافذة العمليات (هدف تعزيز الأداء)
+        self.history = None # سجل القياسات للرسوم البيانية (يتطلب numpy و pycairo)
+        self.graphs = []
+        self.graphs_expander = None
+        self.recorder = None # المسجل الثنائي (flashboost_recorder) أثناء التسجيل
+        self.record_check = None
+        self.live_button = None
+        self.trace_check = None
 
         self.init_pygame_mixer()
         self.load_css()
         self.init_ui()
         GLib.idle_add(self.optimize_performance)
-        GLib.timeout_add(1500, self.update_info)
+        self.sampler.start() # القياس يتم في خيط منفصل عن الحلقة الرئيسية
+        if os.environ.get("FLASHBOOST_WATCH") == "1": self.watch_check.set_active(True)
+        if os.environ.get("FLASHBOOST_METRICS_LISTEN"): self.core.start_metrics(os.environ["FLASHBOOST_METRICS_LISTEN"], self.sampler)
+        GLib.timeout_add(500, self.update_info)
+        # SIGUSR1 (الأمر trace في سطر الأوامر) يبدّل التتبع في النسخة العاملة
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGUSR1, self._on_trace_signal)
+        if self.history:
+            if os.environ.get("FLASHBOOST_RECORD") == "1": self.record_check.set_active(True)
+            self.history.start(); GLib.timeout_add(1000, self.update_graphs)
 
     def init_pygame_mixer(self):
-        try:
-            pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
-            self.log("تم تهيئة نظام الصوت (pygame).")
-        except pygame.error as e:
-             self.log(f"⚠️ فشل تهيئة pygame.mixer: {e}.")
-             print(f"Pygame Mixer Init Error: {e}")
-        except Exception as e:
-            self.log(f"⚠️ خطأ غير متوقع أثناء تهيئة pygame.mixer: {e}")
-            print(f"Unexpected Pygame Mixer Error: {e}")
+        # لا يتم استيراد pygame/numpy ولا فتح جهاز الصوت إلا عند أول صوت
+        self.sounds = ToneBank(log=self.log)
 
     def load_css(self):
         screen = Gdk.Screen.get_default()
@@ -295,6 +258,7 @@ class FlashBoostApp(Gtk.Window):
         self.disk_bar = Gtk.ProgressBar(text="0%", show_text=True)
         self.disk_bar.set_hexpand(True)
         grid_status.attach(self.disk_bar, 1, 2, 2, 1)
+        self.init_graphs(main_box)
 
         # --- قسم العمليات ---
         actions_title = Gtk.Label(label="🚀 العمليات", xalign=0)
@@ -312,8 +276,12 @@ class FlashBoostApp(Gtk.Window):
             ("تنظيف خفيف", self.on_light_clean, "إزالة الملفات المؤقتة وتفريغ كاش الصفحة", "edit-clear-symbolic"),
             ("تنظيف عميق", self.on_deep_clean, "تنظيف شامل للكاش والسجلات (يتطلب صلاحيات)", "edit-delete-symbolic"),
             ("إصلاح الحزم", self.on_fix_errors, "محاولة إصلاح مشاكل الحزم المعلقة (يتطلب صلاحيات)", "system-run-symbolic"),
-            ("🚀 تعزيز الأداء", self.on_boost_performance, "إيقاف خدمات ورفع أولوية التطبيق (تجريبي ويتطلب صلاحيات)", "preferences-system-symbolic"),
+            ("🚀 تعزيز الأداء", self.on_boost_performance, "خفض أوزان خدمات الخلفية (cgroup v2) دون إيقافها ورفع أولوية التطبيق (تجريبي ويتطلب صلاحيات)", "preferences-system-symbolic"),
             ("🌐 تعزيز الشبكة/الألعاب", self.on_network_game_boost, "تعديلات مؤقتة للشبكة والمعالج لتحسين الألعاب (يتطلب صلاحيات)", "network-workgroup-symbolic"), # تغيير الأيقونة
+            ("🔍 معاينة التنظيف", self.on_preview_clean, "حساب المساحة التي سيحررها التنظيف الخفيف والعميق دون حذف أي شيء", "edit-find-symbolic"),
+            ("📂 تحليل القرص", self.on_analyze_disk, "تحديث فهرس أحجام المجلدات وعرض أكبر المستهلكين لكل نقطة تثبيت", "drive-harddisk-symbolic"),
+            ("↩ استعادة الإعدادات", self.on_restore_defaults, "التراجع عن تعديلات sysctl التي طبقها التطبيق (يتطلب صلاحيات)", "edit-undo-symbolic"),
+            ("🧮 العمليات", self.on_process_monitor, "أكثر العمليات استهلاكاً للمعالج والذاكرة والقرص، مع ضبط الأولوية والأنوية", "utilities-system-monitor-symbolic"),
             ("عرض الحالة", self.on_show_status, "عرض معلومات النظام الحالية", "dialog-information-symbolic"),
         ]
 
@@ -336,6 +304,19 @@ class FlashBoostApp(Gtk.Window):
         self.spinner.set_valign(Gtk.Align.CENTER); self.spinner.set_halign(Gtk.Align.CENTER)
         hbox_actions.pack_start(self.spinner, False, False, 15) # زيادة المسافة للـ Spinner
 
+        # قائمة المهام: حالة وتوقيت كل عملية (المعرف، الاسم، الحالة، المدة)
+        self.jobs_store = Gtk.ListStore(int, str, str, str)
+        self.jobs_view = Gtk.TreeView(model=self.jobs_store)
+        for col_idx, title in ((1, "العملية"), (2, "الحالة"), (3, "المدة")):
+            column = Gtk.TreeViewColumn(title, Gtk.CellRendererText(), text=col_idx)
+            column.set_expand(col_idx == 1)
+            self.jobs_view.append_column(column)
+        jobs_scroll = Gtk.ScrolledWindow()
+        jobs_scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        jobs_scroll.set_min_content_height(90)
+        jobs_scroll.add(self.jobs_view)
+        main_box.pack_start(jobs_scroll, False, False, 0)
+
         # --- قسم سجل النشاط ---
         log_title = Gtk.Label(label="📝 سجل النشاط", xalign=0)
         log_title.get_style_context().add_class("section-title")
@@ -355,6 +336,8 @@ class FlashBoostApp(Gtk.Window):
         self.logview.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
         self.logview.set_name("logview_widget") # اسم لـ CSS
         self.log_scroll_window.add(self.logview) # إضافة TextView إلى ScrolledWindow
+        log_buffer = self.logview.get_buffer()
+        self.log_end_mark = log_buffer.create_mark("log-end", log_buffer.get_end_iter(), False)
 
         box_log.pack_start(self.log_scroll_window, True, True, 0)
 
@@ -369,30 +352,45 @@ class FlashBoostApp(Gtk.Window):
         clear_log_button.connect("clicked", self.on_clear_log)
         action_bar.pack_end(clear_log_button)
 
+        self.cancel_button = Gtk.Button(label="إلغاء العملية")
+        self.cancel_button.set_tooltip_text("إلغاء العملية المحددة في قائمة المهام (أو العملية الجارية)")
+        try:
+            cancel_icon = Gtk.Image.new_from_icon_name("process-stop-symbolic", Gtk.IconSize.BUTTON)
+            self.cancel_button.set_image(cancel_icon); self.cancel_button.set_always_show_image(True)
+        except GLib.Error: pass
+        self.cancel_button.set_sensitive(False)
+        self.cancel_button.connect("clicked", self.on_cancel_action)
+        action_bar.pack_start(self.cancel_button)
+
+        self.verify_check = Gtk.CheckButton(label="📊 قياس قبل/بعد")
+        self.verify_check.set_tooltip_text("تشغيل قياسات محلية قبل وبعد عمليات التعزيز وعرض الفرق مع فترة الثقة")
+        action_bar.pack_end(self.verify_check)
+
+        self.watch_check = Gtk.CheckButton(label="👁 ملفات التطبيقات")
+        self.watch_check.set_tooltip_text("تطبيق ملف الضبط تلقائياً عند تشغيل تطبيق مُعرّف في profiles.json وإرجاعه عند إغلاقه")
+        self.watch_check.connect("toggled", self.on_watch_toggled)
+        action_bar.pack_end(self.watch_check)
+
+        self.trace_check = Gtk.CheckButton(label="⏱ تتبع")
+        self.trace_check.set_tooltip_text("تسجيل مدة كل خطوة وأمر ورحلة للمساعد وتحديث للواجهة، وحفظها عند الإيقاف بصيغة Chrome trace (chrome://tracing أو Perfetto)")
+        self.trace_check.set_active(TRACER.enabled) # FLASHBOOST_TRACE=1
+        self.trace_check.connect("toggled", self.on_trace_toggled)
+        action_bar.pack_end(self.trace_check)
+
     def on_clear_log(self, widget):
         if self.logview:
             buffer = self.logview.get_buffer()
             buffer.set_text("")
             self.log("تم مسح السجل.")
 
-    def set_buttons_sensitive(self, sensitive):
-        GLib.idle_add(self._set_buttons_sensitive_idle, sensitive)
-
-    def _set_buttons_sensitive_idle(self, sensitive):
-        for btn in self.buttons:
-            label_widget = self._find_child_label(btn)
-            label_text = label_widget.get_text() if label_widget else ""
-            if "عرض الحالة" not in label_text :
-                btn.set_sensitive(sensitive)
-        return False
-
-    def _find_child_label(self, widget):
-         if isinstance(widget, Gtk.Label): return widget
-         if isinstance(widget, Gtk.Container):
-             for child in widget.get_children():
-                 found = self._find_child_label(child);
-                 if found: return found
-         return None
+    def on_cancel_action(self, widget):
+        job = None
+        model, tree_iter = self.jobs_view.get_selection().get_selected()
+        if tree_iter is not None:
+            job_id = model[tree_iter][0]
+            job = next((j for j in self.scheduler.jobs if j.id == job_id), None)
+        if job is None or job.state not in (QUEUED, RUNNING): job = self.scheduler.running_job()
+        if job and not job.cancelled: self.log(f"⏹ جاري إلغاء: {job.name}..."); self.scheduler.cancel(job)
 
     def set_spinner_active(self, active):
          GLib.idle_add(self._set_spinner_active_idle, active)
@@ -402,92 +400,74 @@ class FlashBoostApp(Gtk.Window):
          else: self.spinner.stop(); self.spinner.hide()
          return False
 
+    JOB_STATE_LABELS = {QUEUED: "في الانتظار", RUNNING: "قيد التنفيذ", DONE: "تم", FAILED: "فشل", CANCELLED: "أُلغي", SKIPPED: "تم التخطي"}
+
+    def _on_job_update(self, job, step):
+        # رسائل السجل والأصوات من النواة؛ هنا تحديث القائمة فقط
+        GLib.idle_add(self._refresh_jobs_view, trace_now())
+
+    def _refresh_jobs_view(self, queued=None):
+        # queued: وقت الجدولة من خيط المهام، والفرق = انتظار الحلقة الرئيسية
+        if queued is not None: TRACER.record("idle wait", "ui", queued, trace_now())
+        if self.jobs_store is None: return False
+        with TRACER.span("jobs view", "ui"):
+            for job in list(self.scheduler.jobs):
+                row = (job.id, job.name, self.JOB_STATE_LABELS.get(job.state, job.state), f"{job.duration:.1f} ث" if job.started else "")
+                tree_iter = self._job_rows.get(job.id)
+                if tree_iter is None: self._job_rows[job.id] = self.jobs_store.append(row)
+                elif tuple(self.jobs_store[tree_iter]) != row: self.jobs_store[tree_iter] = row
+        busy = self.scheduler.busy
+        self.set_spinner_active(busy)
+        if self.cancel_button: self.cancel_button.set_sensitive(busy)
+        return False
+
     def optimize_performance(self):
+        # FLASHBOOST_AUTOTUNE=1: ضبط مستمر حسب ضغط الذاكرة بدلاً من القيم الثابتة
+        if os.environ.get("FLASHBOOST_AUTOTUNE") == "1" and self.core.start_autotune(): return False
         self.log("محاولة ضبط إعدادات الأداء الأولية...")
-        sysctl_cmds = ["sysctl -w vm.swappiness=10", "sysctl -w vm.vfs_cache_pressure=50"]
-        full_cmd = f"pkexec sh -c \"{ ' && '.join(sysctl_cmds) }\""
-        success = True
-        self.set_buttons_sensitive(False); self.set_spinner_active(True)
-        try:
-            result = subprocess.run(full_cmd, shell=True, check=True, capture_output=True, text=True, timeout=60)
-            self.log(f"  ✅ نجحت أوامر sysctl الأولية.")
-            if result.stdout and len(result.stdout.strip()) > 0 : self.log(f"     المخرج:\n        {result.stdout.strip().replace(' = ', '=')}")
-        except subprocess.CalledProcessError as e:
-            success = False; self.log(f"  ❌ فشلت أوامر sysctl الأولية."); self.log(f"     رمز الخطأ: {e.returncode}")
-            if e.stderr and len(e.stderr.strip()) > 0 :
-                 log_stderr = "\n        ".join(e.stderr.strip().splitlines()[:5]);
-                 if len(e.stderr.strip().splitlines()) > 5: log_stderr += "\n        ... (تم اختصار الخطأ)"
-                 self.log(f"     الخطأ:\n        {log_stderr}")
-            if e.returncode in [126, 127]: self.log("     تم إلغاء العملية أو فشلت المصادقة.")
-        except subprocess.TimeoutExpired: success = False; self.log(f"  ⌛ فشل: انتهت المهلة لأوامر sysctl الأولية")
-        except FileNotFoundError: success = False; self.log(f"  ❓ فشل: هل 'pkexec' أو 'sysctl' مثبت؟")
-        except Exception as e: success = False; self.log(f"  💥 فشل: خطأ غير متوقع: {e}")
-        self.set_buttons_sensitive(True); self.set_spinner_active(False)
-        if success: self.play_sound("success"); self.log("👍 تم ضبط إعدادات الأداء الأولية.")
-        else: self.play_sound("error"); self.log("⚠️ فشل ضبط بعض إعدادات الأداء الأولية.")
-
-    def perform_actions(self, cmds_or_cmd_string, action_name):
-        def task():
-            self.set_buttons_sensitive(False); self.set_spinner_active(True)
-            self.log(f"⏳ بدء: {action_name}..."); self.play_sound("info")
-            all_success = True; command_list_to_run = []
-
-            if isinstance(cmds_or_cmd_string, str): command_list_to_run = [cmds_or_cmd_string]
-            elif isinstance(cmds_or_cmd_string, list):
-                 pkexec_group = []
-                 for cmd in cmds_or_cmd_string:
-                     if cmd.strip().startswith("pkexec"): pkexec_group.append(cmd.strip().replace("pkexec ", "", 1))
-                     else:
-                         if pkexec_group:
-                              joined_cmds = " && ".join(pkexec_group)
-                              command_list_to_run.append(f"pkexec sh -c \"{joined_cmds}\""); pkexec_group = []
-                         command_list_to_run.append(cmd)
-                 if pkexec_group:
-                      joined_cmds = " && ".join(pkexec_group)
-                      command_list_to_run.append(f"pkexec sh -c \"{joined_cmds}\"")
-            else: self.log(f"❌ خطأ داخلي: نوع إدخال غير صالح: {type(cmds_or_cmd_string)}"); all_success = False
-
-            for cmd_to_run in command_list_to_run:
-                 is_pkexec_group = cmd_to_run.startswith("pkexec sh -c"); log_cmd_display = cmd_to_run
-                 if is_pkexec_group:
-                    inner_cmds = cmd_to_run.split('"')[1].split('&&'); log_cmd_display = f"مجموعة أوامر بصلاحيات ({len(inner_cmds)})"
-                 elif cmd_to_run.strip().startswith(("sync", "find")): continue # تخطي تسجيل الأوامر البسيطة
-                 self.log(f"  ‹‹ {log_cmd_display}")
-                 try:
-                    timeout_seconds = 180
-                    result = subprocess.run(cmd_to_run, shell=True, check=True, capture_output=True, text=True, timeout=timeout_seconds)
-                    if result.stdout and len(result.stdout.strip()) > 0 and not log_cmd_display.startswith(("sysctl", "echo", "sync", "مجموعة أوامر")):
-                        output_lines = result.stdout.strip().splitlines(); log_output = "\n     ".join(output_lines[:5])
-                        if len(output_lines) > 5: log_output += "\n     ... (تم اختصار المخرج)"
-                        self.log(f"     {log_output}")
-                 except subprocess.CalledProcessError as e:
-                    all_success = False; self.log(f"  ❌ فشل تنفيذ: {log_cmd_display}"); self.log(f"     رمز الخطأ: {e.returncode}")
-                    if e.stderr and len(e.stderr.strip()) > 0:
-                         log_stderr = "\n        ".join(e.stderr.strip().splitlines()[:5])
-                         if len(e.stderr.strip().splitlines()) > 5: log_stderr += "\n        ... (تم اختصار الخطأ)"
-                         self.log(f"     الخطأ:\n        {log_stderr}")
-                    if 'pkexec' in cmd_to_run and e.returncode in [126, 127]: self.log("     تم إلغاء نافذة المصادقة أو فشلت.")
-                    break
-                 except subprocess.TimeoutExpired: all_success = False; self.log(f"  ⌛ فشل: {log_cmd_display} (انتهت المهلة)"); break
-                 except FileNotFoundError:
-                    cmd_name = cmd_to_run.split(' ')[0]; msg = f"  ❓ فشل: الأمر '{cmd_name}' غير موجود."
-                    if 'pkexec' in cmd_name: msg += " تأكد أيضًا من تثبيت 'pkexec'."
-                    self.log(msg); all_success = False; break
-                 except Exception as e: all_success = False; self.log(f"  💥 فشل: {log_cmd_display} بخطأ: {type(e).__name__} - {e}"); break
-
-            self.set_buttons_sensitive(True); self.set_spinner_active(False)
-            if all_success: self.play_sound("success"); self.log(f"🎉 اكتمل بنجاح: {action_name}")
-            else: self.play_sound("error"); self.log(f"⚠️ اكتمل مع أخطاء: {action_name}")
-
-        thread = threading.Thread(target=task, daemon=True); thread.start()
+        self.core.perform_actions(self.core.plan("startup-tuning")[1], "ضبط إعدادات الأداء الأولية", "startup-tuning")
+        return False
+
+    def on_watch_toggled(self, check):
+        if check.get_active():
+            if self.core.start_watch() is None: check.set_active(False)
+        else:
+            # الإرجاع قد ينتظر المساعد: خارج خيط الواجهة
+            threading.Thread(target=self.core.stop_watch, name="flashboost-watch-stop", daemon=True).start()
+
+    def on_trace_toggled(self, check):
+        if check.get_active():
+            TRACER.enable(); self.log("⏱ بدأ التتبع")
+        else:
+            TRACER.disable()
+            # كتابة الملف قد تستغرق وقتاً مع مخزن ممتلئ: خارج خيط الواجهة
+            threading.Thread(target=self._export_trace, name="flashboost-trace-export", daemon=True).start()
+
+    def _on_trace_signal(self):
+        self.trace_check.set_active(not self.trace_check.get_active())
+        return True
+
+    def _export_trace(self, path=None):
+        path = path or default_trace_path()
+        try: count = TRACER.export(path)
+        except OSError as e: print(f"Trace export error: {e}"); return
+        dropped = f"، أُسقط {TRACER.dropped} حدث قديم" if TRACER.dropped else ""
+        self.log(f"⏱ حُفظ التتبع ({count} حدث{dropped}): {path}")
 
     def on_show_status(self, btn):
-        cpu_usage = f"{self.system_info.get_cpu_usage():.1f}%"; ram_usage = f"{self.system_info.get_ram_usage():.1f}%"
-        disk_usage_val = f"{self.system_info.get_disk_usage('/'):.1f}%"; temp_str = self.system_info.get_temperature()
+        sample = self.sampler.latest() or self.sampler.sample_once()
+        cpu_usage = f"{sample.cpu:.1f}%"; ram_usage = f"{sample.ram:.1f}%"
+        disk_usage_val = f"{sample.disk:.1f}%"; temp_str = sample.temp
         primary_text = "📊 <b>حالة النظام الحالية</b>"
         secondary_text = (f"<b>المعالج (CPU):</b> {cpu_usage} ({temp_str})\n"
                           f"<b>الذاكرة (RAM):</b> {ram_usage}\n"
                           f"<b>استهلاك القرص (/):</b> {disk_usage_val}")
+        root_index = self.core.disk_indexes.get("/")
+        if root_index and root_index.dirs:
+            from flashboost_cleaner import format_bytes
+            secondary_text += "\n<b>أكبر المجلدات:</b> " + ", ".join(f"{GLib.markup_escape_text(path)} ({format_bytes(size)})" for path, size in root_index.top(3, max_depth=2))
+        core_temps = self.system_info.get_core_temperatures()
+        if core_temps: secondary_text += "\n<b>حرارة الأنوية:</b> " + ", ".join(f"{GLib.markup_escape_text(label)}: {temp:.0f}°C" for label, temp in core_temps)
         dialog = Gtk.MessageDialog(transient_for=self, flags=0, message_type=Gtk.MessageType.INFO, buttons=Gtk.ButtonsType.OK, text=primary_text)
         dialog.format_secondary_markup(secondary_text); dialog.set_title("حالة النظام")
         try: dialog.set_icon_name("utilities-system-monitor-symbolic") # أيقونة رمزية أخرى
@@ -495,114 +475,285 @@ class FlashBoostApp(Gtk.Window):
         dialog.run(); dialog.destroy()
 
     def on_light_clean(self, btn):
-        self.log("طلب إجراء: تنظيف خفيف")
-        cmds = ["sync", "pkexec sh -c 'echo 1 > /proc/sys/vm/drop_caches'", "find ~/.cache/ -maxdepth 1 -type f -delete", "find ~/.cache/ -maxdepth 1 -mindepth 1 -type d -empty -delete"]
-        self.perform_actions(cmds, "تنظيف خفيف")
+        self.core.run_action("light-clean")
 
     def on_deep_clean(self, btn):
-        self.log("طلب إجراء: تنظيف عميق")
-        cmds = ["sync", "pkexec sh -c 'echo 3 > /proc/sys/vm/drop_caches'", "find ~/.cache/ -maxdepth 1 -type f -delete", "find ~/.cache/ -maxdepth 1 -mindepth 1 -type d -exec rm -rf {} +", "pkexec journalctl --vacuum-size=100M"]
-        self.perform_actions(cmds, "تنظيف عميق")
+        self.core.run_action("deep-clean")
+
+    def on_preview_clean(self, btn):
+        self.core.run_action("preview-clean")
+
+    def on_analyze_disk(self, btn):
+        self.core.run_action("analyze-disk")
 
     def on_fix_errors(self, btn):
-        self.log("طلب إجراء: إصلاح الحزم")
-        cmds = ["pkexec apt-get update", "pkexec dpkg --configure -a", "pkexec apt-get install --fix-broken -y"]
-        self.perform_actions(cmds, "إصلاح الحزم")
+        self.core.run_action("fix-packages")
+
+    def confirm(self, title, text, secondary_markup):
+        dialog = Gtk.MessageDialog(transient_for=self, flags=0, message_type=Gtk.MessageType.WARNING, buttons=Gtk.ButtonsType.YES_NO, text=text)
+        dialog.format_secondary_markup(secondary_markup); dialog.set_title(title)
+        response = dialog.run(); dialog.destroy()
+        return response == Gtk.ResponseType.YES
+
+    def plan_boost_action(self, action, **params):
+        if self.verify_check and self.verify_check.get_active(): return self.core.plan_verified(action, **params)
+        return self.core.plan(action, **params)
 
     def on_boost_performance(self, btn):
         self.log("طلب إجراء: تعزيز الأداء")
-        services_to_stop = ["apt-daily.timer", "apt-daily-upgrade.timer"]
-        current_pid = os.getpid(); cmds_to_run_privileged = []
-        if services_to_stop: cmds_to_run_privileged.extend([f"systemctl stop {service}" for service in services_to_stop])
-        cmds_to_run_privileged.append(f"renice -n -10 -p {current_pid}")
-        full_cmd = f"pkexec sh -c \"{ ' && '.join(cmds_to_run_privileged) }\""
-        dialog = Gtk.MessageDialog(transient_for=self, flags=0, message_type=Gtk.MessageType.WARNING, buttons=Gtk.ButtonsType.YES_NO, text="⚠️ تحذير: تعزيز الأداء (تجريبي)")
+        current_pid = self.selected_pid or os.getpid()
+        label, steps = self.plan_boost_action("boost", pid=current_pid)
         warning_text = "سيقوم هذا الإجراء بمحاولة:\n";
-        if services_to_stop: warning_text += f" - إيقاف الخدمات التالية: {', '.join(services_to_stop)}\n"
-        warning_text += f" - زيادة أولوية التطبيق (PID: {current_pid}).\n\nهل أنت متأكد؟ (قد يتطلب كلمة المرور)"
-        dialog.format_secondary_markup(warning_text); dialog.set_title("تأكيد تعزيز الأداء")
-        response = dialog.run(); dialog.destroy()
-        if response == Gtk.ResponseType.YES: self.perform_actions(full_cmd, "تعزيز الأداء")
+        warning_text += " - خفض أوزان المعالج والإدخال/الإخراج والذاكرة لخدمات الخلفية (cgroup v2) دون إيقافها.\n"
+        if self.selected_pid: warning_text += " - رفع أوزان مجموعة العملية المحددة، وإرجاع كل شيء تلقائياً عند انتهائها.\n"
+        warning_text += f" - زيادة أولوية {'العملية المحددة' if self.selected_pid else 'التطبيق'} (PID: {current_pid}).\n\nهل أنت متأكد؟ (قد يتطلب كلمة المرور)"
+        if self.confirm("تأكيد تعزيز الأداء", "⚠️ تحذير: تعزيز الأداء (تجريبي)", warning_text): self.core.perform_actions(steps, label, "boost")
         else: self.log("تم إلغاء عملية تعزيز الأداء.")
 
     def on_network_game_boost(self, btn):
         self.log("طلب إجراء: تعزيز الشبكة والألعاب")
-        privileged_cmds = []
-        network_tweaks = ["sysctl -w net.ipv4.tcp_low_latency=1", "sysctl -w net.core.netdev_max_backlog=50000", "sysctl -w net.ipv4.tcp_timestamps=0", "sysctl -w net.ipv4.tcp_sack=1"]
-        privileged_cmds.extend(network_tweaks); self.log("  + تعديلات الشبكة (sysctl) جاهزة.")
-        cpu_governor_cmd = None
-        if self.system_info.check_command_exists("cpupower"): cpu_governor_cmd = "cpupower frequency-set -g performance"
-        elif self.system_info.check_command_exists("cpufreq-set"): cpu_governor_cmd = "cpufreq-set -r -g performance"
-        if cpu_governor_cmd: privileged_cmds.append(cpu_governor_cmd); self.log(f"  + سيتم محاولة تعيين حاكم المعالج إلى 'performance'.")
-        else: self.log("  - أدوات cpupower/cpufreq-set غير موجودة.")
-        wifi_interface = self.system_info.find_active_wifi_interface(); iw_exists = self.system_info.check_command_exists("iw")
-        if wifi_interface and iw_exists: wifi_cmd = f"iw dev {wifi_interface} set power_save off"; privileged_cmds.append(wifi_cmd); self.log(f"  + سيتم محاولة تعطيل توفير الطاقة لـ '{wifi_interface}'.")
-        elif not iw_exists: self.log("  - أداة 'iw' غير موجودة.")
-        else: self.log("  - لم يتم العثور على واجهة واي فاي نشطة.")
-        if privileged_cmds:
-            full_cmd = f"pkexec sh -c \"{ ' && '.join(privileged_cmds) }\""
-            dialog = Gtk.MessageDialog(transient_for=self, flags=0, message_type=Gtk.MessageType.WARNING, buttons=Gtk.ButtonsType.YES_NO, text="⚠️ تحذير: تعزيز الشبكة والألعاب (تجريبي)")
-            warning_text = ("سيطبق تعديلات مؤقتة على الشبكة والمعالج.\nهل أنت متأكد؟ (قد يتطلب كلمة المرور)")
-            dialog.format_secondary_markup(warning_text); dialog.set_title("تأكيد تعزيز الشبكة والألعاب")
-            response = dialog.run(); dialog.destroy()
-            if response == Gtk.ResponseType.YES: self.perform_actions([full_cmd], "تعزيز الشبكة والألعاب") # تمرير كقائمة
-            else: self.log("تم إلغاء عملية تعزيز الشبكة والألعاب.")
-        else: self.log("  ! لا توجد أوامر بصلاحيات لتنفيذها."); self.play_sound("error")
+        label, steps = self.plan_boost_action("network-boost", pid=self.selected_pid)
+        warning_text = "سيطبق تعديلات مؤقتة على الشبكة والمعالج، ويوجه مقاطعات بطاقة الشبكة إلى أنوية محددة"
+        warning_text += f" ويثبت العملية المحددة (PID: {self.selected_pid}) على الأنوية الباقية.\n" if self.selected_pid else ".\n"
+        warning_text += "زر الاستعادة يعيد كل القيم السابقة.\nهل أنت متأكد؟ (قد يتطلب كلمة المرور)"
+        if self.confirm("تأكيد تعزيز الشبكة والألعاب", "⚠️ تحذير: تعزيز الشبكة والألعاب (تجريبي)", warning_text): self.core.perform_actions(steps, label, "network-boost")
+        else: self.log("تم إلغاء عملية تعزيز الشبكة والألعاب.")
+
+    PROCESS_SORT_KEYS = (("cpu", "المعالج"), ("rss", "الذاكرة"), ("io", "القرص"))
+    IONICE_CHOICES = (("", "دون تغيير"), ("idle", "خامل"), ("best-effort", "عادي"), ("realtime", "فوري"))
+
+    def on_process_monitor(self, btn):
+        if self.process_dialog: self.process_dialog.present(); return
+        from flashboost_procmon import ProcessMonitor
+        self.process_monitor = ProcessMonitor()
+        dialog = self.process_dialog = Gtk.Dialog(title="العمليات", transient_for=self, flags=0)
+        dialog.set_default_size(720, 460)
+        box = dialog.get_content_area(); box.set_spacing(8)
+
+        top_bar = Gtk.Box(spacing=8)
+        top_bar.pack_start(Gtk.Label(label="ترتيب حسب:"), False, False, 0)
+        self.process_sort = Gtk.ComboBoxText()
+        for key, title in self.PROCESS_SORT_KEYS: self.process_sort.append(key, title)
+        self.process_sort.set_active_id("cpu")
+        self.process_sort.connect("changed", lambda combo: self._refresh_processes())
+        top_bar.pack_start(self.process_sort, False, False, 0)
+        self.process_status = Gtk.Label(xalign=1)
+        top_bar.pack_end(self.process_status, False, False, 0)
+        box.pack_start(top_bar, False, False, 0)
+
+        # PID، الاسم، المعالج، الذاكرة، القرص، nice، سطر الأوامر
+        self.process_store = Gtk.ListStore(int, str, str, str, str, int, str)
+        view = self.process_view = Gtk.TreeView(model=self.process_store)
+        view.set_tooltip_column(6)
+        for col_idx, title in ((0, "PID"), (1, "العملية"), (2, "المعالج"), (3, "الذاكرة"), (4, "القرص/ث"), (5, "nice")):
+            column = Gtk.TreeViewColumn(title, Gtk.CellRendererText(), text=col_idx)
+            column.set_expand(col_idx == 1)
+            view.append_column(column)
+        view.get_selection().connect("changed", self._on_process_selected)
+        scroll = Gtk.ScrolledWindow(); scroll.set_vexpand(True); scroll.add(view)
+        box.pack_start(scroll, True, True, 0)
+
+        controls = Gtk.Box(spacing=8)
+        self.nice_check = Gtk.CheckButton(label="nice:")
+        self.nice_spin = Gtk.SpinButton.new_with_range(-20, 19, 1)
+        self.ionice_combo = Gtk.ComboBoxText()
+        for key, title in self.IONICE_CHOICES: self.ionice_combo.append(key, title)
+        self.ionice_combo.set_active_id("")
+        self.affinity_entry = Gtk.Entry(placeholder_text="الأنوية، مثل 0-3", width_chars=10)
+        self.tree_check = Gtk.CheckButton(label="مع العمليات الفرعية")
+        apply_button = Gtk.Button(label="تطبيق")
+        apply_button.connect("clicked", self.on_tune_process)
+        for widget in (self.nice_check, self.nice_spin, Gtk.Label(label="ionice:"), self.ionice_combo, self.affinity_entry, self.tree_check):
+            controls.pack_start(widget, False, False, 0)
+        controls.pack_end(apply_button, False, False, 0)
+        box.pack_start(controls, False, False, 0)
+
+        dialog.connect("destroy", self._on_process_dialog_closed)
+        dialog.show_all()
+        self._process_refreshing = False
+        self._refresh_processes()
+        self._process_timer = GLib.timeout_add_seconds(2, self._refresh_processes)
+
+    def _on_process_dialog_closed(self, dialog):
+        GLib.source_remove(self._process_timer)
+        self.process_dialog = self.process_monitor = None; self.selected_pid = None
+
+    def _on_process_selected(self, selection):
+        model, tree_iter = selection.get_selected()
+        if tree_iter is not None: self.selected_pid = model[tree_iter][0]
+
+    def _refresh_processes(self):
+        # المسح في خيط خلفي؛ الواجهة تستلم أعلى 50 عملية فقط
+        if not self.process_monitor or self._process_refreshing: return True
+        self._process_refreshing = True
+        monitor = self.process_monitor; key = self.process_sort.get_active_id() or "cpu"
+        def scan():
+            try: monitor.sample(); top = monitor.top(50, key)
+            except Exception as e: print(f"Process monitor error: {e}"); top = []
+            GLib.idle_add(self._show_processes, monitor, top)
+        threading.Thread(target=scan, name="flashboost-procmon", daemon=True).start()
+        return True
+
+    def _show_processes(self, monitor, top):
+        self._process_refreshing = False
+        if monitor is not self.process_monitor: return False
+        from flashboost_cleaner import format_bytes
+        selected = self.selected_pid
+        self.process_store.clear()
+        for p in top:
+            tree_iter = self.process_store.append((p.pid, p.name, f"{p.cpu:.1f}%", format_bytes(p.rss), format_bytes(p.io_rate), p.nice, p.cmdline))
+            if p.pid == selected: self.process_view.get_selection().select_iter(tree_iter)
+        self.process_status.set_text(f"{len(monitor.procs)} عملية، المسح {monitor.duration * 1000:.0f} م.ث")
+        return False
+
+    def on_tune_process(self, btn):
+        if not self.selected_pid: self.log("⚠️ اختر عملية من القائمة أولاً."); return
+        from flashboost_procmon import parse_cpu_list
+        try: cpus = parse_cpu_list(self.affinity_entry.get_text()) if self.affinity_entry.get_text().strip() else None
+        except ValueError as e: self.log(f"⚠️ قائمة أنوية غير صالحة: {e}"); return
+        nice = self.nice_spin.get_value_as_int() if self.nice_check.get_active() else None
+        ioclass = self.ionice_combo.get_active_id() or None
+        label = f"ضبط العملية {self.selected_pid}"
+        self.core.perform_actions(self.core.plan_tune_process(self.selected_pid, nice, ioclass, 4, cpus, self.tree_check.get_active()), label, "tune-process")
+
+    def on_restore_defaults(self, btn):
+        self.core.run_action("restore-defaults")
 
     def log(self, msg):
-        if not self.logview: return # التأكد من تهيئة logview
-        def _log_idle():
+        self.log_pipeline.push(msg)
+
+    def _flush_log(self, queued=None):
+        # إدراج واحد وتمرير واحد لكل دفعة من الرسائل
+        if not self.logview: return True # انتظار تهيئة logview
+        if queued is not None: TRACER.record("log wait", "ui", queued, trace_now())
+        text = self.log_pipeline.drain()
+        if not text: return False
+        with TRACER.span("log flush", "ui", chars=len(text)):
             try:
-                buf = self.logview.get_buffer(); end_iter = buf.get_end_iter()
-                timestamp = datetime.now().strftime('%H:%M:%S'); clean_msg = GLib.markup_escape_text(msg)
-                buf.insert(end_iter, f"[{timestamp}] {clean_msg}\n")
-                GLib.timeout_add(50, self._scroll_log_to_end)
+                buf = self.logview.get_buffer()
+                buf.insert(buf.get_end_iter(), GLib.markup_escape_text(text))
+                excess = buf.get_line_count() - 1 - self.log_pipeline.max_lines
+                if excess > 0: buf.delete(buf.get_start_iter(), buf.get_iter_at_line(excess))
+                self.logview.scroll_mark_onscreen(self.log_end_mark)
             except Exception as e: print(f"Error in logging: {e}")
-            return False
-        GLib.idle_add(_log_idle)
-
-    def _scroll_log_to_end(self):
-        if self.log_scroll_window: # التحقق من وجود نافذة التمرير
-            try:
-                adj = self.log_scroll_window.get_vadjustment() # استخدام الطريقة الصحيحة
-                if adj: adj.set_value(adj.get_upper() - adj.get_page_size())
-            except Exception as e: print(f"Error scrolling log: {e}")
         return False
 
     def play_sound(self, sound_type):
-        if not pygame.mixer.get_init(): return
+        self.sounds.play(sound_type)
+
+    def init_graphs(self, box):
         try:
-            freq, dur, amp_f = 0, 0, 0
-            if sound_type == "success": freq, dur, amp_f = 523.25, 0.25, 0.4
-            elif sound_type == "error": freq, dur, amp_f = 261.63, 0.4, 0.5
-            elif sound_type == "info": freq, dur, amp_f = 659.25, 0.2, 0.3
-            else: return
-            sr = pygame.mixer.get_init()[0];
-            if sr == 0: print("Error: Sample rate is 0."); return
-            ns = int(sr * dur);
-            if ns <= 0: return
-            t = np.linspace(0., dur, ns, endpoint=False); amp = np.iinfo(np.int16).max * amp_f
-            s = amp * np.sin(2. * np.pi * freq * t); fl = int(sr * 0.02);
-            if ns > fl * 2: s[:fl] *= np.linspace(0., 1., fl); s[-fl:] *= np.linspace(1., 0., fl)
-            sa = np.array(s, dtype=np.int16)
-            if len(sa.shape) == 1: ssa = np.ascontiguousarray(np.column_stack((sa, sa)))
-            else: ssa = np.ascontiguousarray(sa)
-            sound = pygame.sndarray.make_sound(ssa); sound.play()
-        except NameError: self.log("⚠️ مكتبة numpy غير موجودة.")
-        except Exception as e: print(f"Sound Error: {type(e).__name__} - {e}")
+            from flashboost_history import HistoryRecorder
+            from flashboost_graphs import HistoryGraph
+            from flashboost_cleaner import format_bytes
+        except ImportError as e: print(f"History graphs disabled: {e}"); return
+        self.history = HistoryRecorder(self.system_info)
+        rings = self.history.rings
+        rate = lambda value: f"{format_bytes(value)}/ث"
+        self.graphs = [
+            HistoryGraph(rings["cpu"], f"المعالج ({self.history.cores} أنوية)", lambda v: f"{v.mean():.0f}%، الأعلى {v.max():.0f}%", maximum=100),
+            HistoryGraph(rings["memory"], "الذاكرة / المبادلة", lambda v: f"{v[0]:.0f}% / {v[1]:.0f}%", maximum=100, colors=[(0.38, 0.63, 0.92), (0.9, 0.6, 0.3)]),
+            HistoryGraph(rings["disk"], "القرص (قراءة / كتابة)", lambda v: f"{rate(v[0])} / {rate(v[1])}", colors=[(0.45, 0.8, 0.45), (0.9, 0.45, 0.45)], format_scale=rate),
+            HistoryGraph(rings["net"], "الشبكة (استقبال / إرسال)", lambda v: f"{rate(v[0])} / {rate(v[1])}", colors=[(0.45, 0.8, 0.9), (0.85, 0.55, 0.9)], format_scale=rate),
+            HistoryGraph(rings["temp"], "الحرارة", lambda v: f"{v[0]:.0f}°C", maximum=110, colors=[(0.95, 0.5, 0.3)]),
+        ]
+        # مطوية افتراضياً: لا رسم ما لم تُعرض (العينات تُجمع دائماً)
+        self.graphs_expander = Gtk.Expander(label="📈 السجل (آخر ساعة)")
+        graphs_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        hbox_record = Gtk.Box(spacing=6)
+        self.record_check = Gtk.CheckButton(label="⏺ تسجيل")
+        self.record_check.set_tooltip_text("حفظ كل عينة في ملفات ثنائية مربوطة بالذاكرة لإعادة عرضها لاحقاً")
+        self.record_check.connect("toggled", self.on_record_toggled)
+        load_button = Gtk.Button(label="📼 فتح تسجيل…"); load_button.connect("clicked", self.on_load_recording)
+        self.live_button = Gtk.Button(label="📡 مباشر"); self.live_button.connect("clicked", self.on_live_graphs); self.live_button.set_sensitive(False)
+        for widget in (self.record_check, load_button, self.live_button): hbox_record.pack_start(widget, False, False, 0)
+        graphs_box.pack_start(hbox_record, False, False, 0)
+        for graph in self.graphs: graphs_box.pack_start(graph, False, False, 0)
+        self.graphs_expander.add(graphs_box)
+        box.pack_start(self.graphs_expander, False, False, 0)
+
+    def on_record_toggled(self, check):
+        if check.get_active():
+            try:
+                from flashboost_recorder import MetricRecorder
+                self.recorder = MetricRecorder(cores=self.history.cores)
+            except ImportError as e: print(f"Recorder disabled: {e}"); check.set_active(False); return
+            self.history.on_collect = self.recorder.append
+            self.log(f"⏺ بدأ التسجيل في {self.recorder.directory}")
+        elif self.recorder:
+            self.history.on_collect = None
+            self.recorder.close(); self.recorder = None
+            self.log("⏹ توقف التسجيل")
+
+    def on_load_recording(self, btn):
+        from flashboost_recorder import RecordingSet, default_directory, to_rings
+        dialog = Gtk.FileChooserDialog(title="فتح تسجيل", parent=self, action=Gtk.FileChooserAction.OPEN)
+        dialog.add_buttons(Gtk.STOCK_CANCEL, Gtk.ResponseType.CANCEL, Gtk.STOCK_OPEN, Gtk.ResponseType.OK)
+        dialog.set_select_multiple(True)
+        os.makedirs(default_directory(), exist_ok=True); dialog.set_current_folder(default_directory())
+        file_filter = Gtk.FileFilter(); file_filter.set_name("FlashBoost (*.fbrec)"); file_filter.add_pattern("*.fbrec"); dialog.add_filter(file_filter)
+        paths = dialog.get_filenames() if dialog.run() == Gtk.ResponseType.OK else []
+        dialog.destroy()
+        if not paths: return
+        recordings = RecordingSet(paths=paths)
+        try: records = recordings.load()
+        finally: recordings.close()
+        if records is None or not len(records): self.log("📼 التسجيل فارغ"); return
+        rings = to_rings(records)
+        for graph, group in zip(self.graphs, ("cpu", "memory", "disk", "net", "temp")): graph.set_ring(rings[group], len(records))
+        start, end = (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t)) for t in (records["t"][0], records["t"][-1]))
+        self.graphs_expander.set_label(f"📼 تسجيل: {start} ← {end}"); self.graphs_expander.set_expanded(True)
+        self.live_button.set_sensitive(True)
+        self.log(f"📼 عرض {len(records)} عينة من {len(paths)} مقطع")
+
+    def on_live_graphs(self, btn):
+        for graph, group in zip(self.graphs, ("cpu", "memory", "disk", "net", "temp")): graph.set_ring(self.history.rings[group], 3600)
+        self.graphs_expander.set_label("📈 السجل (آخر ساعة)")
+        self.live_button.set_sensitive(False)
+
+    def update_graphs(self):
+        if self._iconified or not self.get_visible() or not self.graphs_expander.get_expanded(): return True
+        with TRACER.span("graphs", "ui"):
+            for graph in self.graphs: graph.update()
+        return True
+
+    def on_window_state(self, widget, event):
+        self._iconified = bool(event.new_window_state & Gdk.WindowState.ICONIFIED)
+        return False
 
     def update_info(self):
+        # قراءة آخر لقطة فقط؛ لا استدعاءات psutil هنا
+        if self._iconified or not self.get_visible(): return True
+        with TRACER.span("update info", "ui"): return self._update_info()
+
+    def _update_info(self):
+        if self.scheduler.running_job(): self._refresh_jobs_view() # تحديث مدة المهام الجارية
+        sample = self.sampler.latest()
+        if sample is None or self._shown_values.get("timestamp") == sample.timestamp: return True
+        self._shown_values["timestamp"] = sample.timestamp
         try:
-            cpu = self.system_info.get_cpu_usage(); self.cpu_bar.set_fraction(cpu / 100); self.cpu_bar.set_text(f"{cpu:.1f}%")
-            ram_pct = self.system_info.get_ram_usage(); self.ram_bar.set_fraction(ram_pct / 100); self.ram_bar.set_text(f"{ram_pct:.1f}%")
-            disk_pct = self.system_info.get_disk_usage('/'); self.disk_bar.set_fraction(disk_pct / 100); self.disk_bar.set_text(f"{disk_pct:.1f}%")
-            temp = self.system_info.get_temperature(); self.cpu_temp_label.set_text(temp)
+            self._update_bar("cpu", self.cpu_bar, sample.cpu)
+            self._update_bar("ram", self.ram_bar, sample.ram)
+            self._update_bar("disk", self.disk_bar, sample.disk)
+            if self._shown_values.get("temp") != sample.temp:
+                self._shown_values["temp"] = sample.temp; self.cpu_temp_label.set_text(sample.temp)
         except Exception as e: print(f"Update Info Error: {e}")
         return True
 
+    def _update_bar(self, key, bar, value):
+        text = f"{value:.1f}%"
+        if self._shown_values.get(key) == text: return
+        self._shown_values[key] = text; bar.set_fraction(value / 100); bar.set_text(text)
+
     def on_quit(self, widget):
         self.log("جاري إغلاق التطبيق...")
-        if pygame.mixer.get_init(): pygame.mixer.quit(); print("Pygame mixer stopped.")
+        self.sampler.stop()
+        if self.history: self.history.stop()
+        if self.recorder: self.recorder.close()
+        self.core.close()
+        if TRACER.enabled: TRACER.disable(); self._export_trace() # قبل إغلاق السجل ليُكتب مسار الملف
+        self.sounds.close()
+        self.log_pipeline.close()
         Gtk.main_quit()
 
 if __name__ == "__main__":
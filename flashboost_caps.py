@@ -0,0 +1,80 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+NetInterface = namedtuple("NetInterface", ["name", "operstate", "wireless"])
+
+
+def _read_text(path):
+    try:
+        with open(path) as f: return f.read().strip()
+    except OSError: return ""
+
+
+class CapabilityIndex:
+    # البحث عن الأدوات في PATH دون تشغيل which، مع إبطال الكاش عند تغير مجلدات PATH
+    def __init__(self, path=None, check_interval=1.0):
+        self._fixed_path = path
+        self.check_interval = check_interval
+        self._cache = {}
+        self._signature = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _dirs(self):
+        path = self._fixed_path if self._fixed_path is not None else os.environ.get("PATH", os.defpath)
+        return [d for d in path.split(os.pathsep) if d]
+
+    def _current_signature(self, dirs):
+        signature = []
+        for d in dirs:
+            try: signature.append((d, os.stat(d).st_mtime_ns))
+            except OSError: signature.append((d, None))
+        return tuple(signature)
+
+    def _validate(self):
+        now = time.monotonic()
+        if now < self._next_check: return
+        self._next_check = now + self.check_interval
+        signature = self._current_signature(self._dirs())
+        if signature != self._signature: self._cache.clear(); self._signature = signature
+
+    def which(self, command):
+        with self._lock:
+            self._validate()
+            if command in self._cache: return self._cache[command]
+            found = None
+            if os.sep in command:
+                if os.access(command, os.X_OK) and not os.path.isdir(command): found = command
+            else:
+                for d in self._dirs():
+                    candidate = os.path.join(d, command)
+                    if os.access(candidate, os.X_OK) and not os.path.isdir(candidate): found = candidate; break
+            self._cache[command] = found
+            return found
+
+    def has(self, command):
+        return self.which(command) is not None
+
+    def invalidate(self):
+        with self._lock: self._cache.clear(); self._signature = None; self._next_check = 0.0
+
+
+def list_interfaces(sys_root='/sys'):
+    # تعداد الواجهات من /sys/class/net دون ip/iw
+    net_dir = os.path.join(sys_root, "class", "net")
+    try: names = sorted(os.listdir(net_dir))
+    except OSError: return []
+    interfaces = []
+    for name in names:
+        base = os.path.join(net_dir, name)
+        wireless = os.path.exists(os.path.join(base, "wireless")) or os.path.exists(os.path.join(base, "phy80211"))
+        interfaces.append(NetInterface(name, _read_text(os.path.join(base, "operstate")) or "unknown", wireless))
+    return interfaces
+
+
+def active_wifi_interface(sys_root='/sys'):
+    wireless = [iface for iface in list_interfaces(sys_root) if iface.wireless]
+    active = next((iface for iface in wireless if iface.operstate in ("up", "dormant")), None)
+    return active.name if active else None
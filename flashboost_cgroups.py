@@ -0,0 +1,182 @@
+import json
+import os
+import re
+import threading
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+GROUP_RE = re.compile(r"^[A-Za-z0-9@_.\-]+(/[A-Za-z0-9@_.\-]+)*$")
+CONTROL_FILES = ("cpu.weight", "io.weight", "memory.high")
+
+
+class CgroupError(Exception):
+    pass
+
+
+class ResourceProfile:
+    # background: مجموعة -> {ملف: قيمة} (يُسمح بـ {uid} في المسار و "N%" من الذاكرة في memory.high)
+    # foreground: {ملف: قيمة} تُطبق على مجموعة التطبيق المحدد
+    def __init__(self, name, background=None, foreground=None):
+        self.name = name
+        self.background = dict(background or {})
+        self.foreground = dict(foreground or {})
+
+
+USER_BACKGROUND = "user.slice/user-{uid}.slice/user@{uid}.service/background.slice"
+PROFILES = {
+    "boost": ResourceProfile("boost",
+        background={"system.slice": {"cpu.weight": 25, "io.weight": 25, "memory.high": "75%"},
+                    USER_BACKGROUND: {"cpu.weight": 10, "io.weight": 10, "memory.high": "25%"}},
+        foreground={"cpu.weight": 1000, "io.weight": 1000}),
+    "quiet-background": ResourceProfile("quiet-background",
+        background={"system.slice": {"cpu.weight": 50, "io.weight": 50},
+                    USER_BACKGROUND: {"cpu.weight": 20, "io.weight": 20, "memory.high": "40%"}}),
+}
+
+
+def _normalize(value):
+    return " ".join(str(value).split())
+
+
+class CgroupEngine:
+    # كتابة قيم cgroup v2 مع التحقق، وحفظ القيم السابقة لكل ملف تعريف لإرجاعها عند انتهائه
+    def __init__(self, cgroup_root='/sys/fs/cgroup', state_path=None, proc_root='/proc', profiles=None):
+        self.cgroup_root = cgroup_root
+        self.state_path = state_path
+        self.proc_root = proc_root
+        self.profiles = profiles or PROFILES
+        self._memory_state = {} # عند عدم تحديد state_path
+        self._lock = threading.Lock()
+
+    def path(self, group, name):
+        if name not in CONTROL_FILES: raise CgroupError(f"control file not allowed: {name!r}")
+        group = group.strip("/")
+        if group and (not GROUP_RE.match(group) or ".." in group.split("/")): raise CgroupError(f"invalid cgroup: {group!r}")
+        return os.path.join(self.cgroup_root, group, name)
+
+    def read(self, group, name):
+        try:
+            with open(self.path(group, name)) as f: value = _normalize(f.read())
+        except FileNotFoundError: return None
+        # io.weight قد يتضمن أوزاناً لكل جهاز بعد السطر الأول؛ يُحفظ الافتراضي فقط
+        if name == "io.weight": value = " ".join(value.split()[:2])
+        return value
+
+    def _encode(self, name, value):
+        value = str(value)
+        if name == "memory.high" and value.endswith("%"):
+            value = str(self.mem_total() * int(value[:-1]) // 100 // PAGE_SIZE * PAGE_SIZE)
+        if name == "io.weight" and value.isdigit(): value = f"default {value}"
+        return value
+
+    def _matches(self, name, expected, actual):
+        if actual == expected: return True
+        # النواة تقرّب memory.high إلى حجم الصفحة
+        if name == "memory.high" and expected.isdigit() and actual and actual.isdigit(): return abs(int(actual) - int(expected)) < PAGE_SIZE
+        return False
+
+    def write(self, group, name, value):
+        value = self._encode(name, value)
+        with open(self.path(group, name), "w") as f: f.write(value)
+        actual = self.read(group, name)
+        if not self._matches(name, value, actual): raise CgroupError(f"{group}/{name}: wrote {value!r} but kernel reports {actual!r}")
+        return actual
+
+    def mem_total(self):
+        with open(os.path.join(self.proc_root, "meminfo")) as f:
+            for line in f:
+                if line.startswith("MemTotal:"): return int(line.split()[1]) * 1024
+        raise CgroupError("MemTotal not found")
+
+    def cgroup_of(self, pid):
+        # المسار النسبي لمجموعة العملية في الهرمية الموحدة (السطر 0::)
+        try:
+            with open(os.path.join(self.proc_root, str(pid), "cgroup")) as f:
+                for line in f:
+                    if line.startswith("0::"): return line[3:].strip().strip("/")
+        except OSError: pass
+        return None
+
+    def targets(self, profile, pid=None, uid=None):
+        # [(المجموعة، الملف، القيمة)] و {المجموعة/الملف: سبب التخطي}
+        targets, skipped = [], {}
+        for group, values in profile.background.items():
+            if "{uid}" in group:
+                if uid is None: skipped[group] = "no-uid"; continue
+                group = group.format(uid=int(uid))
+            for name, value in values.items(): targets.append((group, name, value))
+        if profile.foreground and pid is not None:
+            group = self.cgroup_of(pid)
+            if not group: skipped[f"pid:{pid}"] = "no-cgroup"
+            elif any(group == g or group.startswith(g + "/") for g, _, _ in targets): skipped[group] = "inside-background"
+            else: targets.extend((group, name, value) for name, value in profile.foreground.items())
+        return targets, skipped
+
+    def apply(self, name, pid=None, uid=None):
+        # تطبيق كامل أو تراجع كامل؛ الملفات غير الموجودة (متحكم غير مفعّل) تُتخطى
+        profile = self.profiles.get(name)
+        if profile is None: raise CgroupError(f"unknown profile: {name!r}")
+        with self._lock:
+            targets, skipped = self.targets(profile, pid, uid)
+            previous = {}
+            for group, control, value in targets:
+                current = self.read(group, control)
+                if current is None: skipped[f"{group}/{control}"] = "missing"; continue
+                previous[(group, control)] = current
+            applied, written = {}, []
+            try:
+                for group, control, value in targets:
+                    if (group, control) not in previous: continue
+                    new = self.write(group, control, value)
+                    written.append((group, control)); applied[f"{group}/{control}"] = (previous[(group, control)], new)
+            except (OSError, CgroupError) as e:
+                errors = self._rollback([(g, c, previous[(g, c)]) for g, c in written])
+                detail = f"; rollback failed for {', '.join(errors)}" if errors else ""
+                raise CgroupError(f"failed to apply {group}/{control}: {e}{detail}") from e
+            if applied:
+                state = self._load_state(); saved = state.setdefault(name, {})
+                # القيمة الأصلية الأولى تبقى عند تكرار التطبيق
+                for key, (old, _) in applied.items(): saved.setdefault(key, old)
+                self._store_state(state)
+            return {"applied": applied, "skipped": skipped}
+
+    def _rollback(self, values):
+        errors = []
+        for group, control, value in reversed(values):
+            try: self.write(group, control, value)
+            except (OSError, CgroupError): errors.append(f"{group}/{control}")
+        return errors
+
+    def revert(self, name):
+        # المجموعات التي اختفت (انتهى التطبيق) لا تُعد خطأ
+        with self._lock:
+            state = self._load_state()
+            saved = state.get(name)
+            if saved is None: raise CgroupError(f"profile not active: {name!r}")
+            restored, gone, failed = {}, [], {}
+            for key, value in saved.items():
+                group, _, control = key.rpartition("/")
+                if self.read(group, control) is None: gone.append(key); continue
+                try: restored[key] = self.write(group, control, value)
+                except (OSError, CgroupError) as e: failed[key] = str(e)
+            if failed: state[name] = {k: saved[k] for k in failed}
+            else: state.pop(name, None)
+            self._store_state(state)
+            if failed: raise CgroupError(f"failed to revert {', '.join(failed)}")
+            return {"restored": restored, "gone": gone}
+
+    def active(self):
+        with self._lock: return self._load_state()
+
+    def _load_state(self):
+        if not self.state_path: return self._memory_state
+        try:
+            with open(self.state_path) as f: return json.load(f)
+        except FileNotFoundError: return {}
+        except ValueError: print(f"Corrupt cgroup profile state file: {self.state_path}"); return {}
+
+    def _store_state(self, state):
+        if not self.state_path: self._memory_state = state; return
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w") as f: json.dump(state, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.state_path)
@@ -0,0 +1,188 @@
+import fnmatch
+import os
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# كاش "ساخن" تعيد التطبيقات بناءه فوراً بعد حذفه
+HOT_CACHES = ("fontconfig", "mesa_shader_cache", "mesa_shader_cache_db", "nvidia", "radv_builtin_shaders*", "gstreamer-1.0", "ibus")
+DAY = 86400
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB": return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class CleanPolicy:
+    # min_age_days: حذف الملفات غير المستخدمة منذ N يوم فقط؛ max_size: تقليص المجلد إلى هذا الحجم (الأقدم أولاً)
+    def __init__(self, min_age_days=0, max_size=None, remove_empty_dirs=True):
+        self.min_age_days = min_age_days
+        self.max_size = max_size
+        self.remove_empty_dirs = remove_empty_dirs
+
+
+class CachePolicies:
+    # سياسة افتراضية مع سياسات خاصة لكل مجلد فرعي، وقائمة منع وقائمة سماح (أنماط fnmatch)
+    def __init__(self, default=None, overrides=None, deny=(), allow=()):
+        self.default = default or CleanPolicy()
+        self.overrides = dict(overrides or {})
+        self.deny = tuple(deny)
+        self.allow = tuple(allow)
+
+    def for_entry(self, name):
+        # None تعني: لا تلمس هذا المجلد
+        if any(fnmatch.fnmatch(name, p) for p in self.deny): return None
+        if self.allow and not any(fnmatch.fnmatch(name, p) for p in self.allow): return None
+        for pattern, policy in self.overrides.items():
+            if fnmatch.fnmatch(name, pattern): return policy
+        return self.default
+
+
+LIGHT_POLICIES = CachePolicies(CleanPolicy(min_age_days=14), overrides={"thumbnails": CleanPolicy(max_size=128 * 1024 * 1024)}, deny=HOT_CACHES)
+DEEP_POLICIES = CachePolicies(CleanPolicy(), deny=("fontconfig",))
+
+
+class CleanReport:
+    def __init__(self, dry_run):
+        self.dry_run = dry_run
+        self.files = 0
+        self.bytes = 0
+        self.dirs_removed = 0
+        self.scanned_files = 0
+        self.scanned_bytes = 0
+        self.errors = 0
+        self.per_entry = {} # اسم المجلد الفرعي -> [ملفات، بايتات]
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, entry, files, size, scanned_files, scanned_bytes, errors=0):
+        with self._lock:
+            self.files += files; self.bytes += size; self.errors += errors
+            self.scanned_files += scanned_files; self.scanned_bytes += scanned_bytes
+            totals = self.per_entry.setdefault(entry, [0, 0])
+            totals[0] += files; totals[1] += size
+
+    def top(self, n=5):
+        return sorted(self.per_entry.items(), key=lambda item: item[1][1], reverse=True)[:n]
+
+
+class CacheCleaner:
+    # مسح متوازٍ بـ os.scandir: كل مجلد مهمة مستقلة في مجمع الخيوط
+    def __init__(self, root, policies=None, workers=None, dry_run=False, now=None):
+        self.root = os.path.expanduser(root)
+        self.policies = policies or CachePolicies()
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.dry_run = dry_run
+        self.now = now
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _scan(self, path, entry_name, policy, device, report, collected):
+        # يعيد المجلدات الفرعية (المسار، mtime قبل الحذف)؛ الملفات تُحذف مباشرة أو تُجمع إذا كانت السياسة تحتاج max_size
+        subdirs = []; files = size = scanned = scanned_bytes = errors = 0
+        cutoff = self.now - policy.min_age_days * DAY if policy.min_age_days else None
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                        if stat.S_ISDIR(st.st_mode):
+                            if st.st_dev == device: subdirs.append((entry.path, st.st_mtime))
+                            continue
+                        scanned += 1; scanned_bytes += st.st_size
+                        if cutoff is not None and max(st.st_mtime, st.st_atime) > cutoff: continue
+                        if collected is not None: collected.append((max(st.st_mtime, st.st_atime), st.st_size, entry.path)); continue
+                        if not self.dry_run: os.unlink(entry.path)
+                        files += 1; size += st.st_size
+                    except OSError: errors += 1
+        except OSError: errors += 1
+        report.add(entry_name, files, size, scanned, scanned_bytes, errors)
+        return subdirs
+
+    def _trim(self, entry_name, policy, collected, report):
+        # الاحتفاظ بالأحدث حتى max_size وحذف الباقي
+        collected.sort(reverse=True)
+        kept = files = size = errors = 0
+        for _, file_size, path in collected:
+            if kept + file_size <= policy.max_size: kept += file_size; continue
+            try:
+                if not self.dry_run: os.unlink(path)
+                files += 1; size += file_size
+            except OSError: errors += 1
+        report.add(entry_name, files, size, 0, 0, errors)
+
+    def _remove_empty_dirs(self, dirs, policy, report):
+        # نفس شرط العمر للمجلدات (بـ mtime المسجل عند المسح، فحذف ملفاته لا يجعله حديثاً)؛ جذر السياسة لا يُحذف أبداً
+        cutoff = self.now - policy.min_age_days * DAY if policy.min_age_days else None
+        removed = 0
+        for path, mtime in sorted(dirs, key=lambda d: d[0].count(os.sep), reverse=True):
+            if cutoff is not None and mtime > cutoff: continue
+            try: os.rmdir(path); removed += 1
+            except OSError: pass
+        with report._lock: report.dirs_removed += removed
+
+    def run(self):
+        start = time.monotonic()
+        if self.now is None: self.now = time.time()
+        report = CleanReport(self.dry_run)
+        try: device = os.stat(self.root).st_dev
+        except OSError: report.errors += 1; return report
+        tasks = {} # future -> (entry_name, policy, collected)
+        entry_dirs = {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="flashboost-clean") as pool:
+            with os.scandir(self.root) as it:
+                top_entries = list(it)
+            root_policy = self.policies.default
+            collected_by_entry = {}
+            for entry in top_entries:
+                policy = self.policies.for_entry(entry.name)
+                try: is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError: continue
+                if not is_dir: continue
+                if policy is None: continue
+                collected = [] if policy.max_size is not None else None
+                collected_by_entry[entry.name] = (policy, collected)
+                entry_dirs[entry.name] = [] if policy.remove_empty_dirs else None
+                tasks[pool.submit(self._scan, entry.path, entry.name, policy, device, report, collected)] = entry.name
+            # الملفات الموجودة مباشرة في جذر الكاش تخضع للسياسة الافتراضية
+            tasks[pool.submit(self._scan_root_files, top_entries, root_policy, report)] = None
+            while tasks and not self._cancel.is_set():
+                done, _ = wait(tasks, return_when=FIRST_COMPLETED)
+                for future in done:
+                    entry_name = tasks.pop(future)
+                    subdirs = future.result() or []
+                    if entry_name is None: continue
+                    policy, collected = collected_by_entry[entry_name]
+                    if entry_dirs[entry_name] is not None: entry_dirs[entry_name].extend(subdirs)
+                    for subdir, _ in subdirs:
+                        tasks[pool.submit(self._scan, subdir, entry_name, policy, device, report, collected)] = entry_name
+            for future in tasks: future.cancel()
+            if not self._cancel.is_set():
+                for entry_name, (policy, collected) in collected_by_entry.items():
+                    if collected: self._trim(entry_name, policy, collected, report)
+                if not self.dry_run:
+                    for entry_name, dirs in entry_dirs.items():
+                        if dirs: self._remove_empty_dirs(dirs, collected_by_entry[entry_name][0], report)
+        report.duration = time.monotonic() - start
+        return report
+
+    def _scan_root_files(self, entries, policy, report):
+        cutoff = self.now - policy.min_age_days * DAY if policy.min_age_days else None
+        files = size = scanned = scanned_bytes = errors = 0
+        for entry in entries:
+            try:
+                if self.policies.for_entry(entry.name) is None: continue
+                st = entry.stat(follow_symlinks=False)
+                if stat.S_ISDIR(st.st_mode): continue
+                scanned += 1; scanned_bytes += st.st_size
+                if cutoff is not None and max(st.st_mtime, st.st_atime) > cutoff: continue
+                if not self.dry_run: os.unlink(entry.path)
+                files += 1; size += st.st_size
+            except OSError: errors += 1
+        report.add(".", files, size, scanned, scanned_bytes, errors)
+        return []
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# واجهة سطر الأوامر فوق النواة: دون GTK أو psutil أو pygame، لتعمل على الخوادم وتبدأ بسرعة
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from flashboost_core import FlashBoostCore, SystemInfo
+from flashboost_trace import TRACER, default_path as default_trace_path
+
+
+def cmd_status(args):
+    info = SystemInfo(backend=args.backend)
+    try:
+        info.get_cpu_usage(); time.sleep(args.interval) # نسبة المعالج تحتاج قراءتين
+        status = {
+            "timestamp": time.time(),
+            "cpu": info.get_cpu_usage(),
+            "ram": info.get_ram_usage(),
+            "disk": info.get_disk_usage(args.path),
+            "temp": info.get_temperature(),
+            "core_temps": dict(info.get_core_temperatures()),
+        }
+        if args.top:
+            from flashboost_diskindex import DiskIndex
+            index = DiskIndex("/")
+            status["top_dirs"] = index.top(args.top, max_depth=2) if index.load() else []
+    finally: info.close()
+    if args.json:
+        import json
+        print(json.dumps(status, ensure_ascii=False))
+        return 0
+    print(f"CPU:  {status['cpu']:.1f}% ({status['temp']})")
+    print(f"RAM:  {status['ram']:.1f}%")
+    print(f"Disk: {status['disk']:.1f}% ({args.path})")
+    if status["core_temps"]: print("Cores: " + ", ".join(f"{label}: {temp:.0f}°C" for label, temp in status["core_temps"].items()))
+    if status.get("top_dirs"):
+        from flashboost_cleaner import format_bytes
+        for path, size in status["top_dirs"]: print(f"  {format_bytes(size):>9}  {path}")
+    return 0
+
+
+def cmd_list(args):
+    for name, (label, _) in FlashBoostCore.ACTIONS.items(): print(f"{name:<18} {label}")
+    return 0
+
+
+def _headless_core(system_info=None):
+    from flashboost_jobs import DONE, FAILED, CANCELLED
+    finished = threading.Event()
+    def log(msg): print(msg, flush=True)
+    def on_job_update(job, step):
+        if step is None and job.state in (DONE, FAILED, CANCELLED): finished.set()
+    # كمستخدم root لا حاجة لـ pkexec: يُشغَّل المساعد مباشرة
+    launcher = () if os.geteuid() == 0 else ("pkexec",)
+    return FlashBoostCore(log=log, on_job_update=on_job_update, system_info=system_info, helper_launcher=launcher), finished
+
+
+def cmd_run(args):
+    from flashboost_jobs import DONE
+    core, finished = _headless_core()
+    try:
+        params = {"pid": args.pid} if args.action in ("boost", "network-boost") and args.pid else {}
+        # None: تعذر بناء الخطة؛ قائمة فارغة: لا حاجة لأي خطوة (مثل حزم سليمة) وهذا نجاح
+        if args.verify: label, steps = core.plan_verified(args.action, trials=args.trials, **params)
+        else: label, steps = core.plan(args.action, **params); core.log(f"طلب إجراء: {label}")
+        if steps is None: return 1
+        if not steps: return 0
+        job = core.perform_actions(steps, label, args.action)
+        if job is None: return 1
+        signal.signal(signal.SIGINT, lambda signum, frame: core.scheduler.cancel(job))
+        while not finished.wait(0.2): pass
+        return 0 if job.state == DONE else 1
+    finally: core.close()
+
+
+def cmd_top(args):
+    from flashboost_procmon import ProcessMonitor
+    from flashboost_cleaner import format_bytes
+    monitor = ProcessMonitor(track_io=args.sort == "io" or args.json)
+    monitor.sample(); time.sleep(args.interval); monitor.sample()
+    top = monitor.top(args.count, args.sort)
+    if args.json:
+        import json
+        print(json.dumps([{"pid": p.pid, "ppid": p.ppid, "name": p.name, "cmdline": p.cmdline, "uid": p.uid, "cpu": round(p.cpu, 1),
+                           "rss": p.rss, "io_rate": round(p.io_rate), "nice": p.nice, "threads": p.threads} for p in top], ensure_ascii=False))
+        return 0
+    print(f"{'PID':>7} {'CPU%':>6} {'RSS':>9} {'IO/s':>9} {'NI':>3}  COMMAND")
+    for p in top: print(f"{p.pid:>7} {p.cpu:6.1f} {format_bytes(p.rss):>9} {format_bytes(p.io_rate):>9} {p.nice:>3}  {p.cmdline[:80]}")
+    print(f"{len(monitor.procs)} processes, scan {monitor.duration * 1000:.1f} ms")
+    return 0
+
+
+def cmd_tune(args):
+    from flashboost_procmon import parse_cpu_list, IOPRIO_CLASSES
+    from flashboost_jobs import DONE
+    ioclass, _, level = (args.ionice or "").partition(":")
+    if ioclass and ioclass not in IOPRIO_CLASSES: print(f"Unknown I/O class: {ioclass}", file=sys.stderr); return 2
+    if level and not (level.isdigit() and int(level) <= 7): print(f"Invalid I/O level: {level} (expected 0-7)", file=sys.stderr); return 2
+    try: cpus = parse_cpu_list(args.affinity) if args.affinity else None
+    except ValueError as e: print(e, file=sys.stderr); return 2
+    core, finished = _headless_core()
+    try:
+        steps = core.plan_tune_process(args.pid, args.nice, ioclass or None, int(level or 4), cpus, args.tree)
+        job = core.perform_actions(steps, f"ضبط العملية {args.pid}", "tune-process")
+        while not finished.wait(0.2): pass
+        return 0 if job.state == DONE else 1
+    finally: core.close()
+
+
+def cmd_bench(args):
+    from flashboost_probes import PROBES, Summary, run_probes
+    def on_result(name, values):
+        if args.json: return
+        s = Summary(values)
+        print(f"{name:<18} {s.mean:10.2f} ± {s.ci:8.2f} {PROBES[name].unit:<8} (n={s.n})", flush=True)
+    unknown = [name for name in args.probes if name not in PROBES]
+    if unknown: print(f"Unknown probes: {', '.join(unknown)}", file=sys.stderr); return 2
+    results = run_probes(args.probes or list(PROBES), args.trials, on_result=on_result)
+    if args.json:
+        import json
+        print(json.dumps(results))
+    return 0
+
+
+def cmd_exporter(args):
+    from flashboost_sampler import MetricSampler
+    core = FlashBoostCore(log=lambda msg: print(msg, file=sys.stderr, flush=True), system_info=SystemInfo(backend=args.backend))
+    sampler = MetricSampler(core.system_info)
+    try:
+        server = core.start_metrics(args.listen, sampler)
+        if server is None: return 1
+        sampler.start()
+        print(f"Serving OpenMetrics on {args.listen} (/metrics)", file=sys.stderr, flush=True)
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM): signal.signal(signum, lambda signum, frame: stop.set())
+        while not stop.wait(1.0): pass
+        return 0
+    finally: sampler.stop(); core.close()
+
+
+def cmd_autotune(args):
+    core, _ = _headless_core(SystemInfo(backend="procfs"))
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM): signal.signal(signum, lambda signum, frame: stop.set())
+    try:
+        thread = core.start_autotune(args.interval, args.dry_run, args.cooldown)
+        if thread is None: return 1
+        while not stop.wait(1.0) and thread.is_alive(): pass
+        core.stop_autotune(restore=not args.keep)
+        return 0 if stop.is_set() else 1
+    finally: core.close()
+
+
+def cmd_packages(args):
+    from flashboost_dpkg import PackageDB
+    try: health = PackageDB(args.root).check(args.max_age * 3600)
+    except OSError as e: print(f"Cannot read dpkg status: {e}", file=sys.stderr); return 2
+    if args.json:
+        import json
+        print(json.dumps(health.as_dict(), ensure_ascii=False))
+        return 0 if health.healthy else 1
+    print(f"{health.packages} packages checked in {health.duration * 1000:.1f} ms")
+    for name, state in health.unconfigured: print(f"  unconfigured: {name} ({state})")
+    for name in health.reinstall: print(f"  reinstall required: {name}")
+    for name, missing in health.broken.items(): print(f"  broken: {name}: {', '.join(missing)}")
+    if health.interrupted: print("  dpkg was interrupted (pending journal in updates/)")
+    print(f"apt-get update needed: {'yes' if health.update_needed else 'no'} ({health.update_reason})")
+    return 0 if health.healthy else 1
+
+
+def cmd_record(args):
+    from flashboost_history import HistoryRecorder
+    from flashboost_recorder import MetricRecorder
+    history = HistoryRecorder(SystemInfo(backend="procfs"), interval=1.0 / args.rate, capacity=2) # الحلقات غير مستخدمة هنا
+    recorder = MetricRecorder(args.dir, history.cores, args.capacity, args.segments)
+    history.on_collect = recorder.append
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM): signal.signal(signum, lambda signum, frame: stop.set())
+    print(f"Recording {args.rate:g} samples/s to {recorder.directory} (Ctrl+C to stop)", file=sys.stderr, flush=True)
+    try:
+        history.start()
+        while not stop.wait(1.0): pass
+        return 0
+    finally: history.stop(); recorder.close()
+
+
+def cmd_watch(args):
+    from flashboost_watch import load_profiles, WatchError
+    core, _ = _headless_core(SystemInfo(backend="procfs"))
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM): signal.signal(signum, lambda signum, frame: stop.set())
+    try:
+        try: profiles = load_profiles(args.profiles)
+        except WatchError as e: print(f"Invalid profiles: {e}", file=sys.stderr); return 2
+        if core.start_watch(profiles, args.source, args.interval) is None: return 1
+        while not stop.wait(1.0): pass
+        core.stop_watch(revert=True)
+        return 0
+    finally: core.close()
+
+
+def cmd_irq(args):
+    from flashboost_irq import plan_affinity, irqbalance_running, format_cpu_list, AffinityError
+    from flashboost_procmon import parse_cpu_list
+    try: plan = plan_affinity(args.proc_root, args.sys_root, args.mode, args.pid, sorted(parse_cpu_list(args.irq_cpus)) if args.irq_cpus else None)
+    except (AffinityError, ValueError) as e: print(f"Cannot plan affinity: {e}", file=sys.stderr); return 2
+    if args.json:
+        import json
+        print(json.dumps(dict(plan.as_op(), mode=plan.mode, cpus=plan.cpus, nics=plan.nics, skipped=plan.skipped)))
+        return 0
+    print(f"mode {plan.mode}: IRQ/RPS CPUs {format_cpu_list(plan.irq_cpus) or '-'}, application CPUs {format_cpu_list(plan.app_cpus) or '-'}")
+    for iface, irqs in plan.nics.items(): print(f"  {iface}: " + ", ".join(f"{irq}→{format_cpu_list(plan.irqs[irq])}" for irq in irqs))
+    for kind, mapping in (("rps", plan.rps), ("xps", plan.xps)):
+        for queue, cpus in mapping.items(): print(f"  {kind} {queue}: {format_cpu_list(cpus)}")
+    for pid, cpus in plan.threads.items(): print(f"  pid {pid}: {format_cpu_list(cpus)}")
+    for key, reason in plan.skipped.items(): print(f"  skipped {key}: {reason}")
+    if irqbalance_running(args.proc_root): print("warning: irqbalance is running and may override IRQ affinity")
+    print("apply with: flashboost run network-boost [--pid PID] (FLASHBOOST_IRQ_MODE=isolate|spread|off)")
+    return 0
+
+
+def _parse_time(value):
+    # ثوانٍ منذ epoch أو تاريخ ISO بالتوقيت المحلي ("2024-05-01 13:00")
+    try: return float(value)
+    except ValueError: pass
+    from datetime import datetime
+    return datetime.fromisoformat(value).timestamp()
+
+
+def cmd_replay(args):
+    import numpy as np
+    from flashboost_recorder import RecordingSet, FIELDS
+    try: start, end = (_parse_time(v) if v else None for v in (args.start, args.end))
+    except ValueError as e: print(f"Invalid time: {e}", file=sys.stderr); return 2
+    if args.last: start, end = time.time() - args.last, None
+    recordings = RecordingSet(args.dir)
+    try:
+        records = recordings.load(start, end)
+        if records is None: print(f"No samples in {recordings.directory}", file=sys.stderr); return 1
+        columns = {"cpu": records["cpu"]} | {name: records[name] for name in FIELDS}
+        columns |= {f"psi_{resource}": records["psi"][:, i] for i, resource in enumerate(("cpu", "memory", "io"))}
+        stats = {}
+        with np.errstate(invalid="ignore"):
+            for name, values in columns.items():
+                values = values[~np.isnan(values)]
+                stats[name] = {"min": float(values.min()), "mean": float(values.mean()), "max": float(values.max())} if values.size else None
+    finally: recordings.close()
+    first, last = float(records["t"][0]), float(records["t"][-1])
+    if args.json:
+        import json
+        print(json.dumps({"samples": len(records), "start": first, "end": last, "stats": stats}))
+        return 0
+    stamp = lambda t: time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t))
+    print(f"{len(records)} samples from {stamp(first)} to {stamp(last)}")
+    for name, values in stats.items():
+        if values is None: print(f"  {name:<12} n/a"); continue
+        print(f"  {name:<12} min {values['min']:>14.2f}  mean {values['mean']:>14.2f}  max {values['max']:>14.2f}")
+    return 0
+
+
+def _gui_pid():
+    # ملف القفل الذي تكتبه الواجهة (GLib.get_user_runtime_dir) ويحوي رقم عمليتها
+    path = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or os.path.expanduser("~/.cache"), "flashboost_app.lock")
+    try:
+        with open(path) as f: return int(f.read().strip())
+    except (OSError, ValueError): return None
+
+
+def _write_trace(path):
+    try: count = TRACER.export(path)
+    except OSError as e: print(f"Cannot write trace: {e}", file=sys.stderr); return
+    dropped = f", {TRACER.dropped} oldest dropped" if TRACER.dropped else ""
+    print(f"Trace written to {path} ({count} events{dropped})", file=sys.stderr)
+
+
+def _toggle_trace(signum, frame):
+    # SIGUSR1: تبديل التتبع في الأوامر الطويلة (exporter، autotune، record، watch)؛ الإيقاف يحفظ الملف
+    if not TRACER.enabled: TRACER.enable(); print("Tracing started", file=sys.stderr); return
+    TRACER.disable(); _write_trace(default_trace_path())
+
+
+def cmd_trace(args):
+    if args.summary:
+        import json
+        try:
+            with open(args.summary) as f: events = json.load(f).get("traceEvents", [])
+        except (OSError, ValueError, AttributeError) as e: print(f"Cannot read trace: {e}", file=sys.stderr); return 2
+        from flashboost_trace import summarize
+        totals = sorted(summarize(events).items(), key=lambda item: item[1][1], reverse=True)
+        print(f"{'CATEGORY':<10} {'NAME':<32} {'COUNT':>7} {'TOTAL ms':>11} {'MEAN ms':>9} {'MAX ms':>9}")
+        for (cat, name), (count, total, longest) in totals[:args.count]:
+            print(f"{cat:<10} {name[:32]:<32} {count:>7} {total:>11.2f} {total / count:>9.2f} {longest:>9.2f}")
+        return 0
+    pid = args.pid or _gui_pid()
+    if pid is None: print("FlashBoost window not running (no lock file); use --pid", file=sys.stderr); return 1
+    try: os.kill(pid, signal.SIGUSR1)
+    except OSError as e: print(f"Cannot signal {pid}: {e}", file=sys.stderr); return 1
+    print(f"Toggled tracing in process {pid} (the trace is saved when it is switched off)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="flashboost", description="FlashBoost headless front end")
+    parser.add_argument("--trace", metavar="FILE", help="record spans for this command and write them as a Chrome trace (chrome://tracing, Perfetto)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    status = sub.add_parser("status", help="print current CPU/RAM/disk/temperature")
+    status.add_argument("--json", action="store_true")
+    status.add_argument("--interval", type=float, default=0.1, help="CPU sampling window in seconds")
+    status.add_argument("--path", default="/", help="filesystem for disk usage")
+    status.add_argument("--top", type=int, default=0, help="largest directories from the saved disk index")
+    status.add_argument("--backend", default=os.environ.get("FLASHBOOST_METRICS_BACKEND", "procfs"), choices=("procfs", "psutil"))
+    status.set_defaults(func=cmd_status)
+    run = sub.add_parser("run", help="run an action and wait for it to finish")
+    run.add_argument("action", choices=list(FlashBoostCore.ACTIONS))
+    run.add_argument("--pid", type=int, default=None, help="process to renice (boost) or pin away from NIC interrupts (network-boost)")
+    run.add_argument("--verify", action="store_true", help="run local probes before and after and report the deltas")
+    run.add_argument("--trials", type=int, default=10, help="trials per probe with --verify")
+    run.set_defaults(func=cmd_run)
+    top = sub.add_parser("top", help="top processes by CPU, RSS or I/O")
+    top.add_argument("--sort", default="cpu", choices=("cpu", "rss", "io"))
+    top.add_argument("-n", "--count", type=int, default=15)
+    top.add_argument("--interval", type=float, default=1.0, help="seconds between the two scans")
+    top.add_argument("--json", action="store_true")
+    top.set_defaults(func=cmd_top)
+    tune = sub.add_parser("tune", help="renice / ionice / set CPU affinity of a process")
+    tune.add_argument("pid", type=int)
+    tune.add_argument("--nice", type=int, choices=range(-20, 20), metavar="-20..19")
+    tune.add_argument("--ionice", help="CLASS[:LEVEL], CLASS one of none, realtime, best-effort, idle")
+    tune.add_argument("--affinity", help="CPU list, e.g. 0-3,6")
+    tune.add_argument("--tree", action="store_true", help="apply to the process and all its descendants")
+    tune.set_defaults(func=cmd_tune)
+    bench = sub.add_parser("bench", help="run the local probes once (mean and 95%% confidence interval)")
+    bench.add_argument("probes", nargs="*", help="tcp_rtt, wakeup, page_faults, memory_bandwidth, file_read (default: all)")
+    bench.add_argument("--trials", type=int, default=10)
+    bench.add_argument("--json", action="store_true", help="print raw trial values")
+    bench.set_defaults(func=cmd_bench)
+    sub.add_parser("list", help="list available actions").set_defaults(func=cmd_list)
+    exporter = sub.add_parser("exporter", help="serve system metrics in OpenMetrics format")
+    exporter.add_argument("--listen", default=os.environ.get("FLASHBOOST_METRICS_LISTEN", "127.0.0.1:9477"), help="HOST:PORT or unix:/path")
+    exporter.add_argument("--backend", default=os.environ.get("FLASHBOOST_METRICS_BACKEND", "procfs"), choices=("procfs", "psutil"))
+    exporter.set_defaults(func=cmd_exporter)
+    packages = sub.add_parser("packages", help="check dpkg package health without running apt (exit 1 if repairs are needed)")
+    packages.add_argument("--root", default=os.environ.get("FLASHBOOST_DPKG_ROOT", "/"), help="root holding var/lib/dpkg and etc/apt")
+    packages.add_argument("--max-age", type=float, default=24.0, help="hours after which package lists count as stale")
+    packages.add_argument("--json", action="store_true")
+    packages.set_defaults(func=cmd_packages)
+    autotune = sub.add_parser("autotune", help="adjust vm.swappiness / vm.vfs_cache_pressure from memory and I/O pressure (PSI) until stopped")
+    autotune.add_argument("--interval", type=float, default=5.0, help="seconds between checks when no PSI trigger fires")
+    autotune.add_argument("--cooldown", type=float, default=30.0, help="minimum seconds between changes of the same key")
+    autotune.add_argument("--dry-run", action="store_true", help="log decisions without applying them")
+    autotune.add_argument("--keep", action="store_true", help="keep the tuned values on exit instead of restoring the originals")
+    autotune.set_defaults(func=cmd_autotune)
+    record = sub.add_parser("record", help="record CPU/memory/disk/network/temperature/PSI samples to memory-mapped files until stopped")
+    record.add_argument("--dir", default=None, help="recording directory (default: $FLASHBOOST_RECORD_DIR or ~/.local/share/flashboost/recordings)")
+    record.add_argument("--rate", type=float, default=1.0, help="samples per second (1-100)")
+    record.add_argument("--capacity", type=int, default=86400, help="samples per segment file")
+    record.add_argument("--segments", type=int, default=8, help="segment files kept before the oldest is deleted")
+    record.set_defaults(func=cmd_record)
+    replay = sub.add_parser("replay", help="summarise recorded samples (min/mean/max) over a time range")
+    replay.add_argument("--dir", default=None, help="recording directory")
+    replay.add_argument("--start", help="epoch seconds or ISO date/time")
+    replay.add_argument("--end", help="epoch seconds or ISO date/time")
+    replay.add_argument("--last", type=float, help="only the last N seconds")
+    replay.add_argument("--json", action="store_true")
+    replay.set_defaults(func=cmd_replay)
+    watch = sub.add_parser("watch", help="apply per-application profiles while matching programs run, until stopped")
+    watch.add_argument("--profiles", default=None, help="profiles JSON (default: $FLASHBOOST_PROFILES or ~/.config/flashboost/profiles.json)")
+    watch.add_argument("--source", default="auto", choices=("auto", "connector", "poll"), help="proc connector (needs CAP_NET_ADMIN) or /proc polling")
+    watch.add_argument("--interval", type=float, default=0.5, help="polling interval in seconds")
+    watch.set_defaults(func=cmd_watch)
+    irq = sub.add_parser("irq", help="show the NIC interrupt / RPS / XPS / CPU pinning plan used by network-boost (read only)")
+    irq.add_argument("--mode", default=os.environ.get("FLASHBOOST_IRQ_MODE", "isolate"), choices=("isolate", "spread"))
+    irq.add_argument("--pid", type=int, default=None, help="process whose threads get the remaining CPUs (isolate)")
+    irq.add_argument("--irq-cpus", default=None, help="CPU list for interrupts and RPS, e.g. 0-1 (default: first quarter)")
+    irq.add_argument("--proc-root", default="/proc")
+    irq.add_argument("--sys-root", default="/sys")
+    irq.add_argument("--json", action="store_true")
+    irq.set_defaults(func=cmd_irq)
+    trace = sub.add_parser("trace", help="toggle span tracing in a running FlashBoost (SIGUSR1), or summarise a saved trace")
+    trace.add_argument("--pid", type=int, default=None, help="process to toggle (default: the FlashBoost window)")
+    trace.add_argument("--summary", metavar="FILE", help="print total/mean/max time per span from a trace file")
+    trace.add_argument("-n", "--count", type=int, default=25, help="spans shown with --summary")
+    trace.set_defaults(func=cmd_trace)
+    args = parser.parse_args(argv)
+    if args.command == "record" and not 1 <= args.rate <= 100: parser.error("--rate must be between 1 and 100")
+    if args.trace: TRACER.enable()
+    if args.command != "trace": signal.signal(signal.SIGUSR1, _toggle_trace)
+    try: return args.func(args)
+    finally:
+        # FLASHBOOST_TRACE=1 دون --trace: المسار الافتراضي
+        if TRACER.enabled: TRACER.disable(); _write_trace(args.trace or default_trace_path())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,763 @@
+import os
+import threading
+import time
+from flashboost_procfs import ProcReader, ThermalSensors
+
+# نواة التطبيق دون GTK: القياس والعمليات والضبط، تستخدمها الواجهة الرسومية وسطر الأوامر
+# الوحدات الثقيلة (psutil، المساعد، المنظف، فهرس القرص) تُستورد عند أول استخدام فقط،
+# وكذلك المجدول والمقاييس: "status" يحتاج SystemInfo فقط ويجب أن يبدأ بسرعة
+
+
+class SystemInfo:
+    def __init__(self, backend="psutil", proc_root='/proc', sys_root='/sys'):
+        # backend: "psutil" (الافتراضي) أو "procfs" للقراءة المباشرة من /proc و /sys
+        if backend not in ("psutil", "procfs"): raise ValueError(f"Unknown metrics backend: {backend}")
+        self.backend = backend
+        self.proc_root = proc_root
+        self.sys_root = sys_root
+        self.reader = ProcReader(proc_root, sys_root) if backend == "procfs" else None
+        self.thermal = ThermalSensors(sys_root)
+        self._caps = None
+        self._psutil = None
+        self._fallback_temp = None # (موعد إعادة السؤال، النص) لـ psutil عند غياب حساسات hwmon
+
+    @property
+    def psutil(self):
+        if self._psutil is None:
+            import psutil
+            self._psutil = psutil
+        return self._psutil
+
+    def get_cpu_usage(self):
+        try:
+            if self.reader: return self.reader.cpu_percent()
+            return self.psutil.cpu_percent(interval=None)
+        except Exception as e:
+            print(f"Error getting CPU usage: {e}")
+            return 0.0
+
+    def get_ram_usage(self):
+        try:
+            if self.reader: return self.reader.ram_percent()
+            return self.psutil.virtual_memory().percent
+        except Exception as e:
+            print(f"Error getting RAM usage: {e}")
+            return 0.0
+
+    def get_disk_usage(self, path='/'):
+        try:
+            if self.reader: return self.reader.disk_percent(path)
+            return self.psutil.disk_usage(path).percent
+        except FileNotFoundError:
+            print(f"Error getting disk usage: Path '{path}' not found.")
+            return 0.0
+        except Exception as e:
+            print(f"Error getting disk usage for '{path}': {e}")
+            return 0.0
+
+    def get_temperature(self):
+        temp_str = "N/A"
+        try:
+            # المسار يُكتشف مرة واحدة ثم يُقرأ ملف temp*_input واحد فقط
+            temp = self.thermal.read_primary()
+            if temp is not None: return f"{temp:.0f}°C"
+        except Exception as e: print(f"Error reading hwmon temperature: {e}")
+        if self.backend == "procfs" or self.thermal.sensors: return temp_str
+        # sensors_temperatures يمسح كل الحساسات: نتيجته تُحفظ حتى موعد إعادة الاكتشاف التالي مثل ThermalSensors
+        now = time.monotonic()
+        if self._fallback_temp and now < self._fallback_temp[0]: return self._fallback_temp[1]
+        try:
+            temps = self.psutil.sensors_temperatures()
+            core_temps = temps.get('coretemp', []) or temps.get('k10temp', []) or temps.get('acpitz', [])
+            if core_temps:
+                package_temp = next((t.current for t in core_temps if 'Package' in t.label or 'Tdie' in t.label), None)
+                if package_temp:
+                    temp_str = f"{package_temp:.0f}°C"
+                else:
+                    temp_str = f"{core_temps[0].current:.0f}°C"
+            else:
+                for sensor_list in temps.values():
+                    if sensor_list:
+                        temp_str = f"{sensor_list[0].current:.0f}°C"; break
+        except AttributeError: pass
+        except Exception as e: print(f"Error getting temperature: {e}")
+        self._fallback_temp = (now + self.thermal.rescan_interval, temp_str)
+        return temp_str
+
+    def get_core_temperatures(self):
+        try: return [(label, temp) for label, temp in self.thermal.read_cores() if temp is not None]
+        except Exception as e: print(f"Error getting core temperatures: {e}"); return []
+
+    def get_all_temperatures(self):
+        try: return [(chip, label, temp) for chip, label, temp in self.thermal.read_all() if temp is not None]
+        except Exception as e: print(f"Error getting temperatures: {e}"); return []
+
+    @property
+    def caps(self):
+        if self._caps is None:
+            from flashboost_caps import CapabilityIndex
+            self._caps = CapabilityIndex()
+        return self._caps
+
+    def find_active_wifi_interface(self):
+        # من /sys/class/net مباشرة (wireless/phy80211 و operstate) دون تشغيل ip أو iw
+        from flashboost_caps import active_wifi_interface
+        try: return active_wifi_interface(self.sys_root)
+        except Exception as e: print(f"Error finding WiFi interface: {e}")
+        return None
+
+    def check_command_exists(self, command):
+        return self.caps.has(command)
+
+    def close(self):
+        if self.reader: self.reader.close()
+        self.thermal.close()
+
+
+class FlashBoostCore:
+    # اسم العملية -> (العنوان، دالة بناء الخطوات)
+    ACTIONS = {
+        "light-clean": ("تنظيف خفيف", "plan_light_clean"),
+        "deep-clean": ("تنظيف عميق", "plan_deep_clean"),
+        "fix-packages": ("إصلاح الحزم", "plan_fix_packages"),
+        "boost": ("تعزيز الأداء", "plan_boost"),
+        "network-boost": ("تعزيز الشبكة والألعاب", "plan_network_boost"),
+        "preview-clean": ("معاينة التنظيف", "plan_preview_clean"),
+        "analyze-disk": ("تحليل القرص", "plan_analyze_disk"),
+        "restore-defaults": ("استعادة الإعدادات", "plan_restore_defaults"),
+        "startup-tuning": ("ضبط إعدادات الأداء الأولية", "plan_startup_tuning"),
+    }
+    # بدلاً من إيقاف الخدمات: أوزان cgroup v2 تُرجع عند الاستعادة أو عند انتهاء التطبيق المُعزز
+    BOOST_PROFILE = "boost"
+    STARTUP_SYSCTL = {"vm.swappiness": 10, "vm.vfs_cache_pressure": 50}
+    NETWORK_TWEAKS = {"net.ipv4.tcp_low_latency": 1, "net.core.netdev_max_backlog": 50000, "net.ipv4.tcp_timestamps": 0, "net.ipv4.tcp_sack": 1}
+    PAGECACHE_TARGETS = ("~/.cache",)
+    # القياسات المحلية التي يُتوقع أن تتأثر بكل عملية (للقياس قبل/بعد)
+    ACTION_PROBES = {"boost": ("wakeup", "page_faults", "memory_bandwidth", "file_read"), "network-boost": ("tcp_rtt", "wakeup")}
+    DEFAULT_PROBES = ("wakeup", "memory_bandwidth", "file_read")
+    VERDICT_LABELS = {"improved": "تحسن", "regressed": "تراجع", "unchanged": "لا تغير يُعتد به"}
+    SYSCTL_SKIP_REASONS = {"missing": "غير موجود في هذه النواة", "noop": "بلا تأثير في هذه النواة"}
+    AUTOTUNE_SNAPSHOT = "autotune"
+    AUTOTUNE_REASONS = {"memory-swap": "ضغط ذاكرة مع مبادلة داخلة", "memory-cache": "ضغط ذاكرة دون مبادلة (طرد كاش الملفات)",
+                        "memory": "ضغط ذاكرة", "io": "ضغط إدخال/إخراج", "relax": "زوال الضغط"}
+    PACKAGE_UPDATE_REASONS = {"missing-lists": "قوائم الحزم غير موجودة", "sources-changed": "المصادر تغيرت بعد آخر تحديث",
+                              "stale": "قوائم الحزم أقدم من يوم", "fresh": "قوائم الحزم حديثة", "no-sources": "لا توجد مصادر apt"}
+    PACKAGE_REPAIR_LABELS = {"update": "apt-get update", "configure": "dpkg --configure -a", "fix-broken": "apt-get install --fix-broken"}
+    AFFINITY_SNAPSHOT = "game-boost"
+    APPS_SNAPSHOT = "apps" # لقطة sysctl مشتركة لكل ملفات التطبيقات النشطة
+    AFFINITY_SKIP_REASONS = {"missing": "غير موجود", "managed": "مقاطعة تديرها النواة", "gone": "انتهت العملية",
+                             "single-cpu": "نواة واحدة فقط", "no-nic": "لا توجد بطاقة شبكة فعلية", "no-rps": "RPS غير مدعوم",
+                             "spread": "وضع التوزيع لا يثبت التطبيق"}
+    CGROUP_SKIP_REASONS = {"missing": "المتحكم غير مفعّل أو المجموعة غير موجودة", "no-uid": "لا يوجد مستخدم",
+                           "no-cgroup": "العملية خارج cgroup v2", "inside-background": "العملية ضمن مجموعة خلفية"}
+
+    def __init__(self, log=print, play_sound=None, on_job_update=None, system_info=None, helper_launcher=("pkexec",), max_workers=3):
+        from flashboost_jobs import JobScheduler
+        from flashboost_metrics import FlashBoostMetrics
+        self.log = log
+        self.play_sound = play_sound or (lambda sound_type: None)
+        self.on_job_update = on_job_update # لتحديث الواجهة بعد رسائل السجل
+        self.system_info = system_info or SystemInfo(backend=os.environ.get("FLASHBOOST_METRICS_BACKEND", "psutil"))
+        self.scheduler = JobScheduler(max_workers=max_workers, on_update=self._on_job_update)
+        self.disk_indexes = {} # نقطة التثبيت -> DiskIndex
+        self.metrics = FlashBoostMetrics()
+        self.helper_launcher = tuple(helper_launcher)
+        self._helper = None
+        self._helper_lock = threading.Lock()
+        self._closing = threading.Event()
+        self._autotune = None # (الخيط، حدث الإيقاف)
+        self._autotune_applied = False
+        self.dpkg_root = os.environ.get("FLASHBOOST_DPKG_ROOT", "/")
+        self._package_db = None
+        self.affinity_mode = os.environ.get("FLASHBOOST_IRQ_MODE", "isolate") # isolate أو spread أو off
+        self._watch = None # (الخيط، حدث الإيقاف، AppWatcher)
+        self._app_active = {} # اسم ملف التطبيق -> AppProfile بترتيب البدء
+        self._app_original = {} # "governor" و "wifi" قبل أول ملف غيّرهما
+
+    @property
+    def helper(self):
+        # يُنشأ عند أول عملية بصلاحيات (مصادقة واحدة لكل جلسة)
+        with self._helper_lock:
+            if self._helper is None:
+                from flashboost_helper import PrivilegedHelper
+                self._helper = PrivilegedHelper(launcher=self.helper_launcher)
+            return self._helper
+
+    def _on_job_update(self, job, step):
+        # يُستدعى من خيوط المجدول
+        from flashboost_jobs import RUNNING, DONE, FAILED, CANCELLED, SKIPPED
+        if step is None and job.state == RUNNING:
+            self.log(f"⏳ بدء: {job.name}..."); self.play_sound("info")
+        elif step is None and job.state == DONE: self.play_sound("success"); self.log(f"🎉 اكتمل بنجاح: {job.name} ({job.duration:.1f} ث)")
+        elif step is None and job.state == CANCELLED: self.play_sound("error"); self.log(f"⏹ أُلغيت: {job.name}")
+        elif step is None and job.state == FAILED: self.play_sound("error"); self.log(f"⚠️ اكتمل مع أخطاء: {job.name}")
+        elif step is not None and step.state == SKIPPED and not job.cancelled: self.log(f"  ↷ تم تخطي: {step.label}")
+        if step is None and job.state in (DONE, FAILED, CANCELLED): self.metrics.record_job(job)
+        if self.on_job_update: self.on_job_update(job, step)
+
+    def group_privileged_commands(self, cmds):
+        # دمج أوامر pkexec المتتالية في استدعاء واحد لتقليل نوافذ المصادقة
+        command_list_to_run = []; pkexec_group = []
+        for cmd in cmds:
+            if cmd.strip().startswith("pkexec"): pkexec_group.append(cmd.strip().replace("pkexec ", "", 1))
+            else:
+                if pkexec_group:
+                    command_list_to_run.append(f"pkexec sh -c \"{' && '.join(pkexec_group)}\""); pkexec_group = []
+                command_list_to_run.append(cmd)
+        if pkexec_group: command_list_to_run.append(f"pkexec sh -c \"{' && '.join(pkexec_group)}\"")
+        return command_list_to_run
+
+    def describe_helper_op(self, op):
+        kind = op["op"]
+        if kind == "write_sysctl": return f"sysctl {op['key']}={op['value']}"
+        if kind == "apply_sysctl": return f"sysctl: {', '.join(f'{k}={v}' for k, v in op['settings'].items())}"
+        if kind == "restore_sysctl": return f"استعادة إعدادات sysctl ({op['name']})"
+        if kind == "apply_cgroup_profile": return f"ملف موارد cgroup '{op['profile']}'" + (f" (PID: {op['pid']})" if op.get("pid") else "")
+        if kind == "revert_cgroup_profile": return f"إرجاع ملف موارد cgroup '{op['profile']}'"
+        if kind == "renice": return f"renice {op['nice']} (PID: {op['pid']})"
+        if kind == "ionice": return f"ionice {op['ioclass']}{'' if op['ioclass'] in ('none', 'idle') else ':' + str(op.get('level', 4))} (PID: {op['pid']})"
+        if kind == "set_affinity": return f"affinity {','.join(map(str, op['cpus']))} (PID: {op['pid']})"
+        if kind == "apply_affinity":
+            from flashboost_irq import format_cpu_list
+            parts = [f"{len(op['irqs'])} مقاطعة" if op.get("irqs") else "", f"RPS لـ {len(op['rps'])} طابور" if op.get("rps") else "",
+                     f"XPS لـ {len(op['xps'])} طابور" if op.get("xps") else "", ", ".join(f"PID {p} → {format_cpu_list(c)}" for p, c in (op.get("threads") or {}).items())]
+            return f"توجيه المقاطعات والأنوية: {'، '.join(filter(None, parts))}"
+        if kind == "restore_affinity": return f"استعادة توجيه المقاطعات والأنوية ({op['name']})"
+        if kind == "vacuum_journal": return f"تقليص سجلات journal إلى {op['max_size']}"
+        if kind == "set_governor": return f"حاكم المعالج: {op['governor']}"
+        if kind == "repair_packages": return self.PACKAGE_REPAIR_LABELS.get(op["step"], op["step"])
+        if kind == "wifi_power_save": return f"توفير الطاقة لـ '{op['iface']}': {'تشغيل' if op['enabled'] else 'إيقاف'}"
+        return kind
+
+    def helper_step(self, name, ops, deps=(), label=None):
+        from flashboost_jobs import Step
+        return Step(name, lambda job: self.run_helper_ops(job, ops), deps, label)
+
+    def run_helper_ops(self, job, ops, progress=False):
+        # دفعة واحدة من العمليات المحددة عبر المساعد الدائم بدلاً من pkexec sh -c
+        from flashboost_helper import HelperError
+        self.log(f"  ‹‹ عمليات بصلاحيات ({len(ops)})")
+        last_progress = [-10]
+        def on_progress(percent, message):
+            # كل خطوة apt تبدأ من 0 من جديد
+            if percent < last_progress[0] or percent - last_progress[0] >= 10 or percent >= 100:
+                last_progress[0] = percent; self.log(f"     ⏳ {percent:.0f}% {message}")
+        try: results = self.helper.call(ops, on_progress=on_progress if progress else None)
+        except HelperError as e: self.log(f"  ❌ فشل الاتصال بالمساعد: {e}"); return False
+        for op, result in zip(ops, results):
+            self.metrics.record_helper_op(op, result["ok"])
+            if result["ok"]: self.log(f"     ✓ {self.describe_helper_op(op)}"); self._log_helper_report(op, result["value"])
+            else: self.log(f"     ✗ {self.describe_helper_op(op)}: {result['error']}")
+        if len(results) < len(ops): self.log(f"     تم إيقاف {len(ops) - len(results)} عمليات بعد الفشل.")
+        return len(results) == len(ops) and all(r["ok"] for r in results)
+
+    def _log_helper_report(self, op, value):
+        if op["op"] == "repair_packages":
+            for line in value or (): self.log(f"       {line}")
+        if not isinstance(value, dict): return
+        cgroup = op["op"] in ("apply_cgroup_profile", "revert_cgroup_profile")
+        affinity = op["op"] in ("apply_affinity", "restore_affinity")
+        for key, (old, new) in value.get("applied", {}).items(): self.log(f"       {key}: {old} → {new}")
+        for key, new in value.get("restored", {}).items(): self.log(f"       {key} ← {new}")
+        if value.get("gone"): self.log(f"       ↷ {len(value['gone'])} {'عنصر (مقاطعة أو خيط)' if affinity else 'مجموعة'} لم يعد موجوداً")
+        reasons = self.CGROUP_SKIP_REASONS if cgroup else self.AFFINITY_SKIP_REASONS if affinity else self.SYSCTL_SKIP_REASONS
+        for key, reason in value.get("skipped", {}).items(): self.log(f"       ↷ تم تخطي {key}: {reasons.get(reason, reason)}")
+
+    def restore_sysctl_snapshots(self, job):
+        from flashboost_helper import HelperError
+        try: names = sorted(self.helper.call([{"op": "sysctl_snapshots"}])[0].get("value") or {})
+        except HelperError as e: self.log(f"  ❌ فشل الاتصال بالمساعد: {e}"); return False
+        if not names: self.log("  لا توجد تعديلات محفوظة لاستعادتها."); return True
+        return self.run_helper_ops(job, [{"op": "restore_sysctl", "name": name} for name in names])
+
+    def revert_cgroup_profiles(self, job):
+        from flashboost_helper import HelperError
+        try: names = sorted(self.helper.call([{"op": "cgroup_profiles"}])[0].get("value") or {})
+        except HelperError as e: self.log(f"  ❌ فشل الاتصال بالمساعد: {e}"); return False
+        if not names: self.log("  لا توجد ملفات موارد cgroup نشطة."); return True
+        return self.run_helper_ops(job, [{"op": "revert_cgroup_profile", "profile": name} for name in names])
+
+    def restore_affinity_snapshots(self, job):
+        from flashboost_helper import HelperError
+        try: names = sorted(self.helper.call([{"op": "affinity_snapshots"}])[0].get("value") or {})
+        except HelperError as e: self.log(f"  ❌ فشل الاتصال بالمساعد: {e}"); return False
+        if not names: self.log("  لا يوجد توجيه مقاطعات محفوظ لاستعادته."); return True
+        return self.run_helper_ops(job, [{"op": "restore_affinity", "name": name} for name in names])
+
+    def run_boost(self, job, pid):
+        ops = [{"op": "apply_cgroup_profile", "profile": self.BOOST_PROFILE, "pid": pid},
+               {"op": "renice", "pid": pid, "nice": -10}]
+        ok = self.run_helper_ops(job, ops)
+        if ok and pid != os.getpid(): self.watch_profile_owner(pid, self.BOOST_PROFILE)
+        return ok
+
+    def watch_profile_owner(self, pid, profile):
+        # إرجاع ملف الموارد تلقائياً عند انتهاء التطبيق المُعزز (pidfd يصبح قابلاً للقراءة عند الخروج)
+        import select
+        try: fd = os.pidfd_open(pid)
+        except (AttributeError, OSError) as e: print(f"pidfd_open({pid}) error: {e}"); return None
+        def wait():
+            poller = select.poll(); poller.register(fd, select.POLLIN)
+            try:
+                while not self._closing.is_set():
+                    if poller.poll(1000): break
+                else: return
+            finally: os.close(fd)
+            self.log(f"↩️ انتهت العملية {pid}: إرجاع ملف الموارد '{profile}'")
+            op = {"op": "revert_cgroup_profile", "profile": profile}
+            self.perform_actions([self.helper_step("cgroups", [op], label="إرجاع موارد cgroup")], "إرجاع موارد cgroup")
+        thread = threading.Thread(target=wait, name=f"flashboost-watch-{pid}", daemon=True); thread.start()
+        return thread
+
+    def cleaner_step(self, name, policies, dry_run=False, deps=(), label=None):
+        from flashboost_jobs import Step
+        return Step(name, lambda job: self.run_cleaner(job, policies, dry_run, label or name), deps, label)
+
+    def run_cleaner(self, job, policies, dry_run, label):
+        from flashboost_cleaner import CacheCleaner, format_bytes
+        cleaner = CacheCleaner("~/.cache", policies, dry_run=dry_run)
+        job.on_cancel(cleaner.cancel)
+        report = cleaner.run()
+        if job.cancelled: return False
+        if dry_run:
+            indexed = self.indexed_size("~/.cache")
+            if indexed is not None: self.log(f"  📂 حجم ~/.cache حسب فهرس القرص: {format_bytes(indexed)}")
+        verb = "يمكن تحرير" if dry_run else "تم تحرير"
+        self.log(f"  🧹 {label}: {verb} {format_bytes(report.bytes)} ({report.files} ملف من أصل {report.scanned_files}) في {report.duration:.1f} ث")
+        for entry, (files, size) in report.top(5):
+            if size: self.log(f"       {entry}: {format_bytes(size)} ({files} ملف)")
+        if report.errors: self.log(f"       ⚠️ تعذر الوصول إلى {report.errors} عنصر.")
+        return True
+
+    def pagecache_step(self, name, targets=None, reclaim_bytes=0, deps=(), label=None):
+        from flashboost_jobs import Step
+        return Step(name, lambda job: self.run_pagecache_reclaim(targets or self.PAGECACHE_TARGETS, reclaim_bytes), deps, label)
+
+    def run_pagecache_reclaim(self, targets, reclaim_bytes):
+        # بدلاً من drop_caches الشامل: إخراج صفحات المسارات المحددة فقط، و memory.reclaim لمجموعة الجلسة
+        from flashboost_cleaner import format_bytes
+        from flashboost_pagecache import residency, evict, cgroup_reclaim, session_cgroup
+        before = residency(targets)
+        evicted, errors = evict(targets)
+        cgroup = session_cgroup() if reclaim_bytes else None
+        reclaimed = cgroup_reclaim(reclaim_bytes, cgroup) if cgroup else False
+        after = residency(targets)
+        self.log(f"  📉 كاش الصفحة ({', '.join(targets)}، {evicted} ملف): قبل {format_bytes(before.resident_bytes)} ({before.percent:.0f}%)، "
+                 f"بعد {format_bytes(after.resident_bytes)} ({after.percent:.0f}%)")
+        if reclaimed: self.log(f"       ✓ memory.reclaim ({format_bytes(reclaim_bytes)}) لـ {os.path.basename(cgroup)}")
+        elif reclaim_bytes: self.log("       - memory.reclaim غير متاح (cgroup v2 / نواة 5.19+).")
+        if errors: self.log(f"       ⚠️ تعذر الوصول إلى {errors} ملف.")
+        return True
+
+    def command_step(self, name, cmds, deps=(), label=None):
+        from flashboost_jobs import Step
+        return Step(name, lambda job: self.run_commands(job, cmds), deps, label)
+
+    def run_commands(self, job, cmds):
+        from flashboost_exec import CommandRunner
+        command_list_to_run = [cmds] if isinstance(cmds, str) else self.group_privileged_commands(cmds)
+        last_progress = [-10]
+        def on_line(stream, line, quiet_stdout=False):
+            if not line.strip() or (stream == "stdout" and quiet_stdout): return
+            self.log(f"     {'! ' if stream == 'stderr' else ''}{line}")
+        def on_progress(percent, message):
+            if percent - last_progress[0] >= 10 or percent >= 100:
+                last_progress[0] = percent; self.log(f"     ⏳ {percent:.0f}% {message}")
+        runner = CommandRunner(on_progress=on_progress)
+        job.on_cancel(runner.cancel)
+
+        for cmd_to_run in command_list_to_run:
+             is_pkexec_group = cmd_to_run.startswith("pkexec sh -c"); log_cmd_display = cmd_to_run; inner_cmds = []
+             if is_pkexec_group:
+                inner_cmds = cmd_to_run.split('"')[1].split('&&'); log_cmd_display = f"مجموعة أوامر بصلاحيات ({len(inner_cmds)})"
+             elif cmd_to_run.strip().startswith(("sync", "find")): log_cmd_display = None # تخطي تسجيل الأوامر البسيطة
+             if log_cmd_display: self.log(f"  ‹‹ {log_cmd_display}")
+             quiet = log_cmd_display is None or (is_pkexec_group and all(c.strip().startswith(("sysctl", "echo")) for c in inner_cmds))
+             runner.on_line = lambda stream, line, quiet=quiet: on_line(stream, line, quiet)
+             display = log_cmd_display or cmd_to_run
+             try:
+                result = runner.run(cmd_to_run, timeout=180)
+             except Exception as e: self.log(f"  💥 فشل: {display} بخطأ: {type(e).__name__} - {e}"); return False
+             if result.returncode is not None: self.metrics.record_command(cmd_to_run, result.returncode)
+             if result.cancelled: self.log(f"  ⏹ تم الإلغاء: {display}"); return False
+             if result.timed_out: self.log(f"  ⌛ فشل: {display} (انتهت المهلة)"); return False
+             if result.returncode != 0:
+                self.log(f"  ❌ فشل تنفيذ: {display}"); self.log(f"     رمز الخطأ: {result.returncode}")
+                if 'pkexec' in cmd_to_run and result.returncode in [126, 127]: self.log("     تم إلغاء نافذة المصادقة أو فشلت.")
+                elif result.returncode == 127: self.log(f"  ❓ الأمر '{cmd_to_run.split(' ')[0]}' غير موجود.")
+                return False
+        return True
+
+    def perform_actions(self, cmds_or_steps, action_name, action=None):
+        # تُضاف العملية إلى طابور المهام بدلاً من قفل الواجهة بالكامل
+        from flashboost_jobs import Step, Job
+        if isinstance(cmds_or_steps, list) and cmds_or_steps and all(isinstance(c, Step) for c in cmds_or_steps): steps = cmds_or_steps
+        elif isinstance(cmds_or_steps, (str, list)): steps = [self.command_step("main", cmds_or_steps, label=action_name)]
+        else: self.log(f"❌ خطأ داخلي: نوع إدخال غير صالح: {type(cmds_or_steps)}"); return None
+        if self.scheduler.busy: self.log(f"🕒 أضيفت إلى قائمة الانتظار: {action_name}")
+        return self.scheduler.submit(Job(action_name, steps, action))
+
+    def plan(self, action, **params):
+        # يعيد (العنوان، الخطوات) دون تنفيذ؛ الواجهة تطلب التأكيد قبل perform_actions
+        if action not in self.ACTIONS: raise KeyError(action)
+        label, builder = self.ACTIONS[action]
+        return label, getattr(self, builder)(**params)
+
+    def run_action(self, action, **params):
+        # الخطط تعيد None عند التعذر و [] عندما لا يلزم شيء؛ لا مهمة في الحالتين
+        label, steps = self.plan(action, **params)
+        self.log(f"طلب إجراء: {label}")
+        if not steps: return None
+        return self.perform_actions(steps, label, action)
+
+    def plan_verified(self, action, trials=10, **params):
+        # العملية نفسها بين قياسين قبل/بعد؛ القياس اللاحق يُتخطى إذا فشلت العملية
+        from flashboost_jobs import Step
+        label, steps = self.plan(action, **params)
+        if not steps: return label, steps
+        probes = self.ACTION_PROBES.get(action, self.DEFAULT_PROBES); results = {}
+        for step in steps:
+            if not step.deps: step.deps = ("probe:before",)
+        before = Step("probe:before", lambda job: self.run_probe_phase(job, probes, trials, results, "before"), label="قياس قبل")
+        after = Step("probe:after", lambda job: self.run_probe_phase(job, probes, trials, results, "after"), [s.name for s in steps], label="قياس بعد")
+        return label, [before] + steps + [after]
+
+    def run_probe_phase(self, job, probes, trials, results, phase):
+        from flashboost_probes import run_probes, compare
+        self.log(f"  📊 {'قياس قبل' if phase == 'before' else 'قياس بعد'} ({', '.join(probes)}، {trials} محاولات)...")
+        results[phase] = run_probes(probes, trials, cancelled=lambda: job.cancelled)
+        if job.cancelled: return False
+        if phase == "before": return True
+        for c in compare(results["before"], results["after"]):
+            self.log(f"     {c.label}: {c.before.mean:.1f}±{c.before.ci:.1f} ← {c.after.mean:.1f}±{c.after.ci:.1f} {c.unit} "
+                     f"({c.percent:+.1f}%، ±{c.delta_ci:.1f}) {self.VERDICT_LABELS[c.verdict]}")
+        return True
+
+    def plan_startup_tuning(self):
+        ops = [{"op": "apply_sysctl", "settings": dict(self.STARTUP_SYSCTL), "snapshot": "startup"}]
+        return [self.helper_step("sysctl", ops, label="sysctl")]
+
+    def plan_light_clean(self):
+        from flashboost_cleaner import LIGHT_POLICIES
+        return [
+            self.command_step("sync", ["sync"]),
+            self.cleaner_step("user_cache", LIGHT_POLICIES, label="كاش المستخدم"),
+            self.pagecache_step("pagecache", deps=["sync", "user_cache"], label="تفريغ كاش الصفحة"),
+        ]
+
+    def plan_deep_clean(self):
+        from flashboost_cleaner import DEEP_POLICIES
+        # مسح ~/.cache لا يعتمد على تقليص السجلات، فيعملان بالتوازي
+        return [
+            self.command_step("sync", ["sync"]),
+            self.helper_step("journal", [{"op": "vacuum_journal", "max_size": "100M"}], label="تقليص السجلات"),
+            self.cleaner_step("user_cache", DEEP_POLICIES, label="كاش المستخدم"),
+            self.pagecache_step("pagecache", reclaim_bytes=256 * 1024 * 1024, deps=["sync", "user_cache"], label="تفريغ كاش الصفحة"),
+        ]
+
+    def plan_preview_clean(self):
+        from flashboost_cleaner import LIGHT_POLICIES, DEEP_POLICIES
+        return [self.cleaner_step("light", LIGHT_POLICIES, dry_run=True, label="تنظيف خفيف"),
+                self.cleaner_step("deep", DEEP_POLICIES, dry_run=True, label="تنظيف عميق")]
+
+    def package_health(self):
+        # الفهرس يبقى في الذاكرة ويُعاد تحليل ملف الحالة فقط عند تغيره
+        from flashboost_dpkg import PackageDB
+        if self._package_db is None or self._package_db.root != self.dpkg_root: self._package_db = PackageDB(self.dpkg_root)
+        return self._package_db.check()
+
+    def package_repairs(self, health):
+        # خطوات repair_packages في المساعد. None (تعذر الفحص): كل الخطوات.
+        # apt-get update بطيء ولا يفيد إلا قبل --fix-broken، فلا يُشغل لمجرد قدم القوائم
+        steps = []
+        if health is None or (health.needs_fix_broken and health.update_needed): steps.append("update")
+        if health is None or health.needs_configure: steps.append("configure")
+        if health is None or health.needs_fix_broken: steps.append("fix-broken")
+        return steps
+
+    def plan_fix_packages(self):
+        # خطوات الإصلاح اللازمة فقط حسب فحص ملف حالة dpkg بدلاً من تشغيل الثلاث دائماً
+        from flashboost_jobs import Step
+        try: health = self.package_health()
+        except OSError as e: self.log(f"  ⚠️ تعذر قراءة حالة dpkg ({e}): تشغيل كل خطوات الإصلاح."); health = None
+        if health is not None:
+            self.log(f"  🔎 فحص {health.packages} حزمة في {health.duration * 1000:.0f} مللي ث: "
+                     f"{len(health.unconfigured)} غير مكتملة الإعداد، {len(health.reinstall)} تحتاج إعادة تثبيت، {len(health.broken)} باعتماديات ناقصة"
+                     f"{'، عملية dpkg منقطعة' if health.interrupted else ''}.")
+            for name, missing in list(health.broken.items())[:5]: self.log(f"       {name}: {', '.join(missing)}")
+            if health.needs_fix_broken: self.log(f"  {'+' if health.update_needed else '-'} {self.PACKAGE_UPDATE_REASONS.get(health.update_reason, health.update_reason)}.")
+        repairs = self.package_repairs(health)
+        if not repairs: self.log("  ✓ الحزم سليمة: لا حاجة لأي إصلاح."); return []
+        ops = [{"op": "repair_packages", "step": step} for step in repairs]
+        return [Step("main", lambda job: self.run_helper_ops(job, ops, progress=True), label="إصلاح الحزم")]
+
+    def plan_boost(self, pid=None):
+        from flashboost_jobs import Step
+        pid = pid or os.getpid()
+        return [Step("boost", lambda job: self.run_boost(job, pid), label="تعزيز الأداء")]
+
+    def plan_network_boost(self, pid=None):
+        # القيم السابقة تُحفظ في لقطة "game-boost" ليتمكن زر الاستعادة من التراجع عنها
+        ops = [{"op": "apply_sysctl", "settings": dict(self.NETWORK_TWEAKS), "snapshot": "game-boost"}]
+        self.log("  + تعديلات الشبكة (sysctl) جاهزة.")
+        affinity = self.plan_affinity(pid)
+        if affinity is not None and not affinity.empty: ops.append(affinity.as_op(self.AFFINITY_SNAPSHOT))
+        if os.path.exists(os.path.join(self.system_info.sys_root, "devices/system/cpu/cpu0/cpufreq/scaling_governor")):
+            ops.append({"op": "set_governor", "governor": "performance"}); self.log("  + سيتم محاولة تعيين حاكم المعالج إلى 'performance'.")
+        else: self.log("  - التحكم بتردد المعالج (cpufreq) غير متاح.")
+        wifi_interface = self.system_info.find_active_wifi_interface(); iw_exists = self.system_info.check_command_exists("iw")
+        if wifi_interface and iw_exists: ops.append({"op": "wifi_power_save", "iface": wifi_interface, "enabled": False}); self.log(f"  + سيتم محاولة تعطيل توفير الطاقة لـ '{wifi_interface}'.")
+        elif not iw_exists: self.log("  - أداة 'iw' غير موجودة.")
+        else: self.log("  - لم يتم العثور على واجهة واي فاي نشطة.")
+        return [self.helper_step("network", ops, label="تعزيز الشبكة والألعاب")]
+
+    def plan_affinity(self, pid=None, mode=None, irq_cpus=None):
+        # مقاطعات بطاقات الشبكة و RPS/XPS وأنوية التطبيق المحدد (flashboost_irq)؛ None عند التعطيل أو الخطأ
+        from flashboost_irq import plan_affinity, irqbalance_running, format_cpu_list, AffinityError
+        mode = mode or self.affinity_mode
+        if mode == "off": return None
+        try: plan = plan_affinity(self.system_info.proc_root, self.system_info.sys_root, mode, pid, irq_cpus)
+        except AffinityError as e: self.log(f"  - توجيه المقاطعات: {e}"); return None
+        for key, reason in plan.skipped.items(): self.log(f"  - توجيه المقاطعات ({key}): {self.AFFINITY_SKIP_REASONS.get(reason, reason)}")
+        if plan.empty: return plan
+        nics = ", ".join(f"{iface} ({len(irqs)})" for iface, irqs in plan.nics.items())
+        if mode == "isolate": self.log(f"  + عزل مقاطعات {nics} و RPS على الأنوية {format_cpu_list(plan.irq_cpus)}" +
+                                       (f"، وخيوط العملية {pid} على {format_cpu_list(plan.app_cpus)}" if plan.threads else ""))
+        else: self.log(f"  + توزيع مقاطعات {nics} على {len(plan.cpus)} أنوية")
+        if plan.xps: self.log(f"  + XPS: ربط كل نواة بطابور إرسال ({len(plan.xps)} طابور)")
+        if irqbalance_running(self.system_info.proc_root): self.log("  ⚠️ irqbalance يعمل وقد يعيد توزيع المقاطعات بعد التعزيز.")
+        return plan
+
+    def plan_tune_process(self, pid, nice=None, ioclass=None, iolevel=4, cpus=None, tree=False):
+        from flashboost_jobs import Step
+        return [Step("tune", lambda job: self.run_tune_process(job, pid, nice, ioclass, iolevel, cpus, tree), label=f"ضبط العملية {pid}")]
+
+    def run_tune_process(self, job, pid, nice, ioclass, iolevel, cpus, tree):
+        # تطبيق مباشر أولاً (يكفي لعمليات المستخدم نفسه)، وما يُرفض يُرسل إلى المساعد في دفعة واحدة
+        from flashboost_procmon import set_nice, set_ioprio, set_affinity, process_tree
+        pids = process_tree(pid, self.system_info.proc_root) if tree else [pid]
+        changes = []
+        if nice is not None: changes.append(({"op": "renice", "nice": nice}, lambda p: set_nice(p, nice)))
+        if ioclass is not None: changes.append(({"op": "ionice", "ioclass": ioclass, "level": iolevel}, lambda p: set_ioprio(p, ioclass, iolevel)))
+        if cpus is not None: changes.append(({"op": "set_affinity", "cpus": sorted(cpus)}, lambda p: set_affinity(p, cpus)))
+        if not changes: self.log("  لا توجد تعديلات مطلوبة."); return True
+        privileged = []; failed = 0
+        for target in pids:
+            for op, apply in changes:
+                op = dict(op, pid=target)
+                try: apply(target); self.log(f"     ✓ {self.describe_helper_op(op)}")
+                except PermissionError: privileged.append(op)
+                except ProcessLookupError: pass # انتهت العملية
+                except OSError as e: failed += 1; self.log(f"     ✗ {self.describe_helper_op(op)}: {e}")
+        if len(pids) > 1: self.log(f"  🌳 شجرة العملية {pid}: {len(pids)} عملية")
+        if privileged and not self.run_helper_ops(job, privileged): return False
+        return not failed
+
+    def plan_restore_defaults(self):
+        from flashboost_jobs import Step
+        return [Step("restore", self.restore_sysctl_snapshots, label="استعادة sysctl"),
+                Step("cgroups", self.revert_cgroup_profiles, label="استعادة موارد cgroup"),
+                Step("affinity", self.restore_affinity_snapshots, label="استعادة توجيه المقاطعات")]
+
+    def plan_analyze_disk(self):
+        from flashboost_jobs import Step
+        from flashboost_diskindex import list_mounts
+        steps = [Step(f"index:{m}", lambda job, m=m: self.run_disk_index(m), label=m) for m in list_mounts()]
+        if not steps: self.log("  ! لم يتم العثور على نقاط تثبيت."); return None
+        return steps
+
+    def disk_index(self, mount_point):
+        from flashboost_diskindex import DiskIndex
+        index = self.disk_indexes.get(mount_point)
+        if index is None:
+            index = self.disk_indexes[mount_point] = DiskIndex(mount_point); index.load()
+        return index
+
+    def indexed_size(self, path):
+        # الحجم من الفهرس المحفوظ (دون مسح)، من نقطة التثبيت الأطول المطابقة
+        from flashboost_diskindex import list_mounts
+        path = os.path.abspath(os.path.expanduser(path))
+        mounts = [m for m in list_mounts() if path == m or path.startswith(m.rstrip("/") + "/")]
+        if not mounts: return None
+        return self.disk_index(max(mounts, key=len)).size_of(path)
+
+    def run_disk_index(self, mount_point):
+        from flashboost_cleaner import format_bytes
+        index = self.disk_index(mount_point)
+        scanned, reused, duration = index.refresh()
+        try: index.save()
+        except OSError as e: self.log(f"  ⚠️ تعذر حفظ الفهرس: {e}")
+        self.log(f"  📂 {mount_point}: {format_bytes(index.size_of(mount_point) or 0)} — {scanned} مجلد ممسوح، {reused} من الفهرس ({duration:.1f} ث)")
+        for path, size in index.top(5, max_depth=3): self.log(f"       {format_bytes(size):>9}  {path}")
+        if index.errors: self.log(f"       ⚠️ تعذر الوصول إلى {index.errors} عنصر.")
+        return True
+
+    def start_metrics(self, listen, sampler=None):
+        # نقطة OpenMetrics محلية؛ القيم من آخر عينة فقط فلا يضيف الاستعلام أي قياس
+        if sampler: self.metrics.watch_sampler(sampler)
+        try: return self.metrics.serve(listen)
+        except (OSError, ValueError) as e: self.log(f"⚠️ تعذر تشغيل نقطة المقاييس ({listen}): {e}"); return None
+
+    def start_autotune(self, interval=5.0, dry_run=False, cooldown=30.0):
+        # ضبط swappiness و vfs_cache_pressure حسب PSI بدلاً من القيم الثابتة عند البدء
+        from flashboost_psi import SignalReader
+        if self._autotune: return self._autotune[0]
+        reader = SignalReader(self.system_info.proc_root)
+        if not reader.available(): reader.close(); self.log("⚠️ PSI غير متاح (/proc/pressure): الضبط التلقائي معطل."); return None
+        stop = threading.Event()
+        thread = threading.Thread(target=self._autotune_loop, args=(reader, stop, interval, dry_run, cooldown), name="flashboost-autotune", daemon=True)
+        self._autotune = (thread, stop); thread.start()
+        return thread
+
+    def stop_autotune(self, restore=True):
+        # يعمل أيضاً بعد توقف الخيط بخطأ: القيم المطبقة ما زالت تحتاج الاستعادة
+        if self._autotune:
+            thread, stop = self._autotune; self._autotune = None
+            stop.set(); thread.join()
+        if restore and self._autotune_applied: self._autotune_applied = False; self.run_helper_ops(None, [{"op": "restore_sysctl", "name": self.AUTOTUNE_SNAPSHOT}])
+
+    def _autotune_loop(self, reader, stop, interval, dry_run, cooldown):
+        from flashboost_helper import HelperError
+        from flashboost_psi import MemoryTuner, BOUNDS
+        from flashboost_sysctl import SysctlEngine
+        engine = SysctlEngine(self.system_info.proc_root)
+        def current():
+            values = {}
+            for key in BOUNDS:
+                value = engine.read(key)
+                if value is not None and value.isdigit(): values[key] = int(value)
+            return values
+        tuner = MemoryTuner(current(), cooldown=cooldown)
+        mode = "، بالتجربة فقط" if dry_run else ""
+        self.log(f"🎛️ الضبط التلقائي للذاكرة (PSI{'، مشغلات: ' + ', '.join(reader.triggers) if reader.triggers else ''}{mode}): "
+                 + ", ".join(f"{k}={v}" for k, v in tuner.baseline.items()))
+        try:
+            reader.read() # أول قراءة لحساب معدل المبادلة
+            while not stop.is_set() and not self._closing.is_set():
+                triggered = reader.wait(interval)
+                if stop.is_set(): break
+                signals = reader.read(triggered)
+                decisions = tuner.decide(signals, current())
+                for d in decisions:
+                    s = d.signals
+                    self.log(f"  🎛️ {d.key}: {d.old} → {d.new} ({self.AUTOTUNE_REASONS.get(d.reason, d.reason)}: "
+                             f"mem some={s.memory.get('some', 0):.1f}% full={s.memory.get('full', 0):.1f}%، io some={s.io.get('some', 0):.1f}%، "
+                             f"swap in/out={s.swap_in:.0f}/{s.swap_out:.0f} صفحة/ث{'، مشغل ' + ', '.join(sorted(s.triggered)) if s.triggered else ''})")
+                if not decisions or dry_run: continue
+                op = {"op": "apply_sysctl", "settings": {d.key: d.new for d in decisions}, "snapshot": self.AUTOTUNE_SNAPSHOT}
+                try: result = self.helper.call([op])[0]
+                except HelperError as e: self.log(f"  ❌ فشل الاتصال بالمساعد: {e}"); continue
+                self.metrics.record_helper_op(op, result["ok"])
+                if result["ok"]: self._autotune_applied = True
+                else: self.log(f"  ✗ {self.describe_helper_op(op)}: {result['error']}")
+        except OSError as e: self.log(f"⚠️ توقف الضبط التلقائي للذاكرة: تعذرت قراءة PSI ({e})")
+        finally:
+            reader.close()
+            # توقف دون stop_autotune: لا يبقى "يعمل" في الواجهة وسطر الأوامر
+            if self._autotune and self._autotune[0] is threading.current_thread(): self._autotune = None
+
+    def start_watch(self, profiles=None, source="auto", interval=0.5):
+        # ملفات التطبيقات: تُطبق عند تشغيل تطبيق مطابق وتُرجع عند خروج آخر عملية له
+        from flashboost_watch import AppWatcher, load_profiles, default_profiles_path, WatchError
+        if self._watch: return self._watch[0]
+        try: profiles = load_profiles() if profiles is None else profiles
+        except WatchError as e: self.log(f"⚠️ ملفات التطبيقات: {e}"); return None
+        if not profiles: self.log(f"⚠️ لا توجد ملفات تطبيقات في {default_profiles_path()}"); return None
+        try: watcher = AppWatcher(profiles, self._app_started, self._app_stopped, self._app_matched, self.system_info.proc_root, source, interval)
+        except (WatchError, OSError) as e: self.log(f"⚠️ تعذر بدء مراقبة التطبيقات: {e}"); return None
+        stop = threading.Event()
+        def run():
+            try: watcher.run(stop)
+            except OSError as e: print(f"Watch error: {e}")
+            finally: watcher.close()
+        thread = threading.Thread(target=run, name="flashboost-watch", daemon=True)
+        self._watch = (thread, stop, watcher)
+        self.log(f"👁 مراقبة التطبيقات ({'proc connector' if watcher.source_name == 'connector' else 'فحص /proc'}): "
+                 + ", ".join(f"{p.name} ({', '.join(sorted(p.match))})" for p in profiles))
+        thread.start()
+        return thread
+
+    def stop_watch(self, revert=True):
+        if not self._watch: return
+        thread, stop, watcher = self._watch; self._watch = None
+        stop.set(); thread.join()
+        if revert:
+            for profile in reversed(list(self._app_active.values())): self._app_stopped(profile)
+        self._app_active.clear()
+
+    def _app_matched(self, profile, pid):
+        from flashboost_procmon import set_nice
+        if profile.nice is None: return
+        op = {"op": "renice", "pid": pid, "nice": profile.nice}
+        try: set_nice(pid, profile.nice); self.log(f"     ✓ {self.describe_helper_op(op)}")
+        except PermissionError: self.run_helper_ops(None, [op]) # خفض nice يتطلب صلاحيات
+        except OSError as e: print(f"App profile renice error: {e}")
+
+    def _current_governor(self):
+        try:
+            with open(os.path.join(self.system_info.sys_root, "devices/system/cpu/cpu0/cpufreq/scaling_governor")) as f: return f.read().strip()
+        except OSError: return None
+
+    def _wifi_power_save(self, iface):
+        # الحالة الحالية من "iw dev X get power_save"؛ التشغيل هو الافتراضي إذا تعذرت القراءة
+        import subprocess
+        try: return "off" not in subprocess.run(["iw", "dev", iface, "get", "power_save"], capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.SubprocessError): return True
+
+    def _app_started(self, profile, pid):
+        self.log(f"▶️ {profile.name}: بدأ (PID: {pid})، تطبيق ملف التطبيق")
+        self._app_active[profile.name] = profile
+        ops = []
+        if profile.sysctl: ops.append({"op": "apply_sysctl", "settings": dict(profile.sysctl), "snapshot": self.APPS_SNAPSHOT})
+        if profile.governor:
+            current = self._app_original.get("governor") or self._current_governor()
+            if current: self._app_original.setdefault("governor", current); ops.append({"op": "set_governor", "governor": profile.governor})
+            else: self.log("  - التحكم بتردد المعالج (cpufreq) غير متاح.")
+        if profile.wifi_power_save is not None:
+            iface = self.system_info.find_active_wifi_interface()
+            if iface and self.system_info.check_command_exists("iw"):
+                self._app_original.setdefault("wifi", (iface, self._wifi_power_save(iface)))
+                ops.append({"op": "wifi_power_save", "iface": iface, "enabled": bool(profile.wifi_power_save)})
+        if ops: self.run_helper_ops(None, ops)
+
+    def _app_stopped(self, profile):
+        # ما يضبطه ملف آخر ما زال نشطاً يبقى على قيمته (آخر ملف بدأ يفوز)، والباقي يعود للقيمة الأصلية
+        from flashboost_helper import HelperError
+        self.log(f"⏹ {profile.name}: انتهى، إرجاع الإعدادات")
+        names = list(self._app_active)
+        later = [self._app_active[n] for n in names[names.index(profile.name) + 1:]] if profile.name in names else []
+        self._app_active.pop(profile.name, None)
+        remaining = list(self._app_active.values())
+        ops = []
+        # مفاتيح ضبطها ملف بدأ بعده ما زالت على قيمته: لا تغيير
+        keys = [key for key in profile.sysctl if not any(key in other.sysctl for other in later)]
+        if keys:
+            wanted = {}
+            for other in remaining: wanted.update(other.sysctl)
+            try: originals = (self.helper.call([{"op": "sysctl_snapshots"}])[0].get("value") or {}).get(self.APPS_SNAPSHOT)
+            except HelperError as e: self.log(f"  ❌ فشل الاتصال بالمساعد: {e}"); originals = None
+            if originals is not None and not wanted: ops.append({"op": "restore_sysctl", "name": self.APPS_SNAPSHOT})
+            elif originals is not None:
+                settings = {key: wanted[key] if key in wanted else originals.get(key) for key in keys}
+                settings = {key: value for key, value in settings.items() if value is not None}
+                if settings: ops.append({"op": "apply_sysctl", "settings": settings})
+        if profile.governor and not any(other.governor for other in later):
+            others = [other.governor for other in remaining if other.governor]
+            governor = others[-1] if others else self._app_original.pop("governor", None)
+            if governor: ops.append({"op": "set_governor", "governor": governor})
+        if profile.wifi_power_save is not None and not any(other.wifi_power_save is not None for other in later):
+            others = [other.wifi_power_save for other in remaining if other.wifi_power_save is not None]
+            original = self._app_original.get("wifi")
+            if original and others: ops.append({"op": "wifi_power_save", "iface": original[0], "enabled": bool(others[-1])})
+            elif original: self._app_original.pop("wifi"); ops.append({"op": "wifi_power_save", "iface": original[0], "enabled": original[1]})
+        if ops: self.run_helper_ops(None, ops)
+
+    def close(self):
+        self._closing.set()
+        if self._autotune: self.stop_autotune(restore=False)
+        if self._watch: self.stop_watch(revert=True)
+        self.metrics.close()
+        self.scheduler.shutdown()
+        with self._helper_lock:
+            if self._helper: self._helper.close()
+        self.system_info.close()
@@ -0,0 +1,140 @@
+import heapq
+import os
+import stat
+import struct
+import time
+
+MAGIC = b"FBDI\x01"
+HEADER = struct.Struct("<5sI")
+# mtime_ns، حجم الملفات المباشرة، الحجم الكلي، رقم الأب، طول الاسم
+RECORD = struct.Struct("<qqqiH")
+REAL_FILESYSTEMS = ("ext2", "ext3", "ext4", "xfs", "btrfs", "f2fs", "vfat", "exfat", "ntfs", "ntfs3", "fuseblk", "zfs", "bcachefs")
+
+
+def default_index_dir():
+    state = os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state")
+    return os.path.join(state, "flashboost", "diskindex")
+
+
+def list_mounts(proc_root='/proc'):
+    # نقاط التثبيت لأنظمة الملفات الحقيقية فقط
+    mounts = []
+    try:
+        with open(os.path.join(proc_root, "self", "mounts")) as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 3 and fields[2] in REAL_FILESYSTEMS:
+                    mount_point = fields[1].replace("\\040", " ")
+                    if mount_point not in mounts: mounts.append(mount_point)
+    except OSError: pass
+    return mounts
+
+
+class DiskIndex:
+    # فهرس أحجام المجلدات: يُبنى مرة ثم يُحدَّث بمقارنة mtime للمجلدات فقط
+    # (تغير حجم ملف موجود دون تغير mtime المجلد لا يظهر حتى إعادة البناء الكاملة)
+    def __init__(self, root, index_path=None):
+        self.root = os.path.abspath(root)
+        name = "root" if self.root == "/" else self.root.strip("/").replace("/", "_")
+        self.index_path = index_path or os.path.join(default_index_dir(), f"{name}.idx")
+        self.dirs = {} # المسار -> [mtime_ns, own_bytes, total_bytes, subdirs]
+        self.errors = 0
+        self.updated = None
+        self._ranked = None # ترتيب الأحجام محفوظ بين الاستعلامات حتى التحديث التالي
+
+    def load(self):
+        try:
+            with open(self.index_path, "rb") as f: data = f.read()
+        except OSError: return False
+        if len(data) < HEADER.size: return False
+        magic, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC: return False
+        offset = HEADER.size; paths = []; dirs = {}
+        try:
+            for _ in range(count):
+                mtime_ns, own, total, parent, name_len = RECORD.unpack_from(data, offset); offset += RECORD.size
+                name = data[offset:offset + name_len].decode("utf-8", "surrogateescape"); offset += name_len
+                path = name if parent < 0 else os.path.join(paths[parent], name)
+                paths.append(path)
+                dirs[path] = [mtime_ns, own, total, []]
+                if parent >= 0: dirs[paths[parent]][3].append(path)
+        except (struct.error, IndexError): return False
+        self.dirs = dirs; self._ranked = None
+        self.updated = os.path.getmtime(self.index_path)
+        return True
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        chunks = [None]; index_of = {}
+        # الترتيب يضمن ظهور الأب قبل أبنائه
+        stack = [self.root] if self.root in self.dirs else []
+        while stack:
+            path = stack.pop()
+            mtime_ns, own, total, subdirs = self.dirs[path]
+            parent = index_of.get(os.path.dirname(path), -1) if path != self.root else -1
+            name = (path if parent < 0 else os.path.basename(path)).encode("utf-8", "surrogateescape")
+            index_of[path] = len(index_of)
+            chunks.append(RECORD.pack(mtime_ns, own, total, parent, len(name)) + name)
+            stack.extend(subdirs)
+        chunks[0] = HEADER.pack(MAGIC, len(index_of))
+        tmp = f"{self.index_path}.tmp"
+        with open(tmp, "wb") as f: f.write(b"".join(chunks))
+        os.replace(tmp, self.index_path)
+        self.updated = time.time()
+
+    def _scan_dir(self, path, device):
+        own = 0; subdirs = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try: st = entry.stat(follow_symlinks=False)
+                except OSError: self.errors += 1; continue
+                if stat.S_ISDIR(st.st_mode):
+                    if st.st_dev == device: subdirs.append(entry.path)
+                else: own += st.st_blocks * 512
+        return own, subdirs
+
+    def refresh(self):
+        # يعيد (المجلدات الممسوحة، المجلدات المعاد استخدامها، المدة)
+        start = time.monotonic(); self.errors = 0
+        if not self.dirs: self.load()
+        old = self.dirs; new = {}; order = []
+        scanned = reused = 0
+        try: device = os.stat(self.root).st_dev
+        except OSError: self.errors += 1; return 0, 0, 0.0
+        stack = [self.root]
+        while stack:
+            path = stack.pop()
+            try: st = os.stat(path, follow_symlinks=False)
+            except OSError: self.errors += 1; continue
+            mtime_ns = st.st_mtime_ns
+            record = old.get(path)
+            if record and record[0] == mtime_ns:
+                own, subdirs = record[1], record[3]; reused += 1
+            else:
+                try: own, subdirs = self._scan_dir(path, device); own += st.st_blocks * 512; scanned += 1
+                except OSError: self.errors += 1; own, subdirs = st.st_blocks * 512, []
+            new[path] = [mtime_ns, own, 0, subdirs]
+            order.append(path); stack.extend(subdirs)
+        # ترتيب ما قبل الزيارة معكوساً: الأبناء قبل الآباء عند جمع الأحجام
+        for path in reversed(order):
+            record = new[path]
+            record[3] = [p for p in record[3] if p in new]
+            record[2] = record[1] + sum(new[p][2] for p in record[3])
+        self.dirs = new; self._ranked = None
+        return scanned, reused, time.monotonic() - start
+
+    def size_of(self, path):
+        record = self.dirs.get(os.path.abspath(os.path.expanduser(path)))
+        return record[2] if record else None
+
+    def top(self, n=10, under=None, max_depth=None):
+        # أكبر المجلدات؛ max_depth يُقاس من under (أو من الجذر)
+        if under is None and max_depth is None:
+            if self._ranked is None: self._ranked = sorted(((r[2], p) for p, r in self.dirs.items() if p != self.root), reverse=True)
+            return [(path, size) for size, path in self._ranked[:n]]
+        base = os.path.abspath(os.path.expanduser(under)) if under else self.root
+        prefix = base.rstrip("/") + "/"
+        base_depth = base.rstrip("/").count("/")
+        candidates = ((path, record[2]) for path, record in self.dirs.items()
+                      if path != base and path.startswith(prefix) and (max_depth is None or path.count("/") - base_depth <= max_depth))
+        return heapq.nlargest(n, candidates, key=lambda item: item[1])
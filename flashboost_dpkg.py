@@ -0,0 +1,214 @@
+import os
+import re
+import time
+
+# حالات dpkg التي يكملها "dpkg --configure -a"
+UNCONFIGURED_STATES = ("unpacked", "half-configured", "triggers-awaited", "triggers-pending")
+# حالات لا يكون فيها الحزمة مثبتة فعلياً (لا تحقق اعتماديات غيرها)
+ABSENT_STATES = ("not-installed", "config-files", "half-installed")
+STATUS_FIELDS = (b"Package", b"Status", b"Version", b"Architecture", b"Depends", b"Pre-Depends", b"Provides")
+DEPENDENCY_RE = re.compile(r"^\s*([^\s(:]+)(?::(\S+))?\s*(?:\(\s*(<<|<=|=|>=|>>|<|>)\s*([^\s)]+)\s*\))?")
+# أسماء ملفات القوائم تحوي نقاط اسم المضيف، وقد تنتهي بامتداد ضغط (.lz4، .gz...)
+LIST_RE = re.compile(r"_(Packages|InRelease|Release)(\.[A-Za-z0-9]+)?$")
+
+
+def _order(c):
+    # ترتيب المحارف في مقارنة dpkg: ~ قبل النهاية، والحروف قبل الرموز
+    if not c or c.isdigit(): return 0
+    if c.isalpha(): return ord(c)
+    if c == "~": return -1
+    return ord(c) + 256
+
+
+def _compare_part(a, b):
+    # verrevcmp من dpkg: مقاطع غير رقمية تُقارن محرفاً بمحرف، ثم مقاطع رقمية كأعداد
+    i = j = 0
+    while i < len(a) or j < len(b):
+        while (i < len(a) and not a[i].isdigit()) or (j < len(b) and not b[j].isdigit()):
+            ac = _order(a[i] if i < len(a) else ""); bc = _order(b[j] if j < len(b) else "")
+            if ac != bc: return -1 if ac < bc else 1
+            i += 1; j += 1
+        start_i = i
+        while i < len(a) and a[i].isdigit(): i += 1
+        start_j = j
+        while j < len(b) and b[j].isdigit(): j += 1
+        na = int(a[start_i:i] or 0); nb = int(b[start_j:j] or 0)
+        if na != nb: return -1 if na < nb else 1
+    return 0
+
+
+def split_version(version):
+    # الحقبة حتى أول ":" (الإصدار الأصلي قد يحوي ":" عند وجود حقبة)، والمراجعة بعد آخر "-"
+    epoch, _, rest = version.partition(":") if ":" in version else ("0", "", version)
+    upstream, _, revision = rest.rpartition("-") if "-" in rest else (rest, "", "0")
+    return int(epoch or 0), upstream, revision
+
+
+def compare_versions(a, b):
+    ea, ua, ra = split_version(a); eb, ub, rb = split_version(b)
+    if ea != eb: return -1 if ea < eb else 1
+    return _compare_part(ua, ub) or _compare_part(ra, rb)
+
+
+def version_satisfies(version, relation, wanted):
+    result = compare_versions(version, wanted)
+    if relation in ("<<",): return result < 0
+    if relation in ("<=", "<"): return result <= 0
+    if relation == "=": return result == 0
+    if relation in (">=", ">"): return result >= 0
+    if relation == ">>": return result > 0
+    return False
+
+
+def parse_dependencies(text):
+    # "a (>= 1) | b, c:any" -> [[("a", None, ">=", "1"), ("b", None, None, None)], [("c", "any", None, None)]]
+    groups = []
+    for group in text.split(","):
+        alternatives = []
+        for alternative in group.split("|"):
+            match = DEPENDENCY_RE.match(alternative)
+            if match: alternatives.append(match.groups())
+        if alternatives: groups.append(alternatives)
+    return groups
+
+
+class Package:
+    __slots__ = ("name", "arch", "version", "want", "flag", "state", "depends", "provides")
+
+    def __init__(self, name, arch, version, status, depends, provides):
+        self.name = name; self.arch = arch; self.version = version
+        self.want, self.flag, self.state = (status.split() + ["", "", ""])[:3]
+        self.depends = depends # نص Depends و Pre-Depends، يُحلل عند الفحص فقط
+        self.provides = provides
+
+    @property
+    def present(self):
+        return self.state not in ABSENT_STATES
+
+
+class PackageHealth:
+    def __init__(self):
+        self.unconfigured = [] # (الحزمة، الحالة)
+        self.reinstall = [] # حزم بعلامة reinstreq أو half-installed
+        self.broken = {} # الحزمة -> [الاعتماديات غير المحققة]
+        self.interrupted = False # سجل dpkg/updates غير فارغ: عملية dpkg انقطعت
+        self.update_needed = False
+        self.update_reason = ""
+        self.packages = 0
+        self.duration = 0.0
+
+    @property
+    def needs_configure(self):
+        return bool(self.unconfigured) or self.interrupted
+
+    @property
+    def needs_fix_broken(self):
+        return bool(self.broken) or bool(self.reinstall)
+
+    @property
+    def healthy(self):
+        return not self.needs_configure and not self.needs_fix_broken
+
+    def as_dict(self):
+        return {"packages": self.packages, "unconfigured": self.unconfigured, "reinstall": self.reinstall, "broken": self.broken,
+                "interrupted": self.interrupted, "update_needed": self.update_needed, "update_reason": self.update_reason,
+                "duration": round(self.duration, 4)}
+
+
+class PackageDB:
+    # قراءة /var/lib/dpkg/status مباشرة إلى فهرس بالاسم؛ يُعاد التحليل فقط عند تغير الملف
+    def __init__(self, root="/"):
+        self.root = root
+        self.status_path = os.path.join(root, "var", "lib", "dpkg", "status")
+        self.updates_dir = os.path.join(root, "var", "lib", "dpkg", "updates")
+        self.lists_dir = os.path.join(root, "var", "lib", "apt", "lists")
+        self.sources = [os.path.join(root, "etc", "apt", "sources.list"), os.path.join(root, "etc", "apt", "sources.list.d")]
+        self.packages = {} # الاسم -> [Package] (نسخة لكل معمارية)
+        self.provided = {} # الحزمة الافتراضية -> [(Package، الإصدار أو None)]
+        self._stamp = None
+        self._issues = None # (unconfigured، reinstall، broken) لآخر نسخة محللة
+
+    def load(self):
+        st = os.stat(self.status_path)
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if stamp == self._stamp: return False
+        with open(self.status_path, "rb") as f: data = f.read()
+        packages, provided = {}, {}
+        for stanza in data.split(b"\n\n"):
+            fields = {}
+            for line in stanza.split(b"\n"):
+                if not line or line[:1] in (b" ", b"\t"): continue # أسطر الاستمرار (الوصف، ملفات الإعداد)
+                key, _, value = line.partition(b":")
+                if key in STATUS_FIELDS: fields[key] = value.strip().decode("utf-8", "replace")
+            name = fields.get(b"Package")
+            if not name: continue
+            depends = ", ".join(filter(None, (fields.get(b"Pre-Depends"), fields.get(b"Depends"))))
+            package = Package(name, fields.get(b"Architecture", ""), fields.get(b"Version", ""), fields.get(b"Status", ""), depends, fields.get(b"Provides", ""))
+            packages.setdefault(name, []).append(package)
+            if package.provides and package.present:
+                for virtual, _, _, version in (alternatives[0] for alternatives in parse_dependencies(package.provides)):
+                    provided.setdefault(virtual, []).append((package, version))
+        self.packages, self.provided, self._stamp = packages, provided, stamp
+        self._issues = None
+        return True
+
+    def satisfied(self, name, arch, relation, version):
+        for package in self.packages.get(name, ()):
+            if not package.present: continue
+            if arch not in (None, "any", "native") and package.arch not in (arch, "all"): continue
+            if relation is None or version_satisfies(package.version, relation, version): return True
+        for package, provided_version in self.provided.get(name, ()):
+            if relation is None: return True
+            if provided_version and version_satisfies(provided_version, relation, version): return True
+        return False
+
+    def interrupted(self):
+        # ملفات مرقمة في updates/ تعني أن dpkg توقف قبل دمج حالته
+        try: return any(entry.isdigit() for entry in os.listdir(self.updates_dir))
+        except OSError: return False
+
+    def update_status(self, max_age=86400, now=None):
+        # (هل يلزم apt-get update، السبب) من أزمنة تعديل ملفات القوائم مقارنة بالمصادر
+        now = time.time() if now is None else now
+        sources = []
+        for path in self.sources:
+            if os.path.isdir(path):
+                try: sources.extend(os.path.join(path, f) for f in os.listdir(path) if f.endswith((".list", ".sources")))
+                except OSError: pass
+            elif os.path.exists(path): sources.append(path)
+        sources_mtime = max((os.stat(p).st_mtime for p in sources), default=None)
+        try: lists = [e for e in os.scandir(self.lists_dir) if e.is_file() and LIST_RE.search(e.name)]
+        except OSError: lists = []
+        if sources_mtime is None: return False, "no-sources"
+        if not lists: return True, "missing-lists"
+        lists_mtime = max(e.stat().st_mtime for e in lists)
+        if sources_mtime > lists_mtime: return True, "sources-changed"
+        if now - lists_mtime > max_age: return True, "stale"
+        return False, "fresh"
+
+    def _find_issues(self):
+        unconfigured, reinstall, broken = [], [], {}
+        for name, versions in self.packages.items():
+            for package in versions:
+                if package.flag == "reinstreq" or package.state == "half-installed": reinstall.append(name)
+                elif package.state in UNCONFIGURED_STATES: unconfigured.append((name, package.state))
+                if not package.present or not package.depends: continue
+                missing = [" | ".join(a[0] + (f" ({a[2]} {a[3]})" if a[2] else "") for a in alternatives)
+                           for alternatives in parse_dependencies(package.depends)
+                           if not any(self.satisfied(*alternative) for alternative in alternatives)]
+                if missing: broken[name] = missing
+        return unconfigured, reinstall, broken
+
+    def check(self, max_age=86400):
+        # التحليل والفحص الكامل فقط عند تغير ملف الحالة؛ غير ذلك stat وأزمنة القوائم فقط
+        start = time.perf_counter()
+        self.load()
+        if self._issues is None: self._issues = self._find_issues()
+        health = PackageHealth()
+        unconfigured, reinstall, broken = self._issues
+        health.unconfigured, health.reinstall, health.broken = list(unconfigured), list(reinstall), dict(broken)
+        health.packages = sum(len(versions) for versions in self.packages.values())
+        health.interrupted = self.interrupted()
+        health.update_needed, health.update_reason = self.update_status(max_age)
+        health.duration = time.perf_counter() - start
+        return health
@@ -0,0 +1,147 @@
+import os
+import selectors
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from flashboost_trace import TRACER, NULL_SPAN, now
+
+# خيار apt لإرسال أسطر التقدم (pmstatus/dlstatus) إلى stdout
+APT_STATUS_OPTION = "-o APT::Status-Fd=1"
+MAX_LINE_BYTES = 16 * 1024
+
+
+class CommandResult:
+    def __init__(self, cmd, tail_lines=50):
+        self.cmd = cmd
+        self.returncode = None
+        self.cancelled = False
+        self.timed_out = False
+        self.duration = 0.0
+        self.stdout_tail = deque(maxlen=tail_lines) # آخر الأسطر فقط: الذاكرة محدودة مهما طال المخرج
+        self.stderr_tail = deque(maxlen=tail_lines)
+
+    @property
+    def ok(self):
+        return self.returncode == 0 and not self.cancelled and not self.timed_out
+
+
+def parse_apt_status(line):
+    # "pmstatus:pkg:42.5:Installing pkg" -> (42.5, "Installing pkg")
+    kind, _, rest = line.partition(":")
+    if kind not in ("pmstatus", "dlstatus"): return None
+    parts = rest.split(":", 2)
+    if len(parts) < 3: return None
+    try: return float(parts[1]), parts[2]
+    except ValueError: return None
+
+
+class CommandRunner:
+    # تشغيل أمر مع بث مخرجاته سطراً بسطر من أنابيب غير حاجبة، وإمكانية الإلغاء
+    def __init__(self, on_line=None, on_progress=None, tail_lines=50, kill_grace=3.0):
+        self.on_line = on_line # (stream, line) حيث stream هو "stdout" أو "stderr"
+        self.on_progress = on_progress # (percent, message)
+        self.tail_lines = tail_lines
+        self.kill_grace = kill_grace
+        self._proc = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._proc is not None
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+        with self._lock:
+            if self._proc: self._signal_group(signal.SIGTERM)
+
+    def _signal_group(self, sig):
+        try: os.killpg(self._proc.pid, sig)
+        except ProcessLookupError: pass
+        except PermissionError:
+            # مجموعة العملية تعمل بصلاحيات أعلى (pkexec): نكتفي بالعملية المباشرة
+            try: self._proc.send_signal(sig)
+            except (ProcessLookupError, PermissionError): pass
+
+    def _emit(self, stream, raw, result):
+        line = raw.decode("utf-8", "replace").rstrip("\r")
+        if stream == "stdout":
+            progress = parse_apt_status(line) if self.on_progress else None
+            if progress: self.on_progress(*progress); return
+            result.stdout_tail.append(line)
+        else: result.stderr_tail.append(line)
+        if self.on_line: self.on_line(stream, line)
+
+    def run(self, cmd, timeout=180, shell=True):
+        # الإلغاء يبقى سارياً على كل الأوامر اللاحقة لنفس المشغّل
+        result = CommandResult(cmd, self.tail_lines)
+        if self._cancel.is_set(): result.cancelled = True; return result
+        with TRACER.span("command", "command", cmd=cmd if isinstance(cmd, str) else " ".join(cmd)) as span:
+            self._execute(cmd, timeout, shell, result, span)
+            span.set(returncode=result.returncode, cancelled=result.cancelled, timed_out=result.timed_out)
+        return result
+
+    def _execute(self, cmd, timeout, shell, result, span):
+        start = time.monotonic()
+        with self._lock:
+            self._proc = subprocess.Popen(cmd, shell=shell, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                          stderr=subprocess.PIPE, start_new_session=True)
+        proc = self._proc
+        # المدة حتى أول مخرجات: بدء الصدفة ونافذة المصادقة (pkexec) قبل العمل الفعلي
+        first_output = span is not NULL_SPAN
+        sel = selectors.DefaultSelector()
+        partial = {}
+        for stream, pipe in (("stdout", proc.stdout), ("stderr", proc.stderr)):
+            os.set_blocking(pipe.fileno(), False)
+            sel.register(pipe, selectors.EVENT_READ, stream); partial[stream] = b""
+        kill_at = None
+        try:
+            while sel.get_map():
+                if self._cancel.is_set() and kill_at is None:
+                    result.cancelled = True; kill_at = time.monotonic() + self.kill_grace
+                    with self._lock: self._signal_group(signal.SIGTERM)
+                if not result.timed_out and timeout and time.monotonic() - start > timeout:
+                    result.timed_out = True; kill_at = time.monotonic() + self.kill_grace
+                    with self._lock: self._signal_group(signal.SIGTERM)
+                if kill_at is not None and time.monotonic() > kill_at:
+                    with self._lock: self._signal_group(signal.SIGKILL)
+                    kill_at = float("inf")
+                for key, _ in sel.select(0.2):
+                    stream = key.data
+                    try: chunk = os.read(key.fd, 65536)
+                    except BlockingIOError: continue
+                    if first_output and chunk:
+                        TRACER.record("first output", "command", span.start, now()); first_output = False
+                    if not chunk:
+                        sel.unregister(key.fileobj)
+                        if partial[stream]: self._emit(stream, partial[stream], result)
+                        continue
+                    lines = (partial[stream] + chunk).split(b"\n")
+                    partial[stream] = lines.pop()
+                    if len(partial[stream]) > MAX_LINE_BYTES: # سطر طويل جداً: نقطعه للحفاظ على الذاكرة
+                        lines.append(partial[stream][:MAX_LINE_BYTES]); partial[stream] = b""
+                    for raw in lines: self._emit(stream, raw, result)
+            # المخرجات أُغلقت لكن العملية قد تبقى (أغلقت stdout/stderr واستمرت): المهلة والإلغاء ما زالا ساريين
+            while result.returncode is None:
+                try: result.returncode = proc.wait(0.2)
+                except subprocess.TimeoutExpired:
+                    expired = bool(timeout) and time.monotonic() - start > timeout
+                    if not (self._cancel.is_set() or expired): continue
+                    if expired: result.timed_out = True
+                    else: result.cancelled = True
+                    with self._lock: self._signal_group(signal.SIGKILL)
+                    result.returncode = proc.wait()
+            if self._cancel.is_set(): result.cancelled = True # cancel() أرسل SIGTERM بعد إغلاق المخرجات
+        finally:
+            sel.close(); proc.stdout.close(); proc.stderr.close()
+            if proc.poll() is None:
+                with self._lock: self._signal_group(signal.SIGKILL)
+                proc.wait()
+            with self._lock: self._proc = None
+            result.duration = time.monotonic() - start
@@ -0,0 +1,135 @@
+import colorsys
+import math
+import cairo
+import gi
+import numpy as np
+
+gi.require_version("Gtk", "3.0")
+gi.require_version("PangoCairo", "1.0")
+from gi.repository import Gtk, PangoCairo
+
+BACKGROUND = (0.145, 0.145, 0.145) # #252525 مثل خلفية السجل
+GRID = (0.25, 0.25, 0.25)
+TEXT = (0.93, 0.93, 0.93, 0.85)
+
+
+def channel_colors(count):
+    # ألوان متباعدة على دائرة الألوان (لكل نواة لون)
+    return [colorsys.hsv_to_rgb(i / max(count, 1), 0.55, 0.95) for i in range(count)]
+
+
+def nice_scale(value):
+    # أقرب قوة للعدد 2 أعلى من القيمة: المقياس يتغير نادراً فلا يُعاد الرسم كاملاً
+    if not value or value <= 1 or math.isnan(value): return 1.0
+    return 2.0 ** math.ceil(math.log2(value))
+
+
+class HistoryGraph(Gtk.DrawingArea):
+    # الرسم في سطح خلفي: كل تحديث يزيح السطح بعدد الأعمدة الجديدة ويرسم الشريط الجديد فقط،
+    # وكل عمود بكسل يمثل أدنى/أعلى قيمة لعيناته (تقليص min/max) فلا تضيع القمم القصيرة
+    def __init__(self, ring, title, summary, maximum=None, seconds=3600, colors=None, height=64, format_scale=None):
+        super().__init__()
+        self.ring = ring
+        self.title = title
+        self.summary = summary # آخر القيم -> نص
+        self.fixed_max = maximum # None: مقياس تلقائي (معدلات النقل)
+        self.format_scale = format_scale
+        self.seconds = seconds
+        self.colors = colors or channel_colors(ring.channels)
+        self.set_size_request(-1, height)
+        self._surface = None
+        self._spare = None # سطح ثانٍ للإزاحة (النسخ من السطح إلى نفسه غير معرّف)
+        self._head = 0 # آخر عمود مرسوم (قد يكون غير مكتمل)
+        self._per_column = 1
+        self._scale = maximum or 1.0
+        self._column_max = None # أعلى قيمة لكل عمود ظاهر، لتصغير المقياس عند خروج القمم
+        self.connect("draw", self.on_draw)
+
+    def set_ring(self, ring, seconds=None):
+        # تبديل مصدر البيانات (تسجيل محمّل أو العودة للبث المباشر) مع إعادة رسم كاملة
+        if len(self.colors) != ring.channels: self.colors = channel_colors(ring.channels) # تسجيل بعدد أنوية مختلف
+        self.ring = ring
+        if seconds: self.seconds = seconds
+        self._surface = None
+        self.queue_draw()
+
+    def update(self):
+        width, height = self.get_allocated_width(), self.get_allocated_height()
+        total = self.ring.total
+        if width < 2 or height < 2 or not total: return
+        if self._surface is None or (self._surface.get_width(), self._surface.get_height()) != (width, height):
+            self._rebuild(width, height); return
+        head = (total - 1) // self._per_column
+        shift = head - self._head
+        if shift >= width: self._rebuild(width, height); return
+        # العمود السابق يُعاد رسمه (كان غير مكتمل)، والعمود قبله لوصل الخط فقط
+        mins, maxs = self.ring.decimate(self._head - 1, head, self._per_column)
+        if self.fixed_max is None:
+            top = np.fmax.reduce(maxs[:, 1:], axis=None)
+            if top > self._scale: self._rebuild(width, height); return
+        if shift: self._scroll(shift)
+        self._head = head
+        self._draw_columns(head - shift, mins, maxs)
+        if self.fixed_max is None and self._scale > 1 and np.fmax.reduce(self._column_max) * 4 < self._scale: self._rebuild(width, height); return
+        self.queue_draw()
+
+    def _rebuild(self, width, height):
+        self._per_column = max(1, math.ceil(self.seconds / width))
+        self._head = (self.ring.total - 1) // self._per_column
+        first = self._head - width + 1
+        mins, maxs = self.ring.decimate(first - 1, self._head, self._per_column)
+        if self.fixed_max is None: self._scale = nice_scale(np.fmax.reduce(maxs, axis=None))
+        self._surface = cairo.ImageSurface(cairo.FORMAT_RGB24, width, height)
+        self._spare = cairo.ImageSurface(cairo.FORMAT_RGB24, width, height)
+        self._column_max = np.full(width, np.nan, dtype=np.float32)
+        self._draw_columns(first, mins, maxs)
+        self.queue_draw()
+
+    def _scroll(self, shift):
+        cr = cairo.Context(self._spare)
+        cr.set_operator(cairo.OPERATOR_SOURCE)
+        cr.set_source_surface(self._surface, -shift, 0); cr.paint()
+        self._surface, self._spare = self._spare, self._surface
+        self._column_max = np.roll(self._column_max, -shift); self._column_max[-shift:] = np.nan
+
+    def _draw_columns(self, first, mins, maxs):
+        # mins/maxs: (قنوات، أعمدة) تبدأ من العمود first - 1
+        width, height = self._surface.get_width(), self._surface.get_height()
+        x0 = width - 1 - (self._head - first)
+        columns = maxs.shape[1] - 1
+        cr = cairo.Context(self._surface)
+        cr.rectangle(x0, 0, columns, height); cr.set_source_rgb(*BACKGROUND); cr.fill()
+        cr.set_source_rgb(*GRID); cr.set_line_width(1)
+        for fraction in (0.25, 0.5, 0.75):
+            y = round(height * fraction) + 0.5
+            cr.move_to(x0, y); cr.line_to(x0 + columns, y)
+        cr.stroke()
+        # وصل كل عمود بسابقه: مد المدى نحو العمود السابق إذا لم يتقاطعا
+        lo, hi = mins[:, 1:], maxs[:, 1:]
+        prev_lo, prev_hi = mins[:, :-1], maxs[:, :-1]
+        lo = np.where(np.isnan(prev_hi), lo, np.fmin(lo, prev_hi)); hi = np.where(np.isnan(prev_lo), hi, np.fmax(hi, prev_lo))
+        scale = (height - 2) / self._scale
+        y_lo = height - 1 - np.clip(lo, 0, self._scale) * scale
+        y_hi = np.minimum(height - 1 - np.clip(hi, 0, self._scale) * scale, y_lo - 1) # خط بارتفاع بكسل واحد على الأقل
+        for channel, color in enumerate(self.colors):
+            cr.set_source_rgb(*color)
+            for i in np.flatnonzero(~np.isnan(lo[channel])):
+                x = x0 + i + 0.5
+                cr.move_to(x, y_lo[channel, i]); cr.line_to(x, y_hi[channel, i])
+            cr.stroke()
+        self._column_max[x0:x0 + columns] = np.fmax.reduce(hi, axis=0)
+
+    def on_draw(self, widget, cr):
+        if self._surface is None: self.update()
+        if self._surface is not None:
+            cr.set_source_surface(self._surface, 0, 0); cr.paint()
+        else:
+            cr.set_source_rgb(*BACKGROUND); cr.paint()
+        values = self.ring.latest()
+        text = self.title if values is None else f"{self.title}: {self.summary(values)}"
+        if self.format_scale: text += f"  (≤ {self.format_scale(self._scale)})"
+        # Pango لتشكيل النص العربي بشكل صحيح (cairo show_text لا يدعمه)
+        layout = self.create_pango_layout(text)
+        cr.set_source_rgba(*TEXT); cr.move_to(6, 2)
+        PangoCairo.show_layout(cr, layout)
+        return False
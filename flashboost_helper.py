@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# مساعد بصلاحيات يعمل طوال الجلسة: مصادقة واحدة عبر pkexec ثم عمليات محددة عبر مقبس Unix
+import argparse
+import json
+import os
+import re
+import socket
+import socketserver
+import stat
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from flashboost_sysctl import SysctlEngine, SysctlError, PROFILE_SYSCTL_KEYS
+from flashboost_psi import BOUNDS
+from flashboost_core import FlashBoostCore
+from flashboost_procmon import set_nice, set_ioprio, set_affinity, IOPRIO_CLASSES
+from flashboost_cgroups import CgroupEngine, CgroupError
+from flashboost_irq import AffinityEngine, AffinityError, nic_irqs, read_interrupts
+from flashboost_exec import CommandRunner, APT_STATUS_OPTION
+from flashboost_trace import TRACER
+
+HELPER_PATH = os.path.abspath(__file__)
+SYSCTL_KEY_RE = re.compile(r"^[a-z0-9_]+(\.[a-zA-Z0-9_\-]+)+$")
+# أي عميل بنفس المستخدم يصل إلى المساعد دون مصادقة إضافية: قوائم ثابتة فقط، لا أنماط
+SYSCTL_KEYS = frozenset(FlashBoostCore.STARTUP_SYSCTL) | frozenset(FlashBoostCore.NETWORK_TWEAKS) | frozenset(BOUNDS) | PROFILE_SYSCTL_KEYS
+SYSCTL_VALUE_RE = re.compile(r"^[0-9]{1,12}$")
+IFACE_RE = re.compile(r"^[A-Za-z0-9_.\-]{1,15}$")
+SIZE_RE = re.compile(r"^[0-9]+[KMG]?$")
+GOVERNORS = ("performance", "powersave", "schedutil", "ondemand", "conservative", "userspace")
+# خطوات إصلاح الحزم: أوامر ثابتة بدلاً من pkexec sh -c (نافذة مصادقة ثانية)
+PACKAGE_REPAIRS = {"update": ["apt-get", *APT_STATUS_OPTION.split(), "update"], "configure": ["dpkg", "--configure", "-a"],
+                   "fix-broken": ["apt-get", *APT_STATUS_OPTION.split(), "install", "--fix-broken", "-y"]}
+
+
+class HelperError(Exception):
+    pass
+
+
+class HelperOps:
+    # العمليات المسموحة فقط؛ أي شيء آخر يُرفض. root قابل للتغيير للاختبار على شجرة وهمية
+    # allowed_uid: المستخدم الوحيد الذي يمكن تعديل عملياته
+    def __init__(self, root="/", allowed_uid=None):
+        self.root = root
+        self.allowed_uid = os.getuid() if allowed_uid is None else allowed_uid
+        self.simulate = os.path.abspath(root) != "/" # في الشجرة الوهمية لا نستدعي systemctl/iw/journalctl
+        self.simulated_calls = []
+        self.progress = None # (النسبة، الرسالة) أثناء الدفعة الحالية، يضبطه الخادم
+        self.sysctl = SysctlEngine(self._path("proc"), self._path("var", "lib", "flashboost", "sysctl-snapshots.json"), allowed=SYSCTL_KEYS)
+        self.cgroups = CgroupEngine(self._path("sys", "fs", "cgroup"), self._path("var", "lib", "flashboost", "cgroup-profiles.json"), self._path("proc"))
+        self.affinity = AffinityEngine(self._path("proc"), self._path("sys"), self._path("var", "lib", "flashboost", "affinity-snapshots.json"))
+
+    def _path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def _run(self, argv):
+        if self.simulate: self.simulated_calls.append(argv); return ""
+        result = subprocess.run(argv, capture_output=True, text=True, timeout=120)
+        if result.returncode != 0: raise HelperError(result.stderr.strip() or f"{argv[0]} exited with {result.returncode}")
+        return result.stdout.strip()
+
+    def _sysctl_path(self, key):
+        if not isinstance(key, str) or not SYSCTL_KEY_RE.match(key) or ".." in key: raise HelperError(f"invalid sysctl key: {key!r}")
+        return self._path("proc", "sys", *key.split("."))
+
+    def op_ping(self):
+        return os.getpid()
+
+    def op_read_sysctl(self, key):
+        with open(self._sysctl_path(key)) as f: return f.read().strip()
+
+    def _check_value(self, key, value):
+        # كل المفاتيح المسموحة رقمية
+        if key not in SYSCTL_KEYS: raise HelperError(f"sysctl key not allowed: {key!r}")
+        value = str(value)
+        if not SYSCTL_VALUE_RE.match(value): raise HelperError(f"invalid sysctl value for {key}: {value!r}")
+        return value
+
+    def op_write_sysctl(self, key, value):
+        value = self._check_value(key, value)
+        if not os.path.exists(self._sysctl_path(key)): raise HelperError(f"sysctl key not found: {key}")
+        return self.sysctl.write(key, value)
+
+    def op_apply_sysctl(self, settings, snapshot=None):
+        if not isinstance(settings, dict): raise HelperError("settings must be a mapping")
+        for key, value in settings.items(): self._sysctl_path(key); self._check_value(key, value)
+        self._check_snapshot(snapshot)
+        return self.sysctl.apply(settings, snapshot)
+
+    def op_restore_sysctl(self, name):
+        return self.sysctl.restore(name)
+
+    def op_sysctl_snapshots(self):
+        return self.sysctl.snapshots()
+
+    def _check_pid(self, pid):
+        # عمليات المستخدم نفسه فقط: لا عمليات النظام ولا عمليات مستخدمين آخرين
+        if not isinstance(pid, int) or isinstance(pid, bool) or pid <= 0: raise HelperError(f"invalid pid: {pid!r}")
+        try: owner = os.stat(self._path("proc", str(pid))).st_uid
+        except FileNotFoundError: raise HelperError(f"no such process: {pid}")
+        if owner != self.allowed_uid: raise HelperError(f"process {pid} is not owned by uid {self.allowed_uid}")
+
+    def op_renice(self, pid, nice):
+        self._check_pid(pid)
+        if not isinstance(nice, int) or not -20 <= nice <= 19: raise HelperError("invalid renice arguments")
+        set_nice(pid, nice)
+        return os.getpriority(os.PRIO_PROCESS, pid)
+
+    def op_ionice(self, pid, ioclass, level=4):
+        self._check_pid(pid)
+        if ioclass not in IOPRIO_CLASSES or not isinstance(level, int) or not 0 <= level <= 7: raise HelperError("invalid ionice arguments")
+        return set_ioprio(pid, ioclass, level)
+
+    def _check_cpus(self, cpus):
+        if not isinstance(cpus, list) or not cpus or not all(isinstance(c, int) and not isinstance(c, bool) and 0 <= c < 4096 for c in cpus): raise HelperError(f"invalid CPU list: {cpus!r}")
+
+    def _check_snapshot(self, snapshot):
+        if snapshot is not None and (not isinstance(snapshot, str) or not re.match(r"^[a-z0-9_\-]{1,32}$", snapshot)): raise HelperError(f"invalid snapshot name: {snapshot!r}")
+
+    def op_set_affinity(self, pid, cpus):
+        self._check_pid(pid); self._check_cpus(cpus)
+        return set_affinity(pid, cpus)
+
+    def _check_nic_targets(self, irqs, rps, xps):
+        # مقاطعات وطوابير بطاقات الشبكة الفعلية فقط (ذات device)، لا مقاطعات القرص أو المؤقت أو غيرها
+        net_dir = self._path("sys", "class", "net")
+        if irqs:
+            allowed = {irq for found in nic_irqs(self._path("sys"), read_interrupts(self._path("proc"))).values() for irq in found}
+            for key in irqs:
+                if int(key) not in allowed: raise HelperError(f"IRQ {key} does not belong to a network device")
+        try: names = set(os.listdir(net_dir))
+        except OSError: names = set()
+        for key in list(rps or ()) + list(xps or ()):
+            iface = str(key).partition("/")[0]
+            if iface not in names or not os.path.exists(os.path.join(net_dir, iface, "device")): raise HelperError(f"not a network device: {iface!r}")
+
+    def op_apply_affinity(self, irqs=None, rps=None, xps=None, threads=None, snapshot=None):
+        # مسارات المقاطعات والطوابير تُبنى وتُتحقق في AffinityEngine.path؛ هنا الأنواع والأنوية والأجهزة
+        for name, mapping in (("irqs", irqs), ("rps", rps), ("xps", xps), ("threads", threads)):
+            if mapping is None: continue
+            if not isinstance(mapping, dict): raise HelperError(f"{name} must be a mapping")
+            for key, cpus in mapping.items():
+                if name == "irqs" and not str(key).isdigit(): raise HelperError(f"invalid IRQ: {key!r}")
+                if name == "threads": self._check_pid(int(key) if str(key).isdigit() else key)
+                self._check_cpus(cpus)
+        self._check_snapshot(snapshot)
+        self._check_nic_targets(irqs, rps, xps)
+        return self.affinity.apply(irqs, rps, xps, {int(pid): cpus for pid, cpus in (threads or {}).items()}, snapshot)
+
+    def op_restore_affinity(self, name):
+        return self.affinity.restore(name)
+
+    def op_affinity_snapshots(self):
+        return self.affinity.snapshots()
+
+    def op_apply_cgroup_profile(self, profile, pid=None):
+        # ملفات تعريف معرفة مسبقاً فقط؛ لا كتابة لمسارات cgroup عشوائية.
+        # المستخدم من SO_PEERCRED (allowed_uid) وليس من الطلب، والعملية يجب أن تكون له
+        if pid is not None: self._check_pid(pid)
+        return self.cgroups.apply(profile, pid, self.allowed_uid)
+
+    def op_revert_cgroup_profile(self, profile):
+        return self.cgroups.revert(profile)
+
+    def op_cgroup_profiles(self):
+        return self.cgroups.active()
+
+    def op_vacuum_journal(self, max_size):
+        if not isinstance(max_size, str) or not SIZE_RE.match(max_size): raise HelperError(f"invalid size: {max_size!r}")
+        return self._run(["journalctl", f"--vacuum-size={max_size}"])
+
+    def op_set_governor(self, governor):
+        if governor not in GOVERNORS: raise HelperError(f"invalid governor: {governor!r}")
+        cpu_dir = self._path("sys", "devices", "system", "cpu"); changed = 0
+        for name in sorted(os.listdir(cpu_dir)):
+            path = os.path.join(cpu_dir, name, "cpufreq", "scaling_governor")
+            if re.match(r"^cpu[0-9]+$", name) and os.path.exists(path):
+                with open(path, "w") as f: f.write(governor)
+                changed += 1
+        if not changed: raise HelperError("cpufreq scaling_governor not available")
+        return changed
+
+    def op_wifi_power_save(self, iface, enabled):
+        if not isinstance(iface, str) or not IFACE_RE.match(iface): raise HelperError(f"invalid interface: {iface!r}")
+        self._run(["iw", "dev", iface, "set", "power_save", "on" if enabled else "off"]); return bool(enabled)
+
+    def op_repair_packages(self, step):
+        argv = PACKAGE_REPAIRS.get(step) if isinstance(step, str) else None
+        if argv is None: raise HelperError(f"invalid package repair step: {step!r}")
+        if self.simulate: self.simulated_calls.append(argv); return []
+        result = CommandRunner(on_progress=self.progress).run(argv, timeout=180, shell=False)
+        if result.timed_out: raise HelperError(f"{' '.join(argv)} timed out")
+        if result.returncode != 0: raise HelperError("\n".join(result.stderr_tail) or f"{argv[0]} exited with {result.returncode}")
+        return list(result.stdout_tail)[-5:]
+
+    def execute(self, op):
+        if not isinstance(op, dict) or not isinstance(op.get("op"), str): raise HelperError("malformed operation")
+        handler = getattr(self, f"op_{op['op']}", None)
+        if handler is None: raise HelperError(f"operation not allowed: {op['op']}")
+        args = {k: v for k, v in op.items() if k != "op"}
+        try: return handler(**args)
+        except TypeError as e: raise HelperError(f"bad arguments for {op['op']}: {e}")
+
+    def execute_batch(self, ops, stop_on_error=True, progress=None):
+        if not isinstance(ops, list): raise HelperError("ops must be a list")
+        results = []; self.progress = progress
+        try:
+            for op in ops:
+                try: results.append({"ok": True, "value": self.execute(op)})
+                except (HelperError, SysctlError, CgroupError, AffinityError, OSError, subprocess.SubprocessError) as e:
+                    results.append({"ok": False, "error": str(e)})
+                    if stop_on_error: break
+                except Exception as e:
+                    # خطأ غير متوقع في محرك: نتيجة فاشلة بدلاً من إنهاء خيط الاتصال
+                    results.append({"ok": False, "error": f"{type(e).__name__}: {e}"})
+                    if stop_on_error: break
+        finally: self.progress = None
+        return results
+
+
+def check_socket_dir(path, uid):
+    # مجلد المقبس يجب أن يكون مجلداً حقيقياً يملكه المستخدم (أو root) ولا يكتب فيه غيره:
+    # مسار /tmp المتوقع قد ينشئه مستخدم آخر مسبقاً ليضع رابطاً رمزياً أو مقبساً مزيفاً
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode): raise HelperError(f"socket directory is not a directory: {path}")
+    if st.st_uid not in (uid, 0): raise HelperError(f"socket directory {path} is owned by uid {st.st_uid}")
+    if st.st_mode & 0o077: raise HelperError(f"socket directory {path} must have mode 0700")
+
+
+def peer_uid(sock):
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", creds)[1]
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        uid = peer_uid(self.request)
+        if uid not in (0, server.allowed_uid): return # اتصال من مستخدم آخر
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if request.get("shutdown"): self._reply({"id": request.get("id"), "results": []}); server.stop(); return
+                progress = lambda percent, message, request_id=request.get("id"): self._progress(request_id, percent, message)
+                with server.ops_lock: results = server.ops.execute_batch(request.get("ops", []), request.get("stop_on_error", True), progress)
+                self._reply({"id": request.get("id"), "results": results})
+            except (ValueError, AttributeError, HelperError) as e: self._reply({"id": None, "error": f"bad request: {e}"})
+
+    def _reply(self, payload):
+        self.wfile.write(json.dumps(payload).encode() + b"\n"); self.wfile.flush()
+
+    def _progress(self, request_id, percent, message):
+        # أسطر تقدم apt قبل الرد النهائي بنفس المعرف؛ انقطاع العميل لا يوقف الإصلاح في منتصفه
+        try: self._reply({"id": request_id, "progress": [percent, message]})
+        except OSError: pass
+
+
+class HelperServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, allowed_uid, root="/"):
+        self.allowed_uid = allowed_uid
+        self.ops = HelperOps(root, allowed_uid)
+        self.ops_lock = threading.Lock()
+        check_socket_dir(os.path.dirname(socket_path), allowed_uid)
+        # unlink لا يتبع الروابط الرمزية؛ والمقبس يُنشأ بأذونات 0700 من umask فلا حاجة لـ chmod
+        if os.path.lexists(socket_path) and not os.path.isdir(socket_path): os.unlink(socket_path)
+        old_umask = os.umask(0o077)
+        try: super().__init__(socket_path, _Handler)
+        finally: os.umask(old_umask)
+        if os.geteuid() == 0: os.lchown(socket_path, allowed_uid, -1)
+
+    def stop(self):
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+    def watch_parent(self, parent_pid, interval=2.0):
+        # إنهاء المساعد عند انتهاء جلسة التطبيق
+        def watch():
+            while True:
+                time.sleep(interval)
+                try: os.kill(parent_pid, 0)
+                except ProcessLookupError: self.stop(); return
+                except PermissionError: pass
+        threading.Thread(target=watch, daemon=True).start()
+
+
+class PrivilegedHelper:
+    # جهة العميل: تشغيل المساعد مرة واحدة (pkexec) وإرسال دفعات من العمليات
+    def __init__(self, socket_path=None, launcher=("pkexec",), root="/", start_timeout=90.0):
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or f"/tmp/flashboost-{os.getuid()}"
+        self.socket_path = socket_path or os.path.join(runtime_dir, "flashboost-helper.sock")
+        self.launcher = list(launcher)
+        self.root = root
+        self.start_timeout = start_timeout
+        self._sock = None
+        self._file = None
+        self._proc = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        check_socket_dir(os.path.dirname(self.socket_path), os.getuid())
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try: sock.connect(self.socket_path)
+        except OSError: sock.close(); raise
+        # المساعد يعمل بصلاحيات root (أو بصلاحياتنا دون مُشغّل): لا نرسل شيئاً لخادم آخر ينتحل المسار
+        expected = os.geteuid() if not self.launcher else 0
+        uid = peer_uid(sock)
+        if uid != expected: sock.close(); raise HelperError(f"helper socket is served by uid {uid}, expected {expected}")
+        self._sock, self._file = sock, sock.makefile("rb")
+
+    def _start(self):
+        # يشمل نافذة المصادقة: زمنها يظهر في التتبع كجزء من أول رحلة للمساعد
+        with TRACER.span("helper start", "helper", launcher=" ".join(self.launcher)) as span:
+            try: self._launch()
+            except HelperError as e: span.set(error=str(e)); raise
+
+    def _launch(self):
+        os.makedirs(os.path.dirname(self.socket_path), mode=0o700, exist_ok=True)
+        argv = self.launcher + [sys.executable, HELPER_PATH, "serve", "--socket", self.socket_path,
+                                "--uid", str(os.getuid()), "--parent-pid", str(os.getpid()), "--root", self.root]
+        self._proc = subprocess.Popen(argv, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + self.start_timeout
+        while time.monotonic() < deadline:
+            if self._proc.poll() is not None:
+                code = self._proc.returncode; self._proc = None
+                if code in (126, 127): raise HelperError("authentication cancelled or failed")
+                raise HelperError(f"helper exited with code {code}")
+            try: self._connect(); return
+            except OSError: time.sleep(0.05)
+        raise HelperError("timed out waiting for the privileged helper")
+
+    @property
+    def connected(self):
+        return self._sock is not None
+
+    def ensure_started(self):
+        with self._lock:
+            if self._sock is None:
+                try: self._connect()
+                except OSError: self._start()
+
+    def call(self, ops, stop_on_error=True, on_progress=None):
+        # ops: قائمة قواميس مثل {"op": "write_sysctl", "key": "vm.swappiness", "value": 10}
+        # on_progress(النسبة، الرسالة) لعمليات طويلة مثل repair_packages
+        ops = list(ops)
+        with TRACER.span("helper call", "helper", ops=",".join(str(op.get("op")) for op in ops)) as span:
+            results = self._call(ops, stop_on_error, on_progress)
+            span.set(ok=sum(1 for r in results if r.get("ok")), count=len(results))
+        return results
+
+    def _call(self, ops, stop_on_error, on_progress=None):
+        self.ensure_started()
+        with self._lock:
+            self._next_id += 1
+            request = {"id": self._next_id, "ops": list(ops), "stop_on_error": stop_on_error}
+            try: self._sock.sendall(json.dumps(request).encode() + b"\n")
+            except OSError as e: self._reset(); raise HelperError(f"helper connection lost: {e}")
+            while True:
+                try: line = self._file.readline()
+                except OSError as e: self._reset(); raise HelperError(f"helper connection lost: {e}")
+                if not line: self._reset(); raise HelperError("helper connection closed")
+                reply = json.loads(line)
+                if "progress" not in reply: break
+                if on_progress: on_progress(*reply["progress"])
+        if "error" in reply: raise HelperError(reply["error"])
+        return reply["results"]
+
+    def _reset(self):
+        if self._file: self._file.close()
+        if self._sock: self._sock.close()
+        self._sock = self._file = None
+
+    def close(self):
+        with self._lock:
+            if self._sock:
+                try:
+                    self._sock.sendall(b'{"shutdown": true}\n'); self._file.readline()
+                except OSError: pass
+            self._reset()
+            if self._proc:
+                try: self._proc.wait(timeout=2)
+                except subprocess.TimeoutExpired: pass
+                self._proc = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FlashBoost privileged helper")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve")
+    serve.add_argument("--socket", required=True)
+    serve.add_argument("--uid", type=int, required=True)
+    serve.add_argument("--parent-pid", type=int)
+    serve.add_argument("--root", default="/")
+    args = parser.parse_args(argv)
+    server = HelperServer(args.socket, args.uid, args.root)
+    if args.parent_pid: server.watch_parent(args.parent_pid)
+    try: server.serve_forever()
+    finally:
+        server.server_close()
+        try: os.unlink(args.socket)
+        except OSError: pass
+
+
+if __name__ == "__main__":
+    main()
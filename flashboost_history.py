@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+import numpy as np
+from flashboost_procfs import PersistentFile
+from flashboost_trace import TRACER
+
+SECTOR_SIZE = 512 # وحدة /proc/diskstats دائماً 512 بايت
+# أجهزة افتراضية أو تكرر عدّ أجهزة أخرى
+SKIP_DISKS = ("loop", "ram", "zram", "dm-", "md", "sr")
+PSI_RESOURCES = ("cpu", "memory", "io")
+
+
+class HistoryRing:
+    # حلقة numpy ثابتة الحجم (قنوات × سعة)؛ total يعدّ كل العينات منذ البدء فتبقى أعمدة الرسم محاذاة له
+    def __init__(self, channels, capacity=4 * 3600):
+        self.channels = channels
+        self.capacity = capacity
+        self.data = np.full((channels, capacity), np.nan, dtype=np.float32)
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def append(self, values):
+        with self._lock:
+            self.data[:, self.total % self.capacity] = values
+            self.total += 1
+
+    @property
+    def oldest(self):
+        return max(0, self.total - self.capacity)
+
+    def window(self, start, stop):
+        # العينات [start, stop) بالترقيم المطلق؛ ما خرج من الحلقة أو لم يصل بعد يُعاد NaN
+        out = np.full((self.channels, max(0, stop - start)), np.nan, dtype=np.float32)
+        with self._lock:
+            lo = max(start, self.total - self.capacity, 0); hi = min(stop, self.total)
+            if hi > lo: out[:, lo - start:hi - start] = self.data[:, np.arange(lo, hi) % self.capacity]
+        return out
+
+    def decimate(self, first_column, last_column, per_column):
+        # أدنى/أعلى قيمة لكل عمود بكسل: العمود c يغطي العينات [c*per_column, (c+1)*per_column)
+        # fmin/fmax تتجاهل NaN دون تحذيرات، والعمود الفارغ يبقى NaN
+        columns = last_column - first_column + 1
+        samples = self.window(first_column * per_column, (last_column + 1) * per_column).reshape(self.channels, columns, per_column)
+        return np.fmin.reduce(samples, axis=2), np.fmax.reduce(samples, axis=2)
+
+    def latest(self):
+        with self._lock:
+            if not self.total: return None
+            return self.data[:, (self.total - 1) % self.capacity].copy()
+
+
+class HistoryRecorder:
+    # عينة واحدة كل interval لكل مجموعة: أنوية المعالج، الذاكرة/المبادلة، القرص (قراءة/كتابة)، الشبكة (استقبال/إرسال)، الحرارة، PSI
+    def __init__(self, system_info, interval=1.0, capacity=4 * 3600, on_collect=None):
+        self.system_info = system_info
+        self.proc_root = system_info.proc_root
+        self.sys_root = system_info.sys_root
+        self.interval = interval
+        self.on_collect = on_collect # (الوقت، {المجموعة: القيم}) بعد كل عينة، مثل المسجل الثنائي
+        self._files = {}
+        self._last = {}
+        self.cores = self._count_cores()
+        self.rings = {
+            "cpu": HistoryRing(self.cores, capacity),
+            "memory": HistoryRing(2, capacity),
+            "disk": HistoryRing(2, capacity),
+            "net": HistoryRing(2, capacity),
+            "temp": HistoryRing(1, capacity),
+            "psi": HistoryRing(len(PSI_RESOURCES), capacity),
+        }
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _read(self, name):
+        f = self._files.get(name)
+        if f is None: f = self._files[name] = PersistentFile(os.path.join(self.proc_root, name), 16384)
+        n = f.read()
+        return bytes(f.buf[:n]).split(b"\n")
+
+    def _count_cores(self):
+        return sum(1 for line in self._read("stat") if line.startswith(b"cpu") and line[3:4].isdigit()) or 1
+
+    def _rate(self, key, values, now):
+        # فرق العدادات مقسوماً على الزمن؛ أول قراءة تعيد NaN
+        last = self._last.get(key); self._last[key] = (now, values)
+        if last is None or now <= last[0]: return np.full(len(values), np.nan, dtype=np.float32)
+        return (np.asarray(values, dtype=np.float64) - last[1]) / (now - last[0])
+
+    def _cpu(self, now):
+        busy, total = [], []
+        for line in self._read("stat"):
+            if not (line.startswith(b"cpu") and line[3:4].isdigit()): continue
+            values = [int(v) for v in line.split()[1:9]]
+            total.append(sum(values)); busy.append(sum(values) - values[3] - values[4])
+        if len(total) != self.cores: return np.full(self.cores, np.nan) # نواة أُضيفت أو أُزيلت
+        last = self._last.get("cpu"); current = np.array([busy, total], dtype=np.float64); self._last["cpu"] = (now, current)
+        if last is None: return np.full(self.cores, np.nan)
+        d_busy, d_total = current - last[1]
+        with np.errstate(invalid="ignore", divide="ignore"): return np.clip(d_busy * 100.0 / d_total, 0.0, 100.0)
+
+    def _memory(self):
+        fields = {}
+        for line in self._read("meminfo"):
+            name, _, value = line.partition(b":")
+            if name in (b"MemTotal", b"MemAvailable", b"SwapTotal", b"SwapFree"): fields[name] = int(value.split()[0])
+        ram = (fields[b"MemTotal"] - fields[b"MemAvailable"]) * 100.0 / fields[b"MemTotal"] if fields.get(b"MemTotal") else np.nan
+        swap = (fields[b"SwapTotal"] - fields[b"SwapFree"]) * 100.0 / fields[b"SwapTotal"] if fields.get(b"SwapTotal") else 0.0
+        return ram, swap
+
+    def _disk(self, now):
+        read = written = 0
+        for line in self._read("diskstats"):
+            fields = line.split()
+            if len(fields) < 10: continue
+            name = fields[2].decode()
+            if name.startswith(SKIP_DISKS) or not os.path.exists(os.path.join(self.sys_root, "block", name)): continue # الأقسام ليست في /sys/block
+            read += int(fields[5]); written += int(fields[9])
+        return self._rate("disk", [read * SECTOR_SIZE, written * SECTOR_SIZE], now)
+
+    def _net(self, now):
+        rx = tx = 0
+        for line in self._read("net/dev")[2:]:
+            name, _, data = line.partition(b":")
+            fields = data.split()
+            if len(fields) < 9 or name.strip() == b"lo": continue
+            rx += int(fields[0]); tx += int(fields[8])
+        return self._rate("net", [rx, tx], now)
+
+    def _psi(self):
+        # some avg10 لكل مورد؛ NaN إذا لم تكن النواة تدعم PSI
+        values = []
+        for resource in PSI_RESOURCES:
+            try: line = self._read(f"pressure/{resource}")[0]
+            except OSError: values.append(np.nan); continue
+            values.append(float(line.split(b"avg10=")[1].split()[0]) if b"avg10=" in line else np.nan)
+        return values
+
+    def collect(self):
+        with TRACER.span("history", "sampler"): return self._collect()
+
+    def _collect(self):
+        now = time.monotonic(); timestamp = time.time(); sample = {}
+        for group, reader in (("cpu", lambda: self._cpu(now)), ("memory", self._memory), ("disk", lambda: self._disk(now)),
+                              ("net", lambda: self._net(now)), ("temp", lambda: (self.system_info.thermal.read_primary() or np.nan,)), ("psi", self._psi)):
+            try: values = reader()
+            except (OSError, ValueError, KeyError) as e: print(f"History error ({group}): {e}"); values = np.full(self.rings[group].channels, np.nan)
+            self.rings[group].append(values); sample[group] = values
+        if self.on_collect:
+            try: self.on_collect(timestamp, sample)
+            except Exception as e: print(f"History sink error: {e}")
+        return sample
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="flashboost-history", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread: self._thread.join(timeout); self._thread = None
+        for f in self._files.values(): f.close()
+        self._files.clear()
+
+    def _run(self):
+        # مواعيد ثابتة (لا انجراف) لتبقى العينة الواحدة = ثانية واحدة على المحور الأفقي
+        due = time.monotonic()
+        while not self._stop.is_set():
+            self.collect()
+            due += self.interval
+            if due < time.monotonic() - self.interval: due = time.monotonic() # بعد السبات: لا نعوض العينات الفائتة
+            self._stop.wait(max(0.0, due - time.monotonic()))
@@ -0,0 +1,286 @@
+import errno
+import json
+import os
+import re
+import threading
+from flashboost_procmon import parse_cpu_list, threads_of
+
+IFACE_RE = re.compile(r"^[A-Za-z0-9_.\-]{1,15}$")
+QUEUE_RE = re.compile(r"^(rx|tx)-[0-9]+$")
+# ملف كل نوع داخل مجلد الطابور
+QUEUE_FILES = {"rps": "rps_cpus", "xps": "xps_cpus"}
+MODES = ("isolate", "spread")
+
+
+class AffinityError(Exception):
+    pass
+
+
+def format_cpu_list(cpus):
+    # [0, 1, 2, 3, 6] -> "0-3,6"
+    parts = []; cpus = sorted(set(cpus))
+    for i, cpu in enumerate(cpus):
+        if i and cpu == cpus[i - 1] + 1 and parts[-1][1] == cpu - 1: parts[-1][1] = cpu
+        else: parts.append([cpu, cpu])
+    return ",".join(str(lo) if lo == hi else f"{lo}-{hi}" for lo, hi in parts)
+
+
+def parse_cpu_mask(text):
+    # "00000000,0000000f" (كما في rps_cpus) -> [0, 1, 2, 3]
+    mask = int(text.replace(",", "").strip() or "0", 16)
+    return [cpu for cpu in range(mask.bit_length()) if mask >> cpu & 1]
+
+
+def format_cpu_mask(cpus):
+    # مجموعات 32 بت مفصولة بفواصل كما تقبلها النواة
+    mask = sum(1 << cpu for cpu in set(cpus))
+    digits = f"{mask:x}"
+    digits = digits.zfill((len(digits) + 7) // 8 * 8)
+    return ",".join(digits[i:i + 8] for i in range(0, len(digits), 8))
+
+
+def online_cpus(sys_root='/sys'):
+    try:
+        with open(os.path.join(sys_root, "devices", "system", "cpu", "online")) as f: return sorted(parse_cpu_list(f.read()))
+    except (OSError, ValueError): return list(range(os.cpu_count() or 1))
+
+
+def read_interrupts(proc_root='/proc'):
+    # رقم المقاطعة -> (اسم الجهاز/الإجراء، مجموع العدّ على كل الأنوية)
+    interrupts = {}
+    with open(os.path.join(proc_root, "interrupts")) as f:
+        columns = len(f.readline().split())
+        for line in f:
+            fields = line.split()
+            if not fields or not fields[0].rstrip(":").isdigit(): continue # NMI و LOC وغيرها ليست قابلة للتوجيه
+            counts = [int(v) for v in fields[1:columns + 1] if v.isdigit()]
+            interrupts[int(fields[0].rstrip(":"))] = (fields[-1] if len(fields) > len(counts) + 1 else "", sum(counts))
+    return interrupts
+
+
+def nic_irqs(sys_root='/sys', interrupts=None):
+    # الواجهة -> [المقاطعات]؛ الواجهات الافتراضية (دون device) تُتخطى
+    net_dir = os.path.join(sys_root, "class", "net")
+    try: names = sorted(os.listdir(net_dir))
+    except OSError: return {}
+    nics = {}
+    for iface in names:
+        device = os.path.join(net_dir, iface, "device")
+        if not IFACE_RE.match(iface) or not os.path.exists(device): continue
+        try: irqs = [int(n) for n in os.listdir(os.path.join(device, "msi_irqs")) if n.isdigit()]
+        except OSError: irqs = []
+        if not irqs and interrupts: # دون MSI: بالاسم في /proc/interrupts (مثل "eth0" أو "eth0-rx-0")
+            irqs = [irq for irq, (name, _) in interrupts.items() if name == iface or name.startswith(iface + "-")]
+        if not irqs:
+            try:
+                with open(os.path.join(device, "irq")) as f: irq = int(f.read())
+                if irq > 0: irqs = [irq]
+            except (OSError, ValueError): pass
+        if interrupts is not None: irqs = [irq for irq in irqs if irq in interrupts]
+        if irqs: nics[iface] = sorted(irqs)
+    return nics
+
+
+def queues(sys_root, iface, kind):
+    # أسماء طوابير الاستقبال (rx) أو الإرسال (tx) مرتبة بالرقم، ذات ملف rps_cpus/xps_cpus فقط
+    queue_dir = os.path.join(sys_root, "class", "net", iface, "queues")
+    prefix, name = ("rx-", "rps_cpus") if kind == "rx" else ("tx-", "xps_cpus")
+    try: found = [q for q in os.listdir(queue_dir) if q.startswith(prefix) and os.path.exists(os.path.join(queue_dir, q, name))]
+    except OSError: return []
+    return sorted(found, key=lambda q: int(q[3:]))
+
+
+def irqbalance_running(proc_root='/proc'):
+    # irqbalance يعيد توزيع المقاطعات دورياً ويلغي ما نكتبه
+    try: pids = [p for p in os.listdir(proc_root) if p.isdigit()]
+    except OSError: return False
+    for pid in pids:
+        try:
+            with open(os.path.join(proc_root, pid, "comm")) as f:
+                if f.read().strip() == "irqbalance": return True
+        except OSError: continue
+    return False
+
+
+class AffinityPlan:
+    # القيم المطلوبة فقط (لا كتابة)؛ as_op تحولها إلى عملية للمساعد
+    def __init__(self, mode, cpus):
+        self.mode = mode
+        self.cpus = cpus
+        self.irq_cpus = [] # أنوية المقاطعات ومعالجة الحزم
+        self.app_cpus = [] # الأنوية المتبقية للتطبيق المحدد
+        self.nics = {}
+        self.irqs = {} # المقاطعة -> الأنوية
+        self.rps = {} # "eth0/rx-0" -> الأنوية
+        self.xps = {} # "eth0/tx-0" -> الأنوية
+        self.threads = {} # PID -> الأنوية
+        self.skipped = {} # العنصر -> السبب
+
+    @property
+    def empty(self):
+        return not (self.irqs or self.rps or self.xps or self.threads)
+
+    def as_op(self, snapshot=None):
+        return {"op": "apply_affinity", "irqs": {str(k): v for k, v in self.irqs.items()}, "rps": dict(self.rps), "xps": dict(self.xps),
+                "threads": {str(k): v for k, v in self.threads.items()}, "snapshot": snapshot}
+
+
+def plan_affinity(proc_root='/proc', sys_root='/sys', mode="isolate", pid=None, irq_cpus=None):
+    # isolate: مقاطعات الشبكة و RPS على أنوية قليلة (الأولى افتراضياً)، وخيوط التطبيق على الباقي
+    # spread: مقاطعة واحدة لكل نواة بالتناوب، و RPS للواجهات ذات طابور استقبال واحد فقط
+    # XPS في الحالتين: كل نواة مرتبطة بطابور إرسال واحد (لا تنافس على قفل الطابور)
+    if mode not in MODES: raise AffinityError(f"unknown affinity mode: {mode!r}")
+    cpus = online_cpus(sys_root)
+    plan = AffinityPlan(mode, cpus)
+    if len(cpus) < 2: plan.skipped["cpus"] = "single-cpu"; return plan
+    try: interrupts = read_interrupts(proc_root)
+    except OSError: interrupts = None
+    plan.nics = nic_irqs(sys_root, interrupts)
+    if not plan.nics: plan.skipped["nic"] = "no-nic"
+    if mode == "isolate":
+        if irq_cpus:
+            plan.irq_cpus = sorted(set(irq_cpus))
+            if not set(plan.irq_cpus) <= set(cpus): raise AffinityError(f"CPUs not online: {format_cpu_list(set(plan.irq_cpus) - set(cpus))}")
+        else: plan.irq_cpus = cpus[:max(1, len(cpus) // 4)]
+        plan.app_cpus = [cpu for cpu in cpus if cpu not in plan.irq_cpus]
+        if not plan.app_cpus: raise AffinityError("no CPUs left for the application")
+    else: plan.irq_cpus = plan.app_cpus = list(cpus)
+    for iface, irqs in plan.nics.items():
+        for i, irq in enumerate(irqs): plan.irqs[irq] = [plan.irq_cpus[i % len(plan.irq_cpus)]]
+        rx = queues(sys_root, iface, "rx"); tx = queues(sys_root, iface, "tx")
+        if not rx: plan.skipped[f"{iface}/rps"] = "no-rps"
+        elif mode == "isolate":
+            for queue in rx: plan.rps[f"{iface}/{queue}"] = list(plan.irq_cpus)
+        elif len(rx) == 1:
+            spread = [cpu for cpu in cpus if [cpu] != plan.irqs.get(irqs[0])]
+            plan.rps[f"{iface}/{rx[0]}"] = spread
+        if len(tx) > 1:
+            for j, queue in enumerate(tx):
+                mapped = cpus[j::len(tx)]
+                if mapped: plan.xps[f"{iface}/{queue}"] = mapped
+    if pid is not None:
+        if mode == "isolate": plan.threads[pid] = list(plan.app_cpus)
+        else: plan.skipped[f"pid:{pid}"] = "spread"
+    return plan
+
+
+class AffinityEngine:
+    # كتابة توجيه المقاطعات و RPS/XPS وأنوية الخيوط مع التحقق، ولقطات مسماة للتراجع (مثل SysctlEngine)
+    def __init__(self, proc_root='/proc', sys_root='/sys', state_path=None):
+        self.proc_root = proc_root
+        self.sys_root = sys_root
+        self.state_path = state_path
+        self._memory_state = {}
+        self._lock = threading.Lock()
+
+    def path(self, kind, key):
+        if kind == "irq":
+            if not str(key).isdigit(): raise AffinityError(f"invalid IRQ: {key!r}")
+            return os.path.join(self.proc_root, "irq", str(int(key)), "smp_affinity_list")
+        iface, _, queue = str(key).partition("/")
+        if kind not in QUEUE_FILES or not IFACE_RE.match(iface) or not QUEUE_RE.match(queue) or queue[:2] != ("rx" if kind == "rps" else "tx"):
+            raise AffinityError(f"invalid {kind} queue: {key!r}")
+        return os.path.join(self.sys_root, "class", "net", iface, "queues", queue, QUEUE_FILES[kind])
+
+    def read(self, kind, key):
+        # قائمة الأنوية الحالية، أو None إذا لم يعد العنصر موجوداً
+        if kind == "task":
+            try: return sorted(os.sched_getaffinity(int(key.rpartition("/")[2])))
+            except (ProcessLookupError, FileNotFoundError): return None
+        try:
+            with open(self.path(kind, key)) as f: text = f.read()
+        except FileNotFoundError: return None
+        return sorted(parse_cpu_list(text)) if kind == "irq" else parse_cpu_mask(text)
+
+    def write(self, kind, key, cpus):
+        if kind == "task":
+            os.sched_setaffinity(int(key.rpartition("/")[2]), cpus)
+        else:
+            with open(self.path(kind, key), "w") as f: f.write(format_cpu_list(cpus) if kind == "irq" else format_cpu_mask(cpus))
+        actual = self.read(kind, key)
+        if actual is not None and actual != sorted(set(cpus)):
+            raise AffinityError(f"{kind} {key}: wrote {format_cpu_list(cpus)!r} but kernel reports {format_cpu_list(actual)!r}")
+        return actual
+
+    def targets(self, irqs=None, rps=None, xps=None, threads=None):
+        targets = [("irq", str(k), v) for k, v in (irqs or {}).items()]
+        targets += [("rps", k, v) for k, v in (rps or {}).items()] + [("xps", k, v) for k, v in (xps or {}).items()]
+        for pid, cpus in (threads or {}).items():
+            targets += [("task", f"{pid}/{tid}", cpus) for tid in sorted(threads_of(pid, self.proc_root))]
+        return targets
+
+    def apply(self, irqs=None, rps=None, xps=None, threads=None, snapshot=None):
+        # كل شيء أو لا شيء، عدا المقاطعات التي تديرها النواة (EIO) والخيوط المنتهية فتُتخطى
+        with self._lock:
+            skipped = {f"pid:{pid}": "gone" for pid in (threads or {}) if not threads_of(pid, self.proc_root)}
+            previous = {}
+            for kind, key, cpus in self.targets(irqs, rps, xps, threads):
+                current = self.read(kind, key)
+                if current is None: skipped[f"{kind}:{key}"] = "missing"; continue
+                previous[(kind, key)] = (current, cpus)
+            applied, written = {}, []
+            try:
+                for (kind, key), (old, cpus) in previous.items():
+                    try: new = self.write(kind, key, cpus)
+                    except OSError as e:
+                        if kind == "irq" and e.errno == errno.EIO: skipped[f"irq:{key}"] = "managed"; continue
+                        if kind == "task" and isinstance(e, ProcessLookupError): skipped[f"task:{key}"] = "gone"; continue
+                        raise
+                    written.append((kind, key)); applied[f"{kind}:{key}"] = (format_cpu_list(old), format_cpu_list(new or cpus))
+            except (OSError, AffinityError) as e:
+                errors = self._rollback([(k, n, previous[(k, n)][0]) for k, n in written])
+                detail = f"; rollback failed for {', '.join(errors)}" if errors else ""
+                raise AffinityError(f"failed to apply {kind} {key}: {e}{detail}") from e
+            if snapshot and applied:
+                state = self._load_state(); saved = state.setdefault(snapshot, {})
+                # القيمة الأصلية الأولى تبقى عند تكرار التعزيز
+                for name, (old, _) in applied.items(): saved.setdefault(name, old)
+                self._store_state(state)
+            return {"applied": applied, "skipped": skipped}
+
+    def _rollback(self, values):
+        errors = []
+        for kind, key, cpus in reversed(values):
+            try: self.write(kind, key, cpus)
+            except (OSError, AffinityError): errors.append(f"{kind}:{key}")
+        return errors
+
+    def restore(self, name):
+        # الخيوط المنتهية والواجهات المزالة لا تُعد خطأ؛ خيوط أُنشئت بعد التثبيت تأخذ قيمة الخيط الرئيسي
+        with self._lock:
+            state = self._load_state()
+            saved = state.get(name)
+            if saved is None: raise AffinityError(f"no affinity snapshot named {name!r}")
+            values = dict(saved)
+            for pid in {n[5:].partition("/")[0] for n in saved if n.startswith("task:")}:
+                original = saved.get(f"task:{pid}/{pid}") or next(v for n, v in saved.items() if n.startswith(f"task:{pid}/"))
+                for tid in threads_of(int(pid), self.proc_root): values.setdefault(f"task:{pid}/{tid}", original)
+            restored, gone, failed = {}, [], {}
+            for name_key, text in values.items():
+                kind, _, key = name_key.partition(":")
+                if self.read(kind, key) is None: gone.append(name_key); continue
+                try: restored[name_key] = format_cpu_list(self.write(kind, key, sorted(parse_cpu_list(text)) if text else []) or ())
+                except ProcessLookupError: gone.append(name_key)
+                except (OSError, AffinityError, ValueError) as e: failed[name_key] = str(e)
+            if failed: state[name] = {k: saved[k] for k in failed if k in saved}
+            else: state.pop(name, None)
+            self._store_state(state)
+            if failed: raise AffinityError(f"failed to restore {', '.join(failed)}")
+            return {"restored": restored, "gone": [n for n in gone if n in saved]}
+
+    def snapshots(self):
+        with self._lock: return self._load_state()
+
+    def _load_state(self):
+        if not self.state_path: return self._memory_state
+        try:
+            with open(self.state_path) as f: return json.load(f)
+        except FileNotFoundError: return {}
+        except ValueError: print(f"Corrupt affinity snapshot file: {self.state_path}"); return {}
+
+    def _store_state(self, state):
+        if not self.state_path: self._memory_state = state; return
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w") as f: json.dump(state, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.state_path)
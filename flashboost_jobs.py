@@ -0,0 +1,177 @@
+import itertools
+import threading
+import time
+from collections import deque
+from flashboost_trace import TRACER
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED, SKIPPED = "queued", "running", "done", "failed", "cancelled", "skipped"
+
+
+class Step:
+    # خطوة واحدة من العملية؛ run(job) تعيد True عند النجاح
+    def __init__(self, name, run, deps=(), label=None):
+        self.name = name
+        self.run = run
+        self.deps = tuple(deps)
+        self.label = label or name
+        self.state = QUEUED
+        self.started = None
+        self.finished = None
+
+    @property
+    def duration(self):
+        if self.started is None: return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+
+class Job:
+    _ids = itertools.count(1)
+
+    def __init__(self, name, steps, action=None):
+        self.id = next(self._ids)
+        self.name = name
+        self.action = action or name # معرف ثابت للعملية (مثل deep-clean) للمقاييس
+        self.steps = {step.name: step for step in steps}
+        for step in steps:
+            missing = [d for d in step.deps if d not in self.steps]
+            if missing: raise ValueError(f"Step '{step.name}' depends on unknown steps: {missing}")
+        self._check_cycles()
+        self.state = QUEUED
+        self.created = time.monotonic()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+        self._cancel_hooks = []
+        self._lock = threading.Lock()
+
+    def _check_cycles(self):
+        seen, done = set(), set()
+        def visit(name):
+            if name in done: return
+            if name in seen: raise ValueError(f"Dependency cycle at step '{name}'")
+            seen.add(name)
+            for dep in self.steps[name].deps: visit(dep)
+            done.add(name)
+        for name in self.steps: visit(name)
+
+    @property
+    def duration(self):
+        if self.started is None: return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def on_cancel(self, hook):
+        # تسجيل دالة تُستدعى عند الإلغاء (مثل CommandRunner.cancel)
+        with self._lock:
+            self._cancel_hooks.append(hook)
+            if not self._cancel.is_set(): return
+        hook()
+
+    def cancel(self):
+        with self._lock:
+            self._cancel.set(); hooks = list(self._cancel_hooks)
+        for hook in hooks:
+            try: hook()
+            except Exception as e: print(f"Cancel hook error: {e}")
+
+
+class JobScheduler:
+    # تُنفذ المهام بالترتيب، والخطوات المستقلة داخل المهمة تعمل بالتوازي ضمن حد أقصى
+    def __init__(self, max_workers=3, on_update=None):
+        # concurrent.futures يستورد logging: يُؤجَّل حتى إنشاء المجدول (status في سطر الأوامر لا يحتاجه)
+        from concurrent.futures import ThreadPoolExecutor
+        self.max_workers = max_workers
+        self.on_update = on_update # (job, step أو None)
+        self.jobs = deque(maxlen=50) # آخر المهام للعرض
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="flashboost-step")
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch, name="flashboost-jobs", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, job):
+        with self._cond:
+            if self._closed: raise RuntimeError("scheduler is shut down")
+            self._queue.append(job); self.jobs.append(job)
+            self._cond.notify()
+        self._notify(job)
+        return job
+
+    @property
+    def busy(self):
+        with self._cond:
+            return bool(self._queue) or any(job.state == RUNNING for job in self.jobs)
+
+    def running_job(self):
+        return next((job for job in self.jobs if job.state == RUNNING), None)
+
+    def cancel(self, job):
+        with self._cond:
+            if job in self._queue:
+                self._queue.remove(job); job.state = CANCELLED
+                job._cancel.set()
+                for step in job.steps.values(): step.state = SKIPPED
+                self._notify(job); return
+        job.cancel()
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            for job in self._queue: job.state = CANCELLED
+            self._queue.clear(); self._cond.notify()
+        for job in list(self.jobs):
+            if job.state == RUNNING: job.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _notify(self, job, step=None):
+        if self.on_update:
+            try: self.on_update(job, step)
+            except Exception as e: print(f"Job update callback error: {e}")
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed: self._cond.wait()
+                if self._closed: return
+                job = self._queue.popleft()
+            self._run_job(job)
+
+    def _run_step(self, job, step):
+        step.state = RUNNING; step.started = time.monotonic(); self._notify(job, step)
+        with TRACER.span(step.name, "step", job=job.name) as span:
+            try: ok = bool(step.run(job))
+            except Exception as e:
+                print(f"Step '{step.name}' error: {type(e).__name__} - {e}"); ok = False; span.set(error=f"{type(e).__name__}: {e}")
+            step.finished = time.monotonic()
+            step.state = CANCELLED if job.cancelled else (DONE if ok else FAILED)
+            span.set(state=step.state)
+        self._notify(job, step)
+        return ok
+
+    def _run_job(self, job):
+        from concurrent.futures import FIRST_COMPLETED, wait
+        job.state = RUNNING; job.started = time.monotonic(); self._notify(job)
+        with TRACER.span(job.name, "job", action=job.action) as span:
+            pending = dict(job.steps); running = {}
+            while pending or running:
+                for name, step in list(pending.items()):
+                    dep_states = [job.steps[d].state for d in step.deps]
+                    if job.cancelled or any(s in (FAILED, SKIPPED, CANCELLED) for s in dep_states):
+                        step.state = SKIPPED; del pending[name]; self._notify(job, step)
+                    elif all(s == DONE for s in dep_states):
+                        del pending[name]
+                        running[self._executor.submit(self._run_step, job, step)] = step
+                if not running: continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished: del running[future]
+            job.finished = time.monotonic()
+            states = [step.state for step in job.steps.values()]
+            if job.cancelled: job.state = CANCELLED
+            elif all(s == DONE for s in states): job.state = DONE
+            else: job.state = FAILED
+            span.set(state=job.state)
+        self._notify(job)
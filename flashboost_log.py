@@ -0,0 +1,68 @@
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+
+
+class LogPipeline:
+    # طابور آمن للخيوط يُفرَّغ دفعة واحدة في كل إطار بدلاً من idle_add لكل رسالة
+    def __init__(self, max_lines=2000, wakeup=None, file_path=None, max_bytes=1024 * 1024, backup_count=3):
+        self.max_lines = max_lines
+        self.wakeup = wakeup # يُستدعى مرة واحدة عند أول رسالة في كل دفعة
+        self._queue = queue.SimpleQueue()
+        self._pending = False
+        self._lock = threading.Lock()
+        self._last_second = None
+        self._last_stamp = ""
+        self._file_logger = None
+        self._listener = None
+        if file_path: self.open_file_sink(file_path, max_bytes, backup_count)
+
+    def open_file_sink(self, file_path, max_bytes=1024 * 1024, backup_count=3):
+        # الكتابة على القرص تتم في خيط خلفي (QueueListener) مع تدوير الملفات
+        self.close_file_sink()
+        handler = logging.handlers.RotatingFileHandler(file_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        file_queue = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(file_queue, handler)
+        self._listener.start()
+        logger = logging.getLogger(f"flashboost.activity.{id(self)}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.handlers[:] = [logging.handlers.QueueHandler(file_queue)]
+        self._file_logger = logger
+
+    def close_file_sink(self):
+        if self._listener: self._listener.stop(); self._listener = None
+        if self._file_logger: self._file_logger.handlers.clear(); self._file_logger = None
+
+    def push(self, msg):
+        self._queue.put((time.time(), msg))
+        if self._file_logger: self._file_logger.info(msg)
+        with self._lock:
+            if self._pending: return
+            self._pending = True
+        if self.wakeup: self.wakeup()
+
+    def _stamp(self, ts):
+        # strftime مرة واحدة لكل ثانية فقط
+        second = int(ts)
+        if second != self._last_second:
+            self._last_second = second
+            self._last_stamp = time.strftime('%H:%M:%S', time.localtime(second))
+        return self._last_stamp
+
+    def drain(self):
+        # يعيد نص الدفعة كاملاً (أو "" إذا كان الطابور فارغاً)
+        with self._lock: self._pending = False
+        lines = []
+        while True:
+            try: ts, msg = self._queue.get_nowait()
+            except queue.Empty: break
+            lines.append(f"[{self._stamp(ts)}] {msg}\n")
+        if len(lines) > self.max_lines: lines = lines[-self.max_lines:]
+        return "".join(lines)
+
+    def close(self):
+        self.close_file_sink()
@@ -0,0 +1,223 @@
+import bisect
+import os
+import threading
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+ACTION_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+SAMPLER_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    if value == float("inf"): return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    # عائلة مقياس واحدة (gauge أو counter أو histogram) بقيم لكل مجموعة تسميات
+    def __init__(self, registry, name, kind, help_text, label_names=(), buckets=None):
+        self.registry = registry
+        self.name = name
+        self.kind = kind
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets or ()) + (float("inf"),) if kind == "histogram" else None
+        self.series = {} # قيم التسميات -> قيمة، أو [عدادات الحاويات، المجموع] للـ histogram
+
+    def _key(self, labels):
+        if set(labels) != set(self.label_names): raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self.registry._lock:
+            if self.series.get(key) == value: return
+            self.series[key] = value; self.registry._version += 1
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry._lock:
+            self.series[key] = self.series.get(key, 0) + amount; self.registry._version += 1
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.registry._lock:
+            series = self.series.get(key)
+            if series is None: series = self.series[key] = [[0] * len(self.buckets), 0.0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value; self.registry._version += 1
+
+    def _labels(self, key, extra=None):
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, key)]
+        if extra: pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self, lines):
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        lines.append(f"# HELP {self.name} {_escape(self.help_text)}")
+        for key, value in sorted(self.series.items()):
+            if self.kind == "counter": lines.append(f"{self.name}_total{self._labels(key)} {_number(value)}")
+            elif self.kind == "gauge": lines.append(f"{self.name}{self._labels(key)} {_number(value)}")
+            else:
+                counts, total = value; cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    le = 'le="' + _number(bound) + '"'
+                    lines.append(f"{self.name}_bucket{self._labels(key, le)} {cumulative}")
+                lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+                lines.append(f"{self.name}_sum{self._labels(key)} {_number(total)}")
+
+
+class MetricsRegistry:
+    # النص يُعاد بناؤه فقط عند تغير قيمة؛ الاستعلامات المتكررة تعيد النسخة المحفوظة
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._version = 0
+        self._cached = (None, b"")
+
+    def _add(self, name, kind, help_text, label_names, buckets=None):
+        metric = Metric(self, name, kind, help_text, label_names, buckets)
+        with self._lock: self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name, help_text, label_names=()):
+        return self._add(name, "gauge", help_text, label_names)
+
+    def counter(self, name, help_text, label_names=()):
+        return self._add(name, "counter", help_text, label_names)
+
+    def histogram(self, name, help_text, label_names=(), buckets=ACTION_BUCKETS):
+        return self._add(name, "histogram", help_text, label_names, buckets)
+
+    def add_collector(self, collector):
+        # تُستدعى قبل كل عرض لتحديث المقاييس المسحوبة (مثل آخر عينة)
+        self._collectors.append(collector)
+
+    def render(self):
+        for collector in self._collectors:
+            try: collector()
+            except Exception as e: print(f"Metrics collector error: {e}")
+        with self._lock:
+            version, text = self._cached
+            if version == self._version: return text
+            lines = []
+            for metric in self._metrics: metric.render(lines)
+            lines.append("# EOF")
+            text = ("\n".join(lines) + "\n").encode("utf-8")
+            self._cached = (self._version, text)
+            return text
+
+
+class FlashBoostMetrics:
+    # مقاييس التطبيق: العينات، نتائج العمليات ومدتها، رموز خروج الأوامر، وكلفة القياس نفسه
+    def __init__(self, registry=None):
+        r = self.registry = registry or MetricsRegistry()
+        self.cpu = r.gauge("flashboost_cpu_usage_percent", "CPU usage from the latest sample")
+        self.ram = r.gauge("flashboost_ram_usage_percent", "RAM usage from the latest sample")
+        self.disk = r.gauge("flashboost_disk_usage_percent", "Disk usage of the sampled filesystem")
+        self.temp = r.gauge("flashboost_temperature_celsius", "Primary CPU temperature")
+        self.sample_time = r.gauge("flashboost_sample_timestamp_seconds", "Unix time of the latest sample")
+        self.collect = r.histogram("flashboost_sampler_collect_seconds", "Time spent reading one metric in the sampler", ("metric",), SAMPLER_BUCKETS)
+        self.actions = r.counter("flashboost_actions", "Finished actions by result", ("action", "result"))
+        self.action_duration = r.histogram("flashboost_action_duration_seconds", "Wall time of finished actions", ("action",), ACTION_BUCKETS)
+        self.command_exits = r.counter("flashboost_command_exits", "Exit codes of commands run by actions", ("command", "code"))
+        self.helper_ops = r.counter("flashboost_helper_ops", "Privileged helper operations by result", ("op", "result"))
+        self.servers = []
+
+    def watch_sampler(self, sampler):
+        sampler.on_collect = lambda metric, seconds: self.collect.observe(seconds, metric=metric)
+        self.registry.add_collector(lambda: self._collect_sample(sampler))
+
+    def _collect_sample(self, sampler):
+        sample = sampler.latest()
+        if sample is None: return
+        self.cpu.set(sample.cpu); self.ram.set(sample.ram); self.disk.set(sample.disk)
+        self.sample_time.set(round(sample.timestamp, 3))
+        try: self.temp.set(float(sample.temp.rstrip("°C")))
+        except ValueError: pass
+
+    def record_job(self, job):
+        action = getattr(job, "action", None) or job.name
+        self.actions.inc(action=action, result=job.state)
+        self.action_duration.observe(job.duration, action=action)
+
+    def record_command(self, cmd, returncode):
+        self.command_exits.inc(command=cmd.split()[0] if cmd.split() else cmd, code=returncode)
+
+    def record_helper_op(self, op, ok):
+        self.helper_ops.inc(op=op["op"], result="ok" if ok else "error")
+
+    def serve(self, listen):
+        server = MetricsServer(self.registry, listen)
+        server.start(); self.servers.append(server)
+        return server
+
+    def close(self):
+        for server in self.servers: server.stop()
+        self.servers = []
+
+
+class MetricsServer:
+    # listen: "HOST:PORT" أو ":PORT" (127.0.0.1 افتراضياً) أو "unix:/path/to.sock"
+    def __init__(self, registry, listen):
+        self.registry = registry
+        self.listen = listen
+        self._server = None
+        self._thread = None
+
+    def _make_server(self):
+        import http.server
+        import socketserver
+        registry = self.registry
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"): self.send_error(404); return
+                body = registry.render()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers(); self.wfile.write(body)
+
+            def log_message(self, format, *args): pass
+
+        if self.listen.startswith("unix:"):
+            path = self.listen[len("unix:"):]
+            if os.path.exists(path): os.unlink(path)
+
+            class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+                daemon_threads = True
+
+            class UnixHandler(Handler):
+                def address_string(self): return "unix"
+            server = UnixServer(path, UnixHandler)
+            os.chmod(path, 0o600)
+            return server
+        host, _, port = self.listen.rpartition(":")
+        server = http.server.ThreadingHTTPServer((host or "127.0.0.1", int(port)), Handler)
+        server.daemon_threads = True
+        return server
+
+    @property
+    def address(self):
+        return self._server.server_address if self._server else None
+
+    def start(self):
+        self._server = self._make_server()
+        self._thread = threading.Thread(target=self._server.serve_forever, name="flashboost-metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self._server: return
+        self._server.shutdown(); self._server.server_close()
+        if self.listen.startswith("unix:"):
+            try: os.unlink(self.listen[len("unix:"):])
+            except OSError: pass
+        self._server = self._thread = None
@@ -0,0 +1,136 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import stat
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+CHUNK = 1 << 30 # تعيين الملفات الكبيرة على دفعات من 1GB
+PROT_READ, MAP_SHARED = 0x1, 0x01
+
+_libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+_libc.mmap.restype = ctypes.c_void_p
+_libc.mmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_long]
+_libc.munmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+_libc.mincore.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte)]
+MAP_FAILED = ctypes.c_void_p(-1).value
+
+
+class Residency:
+    def __init__(self):
+        self.files = 0
+        self.total_bytes = 0
+        self.resident_bytes = 0
+        self.errors = 0
+
+    @property
+    def percent(self):
+        return self.resident_bytes * 100.0 / self.total_bytes if self.total_bytes else 0.0
+
+    def add(self, other):
+        self.files += other.files; self.total_bytes += other.total_bytes
+        self.resident_bytes += other.resident_bytes; self.errors += other.errors
+
+
+def _resident_pages(fd, size):
+    resident = 0
+    for offset in range(0, size, CHUNK):
+        length = min(CHUNK, size - offset)
+        addr = _libc.mmap(None, length, PROT_READ, MAP_SHARED, fd, offset)
+        if addr in (None, MAP_FAILED): raise OSError(ctypes.get_errno(), "mmap failed")
+        try:
+            pages = (length + PAGE_SIZE - 1) // PAGE_SIZE
+            vec = (ctypes.c_ubyte * pages)()
+            if _libc.mincore(addr, length, vec) != 0: raise OSError(ctypes.get_errno(), "mincore failed")
+            resident += pages - bytes(vec).count(0)
+        finally: _libc.munmap(addr, length)
+    return resident
+
+
+def _iter_files(path):
+    # الملفات العادية فقط، دون اتباع الروابط الرمزية
+    try: st = os.lstat(path)
+    except OSError: return
+    if stat.S_ISREG(st.st_mode): yield path, st.st_size; return
+    if not stat.S_ISDIR(st.st_mode): return
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            full = os.path.join(dirpath, name)
+            try: st = os.lstat(full)
+            except OSError: continue
+            if stat.S_ISREG(st.st_mode): yield full, st.st_size
+
+
+def _open_noatime(path):
+    # O_NOATIME مسموح فقط لمالك الملف
+    try: return os.open(path, os.O_RDONLY | os.O_NOATIME | os.O_CLOEXEC)
+    except PermissionError: return os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+
+
+def residency(paths):
+    # نسبة صفحات الملفات الموجودة في كاش الصفحة (mincore عبر mmap)
+    report = Residency()
+    for root in paths:
+        for path, size in _iter_files(os.path.expanduser(root)):
+            report.files += 1; report.total_bytes += size
+            if not size: continue
+            try: fd = _open_noatime(path)
+            except OSError: report.errors += 1; continue
+            try: report.resident_bytes += min(size, _resident_pages(fd, size) * PAGE_SIZE)
+            except OSError: report.errors += 1
+            finally: os.close(fd)
+    return report
+
+
+def evict(paths):
+    # إخراج صفحات هذه الملفات فقط من الكاش (الصفحات المتسخة تبقى حتى تُكتب)
+    evicted = errors = 0
+    for root in paths:
+        for path, size in _iter_files(os.path.expanduser(root)):
+            if not size: continue
+            try:
+                fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+                try: os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED); evicted += 1
+                finally: os.close(fd)
+            except OSError: errors += 1
+    return evicted, errors
+
+
+def current_cgroup(proc_root='/proc', cgroup_root='/sys/fs/cgroup'):
+    # مسار cgroup v2 للعملية الحالية، أو None إذا لم يكن متاحاً
+    try:
+        with open(os.path.join(proc_root, "self", "cgroup")) as f:
+            for line in f:
+                hierarchy, _, rest = line.strip().partition(":")
+                controllers, _, path = rest.partition(":")
+                if hierarchy == "0" and controllers == "": return os.path.join(cgroup_root, path.lstrip("/"))
+    except OSError: pass
+    return None
+
+
+def session_cgroup(proc_root='/proc', cgroup_root='/sys/fs/cgroup'):
+    # أقرب مجموعة user@UID.service (مفوَّضة للمستخدم)، وإلا مجموعة العملية نفسها
+    cgroup = current_cgroup(proc_root, cgroup_root)
+    if not cgroup: return None
+    probe = cgroup
+    while len(probe) > len(cgroup_root):
+        name = os.path.basename(probe)
+        if name.startswith("user@") and name.endswith(".service"): return probe
+        probe = os.path.dirname(probe)
+    return cgroup
+
+
+def cgroup_reclaim(amount_bytes, cgroup=None, proc_root='/proc', cgroup_root='/sys/fs/cgroup'):
+    # memory.reclaim (cgroup v2، نواة 5.19+): استعادة ذاكرة هذه المجموعة فقط
+    cgroup = cgroup or current_cgroup(proc_root, cgroup_root)
+    if not cgroup: return False
+    path = os.path.join(cgroup, "memory.reclaim")
+    if not os.path.exists(path): return False
+    try:
+        with open(path, "w") as f: f.write(str(int(amount_bytes)))
+        return True
+    except OSError as e:
+        # EAGAIN تعني أن النواة لم تستطع استعادة كامل الكمية
+        if e.errno == errno.EAGAIN: return True
+        print(f"memory.reclaim failed for {cgroup}: {e}")
+        return False
@@ -0,0 +1,217 @@
+import ctypes
+import math
+import mmap
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+# قيم t (ثقة 95%، طرفان) لدرجات الحرية 1..30، ثم تقريب لما بعدها
+T_975 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228, 2.201, 2.179, 2.160, 2.145, 2.131,
+         2.120, 2.110, 2.101, 2.093, 2.086, 2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+MB = 1024 * 1024
+
+
+def t_critical(df):
+    if df < 1: return float("inf")
+    if df <= 30: return T_975[int(df) - 1]
+    if df <= 40: return 2.021
+    if df <= 60: return 2.000
+    if df <= 120: return 1.980
+    return 1.960
+
+
+class Probe:
+    # قياس محلي قابل للتكرار؛ trial() تعيد قيمة واحدة بالوحدة unit
+    name = ""
+    label = ""
+    unit = ""
+    higher_is_better = False
+
+    def setup(self): pass
+
+    def trial(self): raise NotImplementedError
+
+    def teardown(self): pass
+
+
+class TcpRoundTrip(Probe):
+    name, label, unit = "tcp_rtt", "زمن الذهاب والإياب TCP (loopback)", "us"
+
+    def __init__(self, rounds=500):
+        self.rounds = rounds
+
+    def trial(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("127.0.0.1", 0)); listener.listen(1)
+        def echo():
+            conn, _ = listener.accept()
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with conn:
+                while True:
+                    data = conn.recv(1)
+                    if not data: return
+                    conn.sendall(data)
+        thread = threading.Thread(target=echo, daemon=True); thread.start()
+        try:
+            with socket.create_connection(listener.getsockname()) as client:
+                client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                client.sendall(b"x"); client.recv(1) # تسخين الاتصال
+                start = time.perf_counter()
+                for _ in range(self.rounds): client.sendall(b"x"); client.recv(1)
+                elapsed = time.perf_counter() - start
+        finally: listener.close()
+        thread.join(1.0)
+        return elapsed / self.rounds * 1e6
+
+
+class WakeupLatency(Probe):
+    # على نمط cyclictest: النوم لفترة ثابتة وقياس التأخر عن موعد الاستيقاظ
+    name, label, unit = "wakeup", "تأخر الاستيقاظ", "us"
+
+    def __init__(self, loops=200, interval=0.001):
+        self.loops = loops
+        self.interval = interval
+
+    def trial(self):
+        interval_ns = int(self.interval * 1e9); total = 0
+        for _ in range(self.loops):
+            start = time.perf_counter_ns(); time.sleep(self.interval)
+            total += time.perf_counter_ns() - start - interval_ns
+        return total / self.loops / 1000
+
+
+class PageFaults(Probe):
+    # كلفة أول لمس لصفحات ذاكرة مجهولة جديدة (خطأ صفحة + تصفير)
+    name, label, unit = "page_faults", "كلفة خطأ الصفحة", "ns/page"
+
+    def __init__(self, size=32 * MB):
+        self.size = size
+
+    def trial(self):
+        region = mmap.mmap(-1, self.size, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS)
+        buf = ctypes.c_char.from_buffer(region)
+        try:
+            start = time.perf_counter_ns()
+            ctypes.memset(ctypes.addressof(buf), 1, self.size)
+            elapsed = time.perf_counter_ns() - start
+        finally:
+            del buf; region.close()
+        return elapsed / (self.size // mmap.PAGESIZE)
+
+
+class MemoryBandwidth(Probe):
+    name, label, unit, higher_is_better = "memory_bandwidth", "عرض نطاق الذاكرة (نسخ)", "MB/s", True
+
+    def __init__(self, size=64 * MB):
+        self.size = size
+        self._src = self._dst = None
+
+    def setup(self):
+        self._src = bytearray(b"\x01" * self.size); self._dst = bytearray(self.size)
+
+    def trial(self):
+        start = time.perf_counter()
+        self._dst[:] = self._src
+        return self.size / MB / (time.perf_counter() - start)
+
+    def teardown(self):
+        self._src = self._dst = None
+
+
+class FileRead(Probe):
+    # قراءة باردة: تُخرج صفحات الملف من الكاش قبل كل محاولة
+    name, label, unit, higher_is_better = "file_read", "سرعة قراءة الملفات", "MB/s", True
+
+    def __init__(self, size=64 * MB, directory=None, chunk=MB):
+        self.size = size
+        self.chunk = chunk
+        cache = os.path.expanduser("~/.cache")
+        self.directory = directory or (cache if os.path.isdir(cache) else None)
+        self._path = None
+
+    def setup(self):
+        fd, self._path = tempfile.mkstemp(prefix="flashboost-probe-", dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            block = os.urandom(self.chunk)
+            for _ in range(self.size // self.chunk): f.write(block)
+            f.flush(); os.fsync(f.fileno())
+
+    def trial(self):
+        buf = bytearray(self.chunk); total = 0
+        fd = os.open(self._path, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            start = time.perf_counter()
+            while True:
+                n = os.readv(fd, [buf])
+                if not n: break
+                total += n
+            elapsed = time.perf_counter() - start
+        finally: os.close(fd)
+        return total / MB / elapsed
+
+    def teardown(self):
+        if self._path:
+            try: os.unlink(self._path)
+            except OSError: pass
+            self._path = None
+
+
+PROBES = {cls.name: cls for cls in (TcpRoundTrip, WakeupLatency, PageFaults, MemoryBandwidth, FileRead)}
+
+
+def run_probes(names, trials=10, warmup=1, cancelled=None, on_result=None):
+    # يعيد {اسم القياس: [قيمة كل محاولة]}؛ cancelled() توقف التنفيذ بين المحاولات
+    results = {}
+    for name in names:
+        probe = PROBES[name]()
+        probe.setup()
+        try:
+            for _ in range(warmup): probe.trial()
+            values = results[name] = []
+            for _ in range(trials):
+                if cancelled and cancelled(): return results
+                values.append(probe.trial())
+        finally: probe.teardown()
+        if on_result: on_result(name, values)
+    return results
+
+
+class Summary:
+    def __init__(self, values):
+        self.n = len(values)
+        self.mean = statistics.fmean(values) if values else 0.0
+        self.stdev = statistics.stdev(values) if self.n > 1 else 0.0
+        # نصف عرض فترة الثقة 95% للمتوسط
+        self.ci = t_critical(self.n - 1) * self.stdev / math.sqrt(self.n) if self.n > 1 else float("inf")
+
+
+class Comparison:
+    # الفرق بين المتوسطين (بعد - قبل) مع فترة ثقة Welch؛ الحكم فقط إذا لم تتضمن الفترة الصفر
+    # وكان التغير أكبر من min_change (فروق أصغر من ضجيج التشغيل لا تُحتسب)
+    IMPROVED, REGRESSED, UNCHANGED = "improved", "regressed", "unchanged"
+
+    def __init__(self, name, before, after, min_change=0.02):
+        probe = PROBES[name]
+        self.name = name; self.label = probe.label; self.unit = probe.unit
+        self.before = Summary(before); self.after = Summary(after)
+        self.delta = self.after.mean - self.before.mean
+        self.percent = self.delta * 100.0 / self.before.mean if self.before.mean else 0.0
+        va = self.before.stdev ** 2 / self.before.n if self.before.n else 0.0
+        vb = self.after.stdev ** 2 / self.after.n if self.after.n else 0.0
+        se = math.sqrt(va + vb)
+        if self.before.n < 2 or self.after.n < 2: self.delta_ci = float("inf")
+        elif se == 0: self.delta_ci = 0.0
+        else:
+            df = (va + vb) ** 2 / ((va ** 2 / (self.before.n - 1)) + (vb ** 2 / (self.after.n - 1)))
+            self.delta_ci = t_critical(df) * se
+        if abs(self.delta) <= self.delta_ci or abs(self.percent) < min_change * 100: self.verdict = self.UNCHANGED
+        elif (self.delta > 0) == probe.higher_is_better: self.verdict = self.IMPROVED
+        else: self.verdict = self.REGRESSED
+
+
+def compare(before, after, min_change=0.02):
+    return [Comparison(name, before[name], after[name], min_change) for name in before if before[name] and after.get(name)]
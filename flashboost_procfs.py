@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+
+
+class PersistentFile:
+    # ملف يبقى مفتوحاً ويُعاد قراءته بـ pread في مخزن مؤقت يُعاد استخدامه
+    def __init__(self, path, size=4096):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        self.buf = bytearray(size)
+
+    def read(self):
+        # يعيد عدد البايتات المقروءة في self.buf
+        while True:
+            n = os.preadv(self.fd, [self.buf], 0)
+            if n < len(self.buf): return n
+            self.buf = bytearray(len(self.buf) * 2) # الملف أكبر من المخزن: نضاعفه ونعيد
+
+    def close(self):
+        if self.fd is not None:
+            try: os.close(self.fd)
+            except OSError: pass
+            self.fd = None
+
+
+def _field(buf, n, key):
+    # قيمة حقل واحد من ملف بصيغة "Key:   1234 kB"
+    start = buf.find(key, 0, n)
+    if start < 0: raise KeyError(key.decode())
+    start += len(key)
+    end = buf.find(b"\n", start, n)
+    return int(buf[start:end if end >= 0 else n].split()[0])
+
+
+class ProcReader:
+    def __init__(self, proc_root='/proc', sys_root='/sys'):
+        self.proc_root = proc_root
+        self.sys_root = sys_root
+        self._files = {}
+        self._disk_fds = {}
+        self._last_cpu = None
+
+    def _file(self, name):
+        f = self._files.get(name)
+        if f is None:
+            f = self._files[name] = PersistentFile(os.path.join(self.proc_root, name))
+        return f
+
+    def cpu_times(self):
+        f = self._file("stat"); n = f.read()
+        end = f.buf.find(b"\n", 0, n)
+        line = f.buf[:end if end >= 0 else n]
+        # user nice system idle iowait irq softirq steal (guest محسوب ضمن user)
+        values = [int(v) for v in line.split()[1:9]]
+        idle = values[3] + values[4]
+        return sum(values), idle
+
+    def cpu_percent(self):
+        total, idle = self.cpu_times()
+        last, self._last_cpu = self._last_cpu, (total, idle)
+        if last is None: return 0.0
+        d_total = total - last[0]
+        if d_total <= 0: return 0.0
+        busy = d_total - (idle - last[1])
+        return round(max(0.0, min(100.0, busy * 100.0 / d_total)), 1)
+
+    def ram_percent(self):
+        f = self._file("meminfo"); n = f.read()
+        total = _field(f.buf, n, b"MemTotal:")
+        available = _field(f.buf, n, b"MemAvailable:")
+        if total <= 0: return 0.0
+        return round((total - available) * 100.0 / total, 1)
+
+    def disk_percent(self, path='/'):
+        fd = self._disk_fds.get(path)
+        if fd is None:
+            fd = self._disk_fds[path] = os.open(path, os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+        st = os.fstatvfs(fd)
+        used = (st.f_blocks - st.f_bfree) * st.f_frsize
+        total_user = used + st.f_bavail * st.f_frsize
+        if total_user <= 0: return 0.0
+        return round(used * 100.0 / total_user, 1)
+
+    def close(self):
+        for f in self._files.values(): f.close()
+        self._files.clear()
+        for fd in self._disk_fds.values():
+            try: os.close(fd)
+            except OSError: pass
+        self._disk_fds.clear()
+
+
+# ترتيب تفضيل شرائح الحرارة (نفس ترتيب get_temperature القديم)
+PREFERRED_CHIPS = ("coretemp", "k10temp", "acpitz")
+PACKAGE_LABELS = ("Package", "Tdie")
+CORE_LABELS = ("Core", "Tccd")
+
+
+def _read_text(path):
+    try:
+        with open(path) as f: return f.read().strip()
+    except OSError: return ""
+
+
+def _temp_index(filename):
+    # temp12_input -> 12
+    try: return int(filename[4:filename.index("_")])
+    except ValueError: return 0
+
+
+class ThermalSensors:
+    # اكتشاف حساسات hwmon مرة واحدة ثم قراءة ملفات temp*_input المحفوظة فقط
+    def __init__(self, sys_root='/sys', rescan_interval=10.0):
+        self.hwmon_dir = os.path.join(sys_root, "class", "hwmon")
+        self.rescan_interval = rescan_interval
+        self.sensors = [] # (chip, label, path)
+        self.primary = None
+        self._devices = None
+        self._next_rescan = 0.0
+        self._files = {}
+        self._lock = threading.Lock() # القراءة تتم من خيط القياس ومن الواجهة
+
+    def _list_devices(self):
+        try: return frozenset(os.listdir(self.hwmon_dir))
+        except OSError: return frozenset()
+
+    def discover(self):
+        self.close()
+        self._devices = self._list_devices()
+        sensors = []
+        for dev in sorted(self._devices):
+            dev_path = os.path.join(self.hwmon_dir, dev)
+            chip = _read_text(os.path.join(dev_path, "name")) or dev
+            try: inputs = sorted((f for f in os.listdir(dev_path) if f.startswith("temp") and f.endswith("_input")), key=_temp_index)
+            except OSError: continue
+            for name in inputs:
+                label = _read_text(os.path.join(dev_path, name.replace("_input", "_label")))
+                sensors.append((chip, label, os.path.join(dev_path, name)))
+        self.sensors = sensors
+        self.primary = self._pick_primary(sensors)
+        return self.primary
+
+    def _pick_primary(self, sensors):
+        for chip in PREFERRED_CHIPS:
+            chip_sensors = [s for s in sensors if s[0] == chip]
+            if chip_sensors:
+                package = next((s for s in chip_sensors if any(l in s[1] for l in PACKAGE_LABELS)), None)
+                return package or chip_sensors[0]
+        return sensors[0] if sensors else None
+
+    def _maybe_rediscover(self):
+        now = time.monotonic()
+        if self._devices is None: self.discover()
+        elif now >= self._next_rescan and self._list_devices() != self._devices: self.discover()
+        if now >= self._next_rescan: self._next_rescan = now + self.rescan_interval
+
+    def _read(self, path):
+        f = self._files.get(path)
+        try:
+            if f is None: f = self._files[path] = PersistentFile(path, 64)
+            n = f.read()
+            return int(f.buf[:n]) / 1000.0
+        except (OSError, ValueError):
+            # الجهاز أُزيل أو القراءة فشلت: نعيد الاكتشاف في الدورة القادمة
+            self._next_rescan = 0.0; self._devices = frozenset()
+            return None
+
+    def read_primary(self):
+        with self._lock:
+            self._maybe_rediscover()
+            return self._read(self.primary[2]) if self.primary else None
+
+    def read_cores(self):
+        # درجات حرارة الأنوية (Core N في coretemp أو Tccd N في k10temp)
+        with self._lock:
+            self._maybe_rediscover()
+            chip = self.primary[0] if self.primary else None
+            return [(label, self._read(path)) for c, label, path in self.sensors if c == chip and label.startswith(CORE_LABELS)]
+
+    def read_all(self):
+        with self._lock:
+            self._maybe_rediscover()
+            return [(chip, label, self._read(path)) for chip, label, path in self.sensors]
+
+    def close(self):
+        for f in self._files.values(): f.close()
+        self._files.clear()
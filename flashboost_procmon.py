@@ -0,0 +1,177 @@
+import ctypes
+import heapq
+import os
+import platform
+import time
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+SORT_KEYS = ("cpu", "rss", "io")
+
+IOPRIO_CLASSES = {"none": 0, "realtime": 1, "best-effort": 2, "idle": 3}
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_WHO_PROCESS = 1
+# رقم استدعاء ioprio_set لكل معمارية (لا يوجد غلاف له في os)
+IOPRIO_SET_SYSCALL = {"x86_64": 251, "i386": 289, "i686": 289, "aarch64": 30, "riscv64": 30, "armv7l": 314, "ppc64le": 273, "s390x": 282}
+
+_libc = None
+
+
+def _read(path, size=4096):
+    fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    try: return os.read(fd, size)
+    finally: os.close(fd)
+
+
+class ProcessInfo:
+    # الخصائص الثابتة (الاسم، سطر الأوامر، المستخدم) تُقرأ مرة واحدة لكل (pid، وقت البدء)
+    __slots__ = ("pid", "starttime", "name", "cmdline", "uid", "ppid", "state", "nice", "threads",
+                 "rss", "ticks", "io_bytes", "cpu", "io_rate", "io_denied")
+
+    def __init__(self, pid, starttime, name, cmdline, uid):
+        self.pid = pid; self.starttime = starttime
+        self.name = name; self.cmdline = cmdline; self.uid = uid
+        self.ppid = 0; self.state = "?"; self.nice = 0; self.threads = 0
+        self.rss = 0; self.ticks = 0; self.io_bytes = None
+        self.cpu = 0.0; self.io_rate = 0.0; self.io_denied = False
+
+    @property
+    def io(self):
+        return self.io_rate
+
+
+class ProcessMonitor:
+    # مسح تدريجي لـ /proc: قراءة stat واحدة لكل عملية، ونسبة المعالج والإدخال/الإخراج من الفرق بين عينتين
+    def __init__(self, proc_root='/proc', track_io=True):
+        self.proc_root = proc_root
+        self.track_io = track_io
+        self.procs = {} # pid -> ProcessInfo
+        self.children = {} # ppid -> [pid]
+        self.duration = 0.0 # زمن آخر مسح
+        self._last = None
+
+    def _static(self, pid, starttime, name):
+        base = os.path.join(self.proc_root, str(pid))
+        try: cmdline = _read(os.path.join(base, "cmdline"), 4096).replace(b"\0", b" ").strip().decode("utf-8", "replace")
+        except OSError: cmdline = ""
+        try: uid = os.stat(base).st_uid
+        except OSError: uid = -1
+        return ProcessInfo(pid, starttime, name, cmdline or f"[{name}]", uid)
+
+    def _read_io(self, info):
+        try: data = _read(os.path.join(self.proc_root, str(info.pid), "io"))
+        except PermissionError: info.io_denied = True; return None
+        except OSError: return None
+        total = 0
+        for line in data.split(b"\n"):
+            if line.startswith((b"read_bytes:", b"write_bytes:")): total += int(line.split()[1])
+        return total
+
+    def sample(self):
+        start = time.monotonic()
+        elapsed = start - self._last if self._last else None
+        procs = {}; children = {}
+        try: names = os.listdir(self.proc_root)
+        except OSError: names = []
+        for entry in names:
+            if not entry.isdigit(): continue
+            pid = int(entry)
+            try: data = _read(os.path.join(self.proc_root, entry, "stat"), 1024)
+            except OSError: continue # انتهت العملية بين listdir والقراءة
+            open_paren = data.find(b"("); close_paren = data.rfind(b")")
+            fields = data[close_paren + 2:].split()
+            if len(fields) < 22: continue
+            starttime = int(fields[19])
+            info = self.procs.get(pid)
+            if info is None or info.starttime != starttime:
+                info = self._static(pid, starttime, data[open_paren + 1:close_paren].decode("utf-8", "replace"))
+                prev_ticks = prev_io = None
+            else: prev_ticks, prev_io = info.ticks, info.io_bytes
+            info.state = fields[0].decode(); info.ppid = int(fields[1])
+            info.ticks = int(fields[11]) + int(fields[12])
+            info.nice = int(fields[16]); info.threads = int(fields[17])
+            info.rss = int(fields[21]) * PAGE_SIZE
+            if elapsed and prev_ticks is not None: info.cpu = (info.ticks - prev_ticks) * 100.0 / CLK_TCK / elapsed
+            if self.track_io and not info.io_denied:
+                info.io_bytes = self._read_io(info)
+                if elapsed and prev_io is not None and info.io_bytes is not None: info.io_rate = (info.io_bytes - prev_io) / elapsed
+            procs[pid] = info
+            children.setdefault(info.ppid, []).append(pid)
+        self.procs = procs; self.children = children
+        self._last = start
+        self.duration = time.monotonic() - start
+        return len(procs)
+
+    def top(self, n=15, key="cpu"):
+        if key not in SORT_KEYS: raise ValueError(f"unknown sort key: {key}")
+        # heapq.nlargest: كومة بحجم n بدلاً من ترتيب كل العمليات
+        return heapq.nlargest(n, self.procs.values(), key=lambda info: getattr(info, key))
+
+    def tree(self, pid):
+        # العملية وكل أحفادها (من آخر عينة)
+        pids = []; stack = [pid]
+        while stack:
+            current = stack.pop()
+            if current in pids: continue
+            pids.append(current); stack.extend(self.children.get(current, ()))
+        return pids
+
+
+def process_tree(pid, proc_root='/proc'):
+    monitor = ProcessMonitor(proc_root, track_io=False); monitor.sample()
+    return monitor.tree(pid) if pid in monitor.procs else [pid]
+
+
+def parse_cpu_list(text):
+    # "0-3,6" -> {0, 1, 2, 3, 6}
+    cpus = set()
+    for part in str(text).split(","):
+        part = part.strip()
+        if not part: continue
+        low, _, high = part.partition("-")
+        low = int(low); high = int(high) if high else low
+        if low < 0 or high < low: raise ValueError(f"invalid CPU range: {part}")
+        cpus.update(range(low, high + 1))
+    if not cpus: raise ValueError("empty CPU list")
+    return cpus
+
+
+def threads_of(pid, proc_root='/proc'):
+    try: return [int(tid) for tid in os.listdir(os.path.join(proc_root, str(pid), "task")) if tid.isdigit()]
+    except OSError: return []
+
+
+def _for_threads(pid, apply, proc_root):
+    # nice و ioprio و affinity خصائص لكل خيط في Linux: تُطبق على كل خيوط العملية
+    done = 0; error = None
+    for tid in threads_of(pid, proc_root) or [pid]:
+        try: apply(tid); done += 1
+        except ProcessLookupError: continue
+        except OSError as e: error = error or e
+    if error and not done: raise error
+    if not done: raise ProcessLookupError(f"no such process: {pid}")
+    return done
+
+
+def set_nice(pid, nice, proc_root='/proc'):
+    return _for_threads(pid, lambda tid: os.setpriority(os.PRIO_PROCESS, tid, nice), proc_root)
+
+
+def set_affinity(pid, cpus, proc_root='/proc'):
+    cpus = set(cpus)
+    return _for_threads(pid, lambda tid: os.sched_setaffinity(tid, cpus), proc_root)
+
+
+def set_ioprio(pid, ioclass, level=4, proc_root='/proc'):
+    global _libc
+    if ioclass not in IOPRIO_CLASSES: raise ValueError(f"unknown I/O class: {ioclass}")
+    if not 0 <= level <= 7: raise ValueError(f"invalid I/O priority level: {level}")
+    number = IOPRIO_SET_SYSCALL.get(platform.machine())
+    if number is None: raise OSError(f"ioprio_set not supported on {platform.machine()}")
+    if _libc is None: _libc = ctypes.CDLL(None, use_errno=True)
+    value = IOPRIO_CLASSES[ioclass] << IOPRIO_CLASS_SHIFT | (0 if ioclass in ("none", "idle") else level)
+    def apply(tid):
+        if _libc.syscall(number, IOPRIO_WHO_PROCESS, tid, value) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+    return _for_threads(pid, apply, proc_root)
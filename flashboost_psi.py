@@ -0,0 +1,193 @@
+import os
+import select
+import time
+
+# عتبات الدخول/الخروج (هستيريسيس): الحالة تبدأ عند enter ولا تنتهي إلا تحت exit
+THRESHOLDS = {
+    "memory": (10.0, 2.0), # some avg10 %
+    "io": (20.0, 5.0), # some avg10 %
+    "swap": (1000.0, 100.0), # صفحات مبادلة داخلة/ث
+}
+# المفتاح -> (الحد الأدنى، الحد الأعلى، الخطوة)
+BOUNDS = {
+    "vm.swappiness": (10, 100, 10),
+    "vm.vfs_cache_pressure": (50, 200, 25),
+}
+
+
+def read_pressure(path):
+    # {"some": {"avg10": .., "avg60": .., "avg300": .., "total": ..}, "full": {..}}
+    result = {}
+    with open(path) as f:
+        for line in f:
+            kind, *fields = line.split() or ("",)
+            values = dict(field.split("=", 1) for field in fields if "=" in field)
+            if not values: continue
+            result[kind] = {k: int(v) if k == "total" else float(v) for k, v in values.items()}
+    return result
+
+
+def read_vmstat(path, keys):
+    values = {}
+    with open(path) as f:
+        for line in f:
+            name, _, value = line.partition(" ")
+            if name in keys: values[name] = int(value)
+    return values
+
+
+class PressureTrigger:
+    # مشغل PSI: النواة توقظ poll() (POLLPRI) عند تجاوز stall_us من التعطل خلال window_us
+    # دون root تشترط النواة نافذة من مضاعفات الثانيتين
+    def __init__(self, path, stall_us=150000, window_us=2000000, kind="some"):
+        self.path = path
+        self.stall_us = stall_us
+        self.window_us = window_us
+        self.kind = kind
+        self.fd = None
+
+    def open(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_NONBLOCK | os.O_CLOEXEC)
+        try: os.write(fd, f"{self.kind} {self.stall_us} {self.window_us}\0".encode())
+        except OSError: os.close(fd); raise
+        self.fd = fd
+        return self
+
+    def fileno(self):
+        return self.fd
+
+    def close(self):
+        if self.fd is not None: os.close(self.fd); self.fd = None
+
+
+class Signals:
+    def __init__(self, memory, io, swap_in, swap_out, triggered=()):
+        self.memory = memory # {"some": .., "full": ..} avg10
+        self.io = io
+        self.swap_in = swap_in # صفحات/ث
+        self.swap_out = swap_out
+        self.triggered = frozenset(triggered)
+
+
+class SignalReader:
+    # يقرأ ضغط الذاكرة والإدخال/الإخراج من /proc/pressure ومعدل المبادلة من فرق /proc/vmstat
+    def __init__(self, proc_root='/proc', use_triggers=None):
+        self.proc_root = proc_root
+        self.triggers = {}
+        self.poller = None
+        self._last = None
+        # المشغلات تُكتب في ملف الضغط: على شجرة وهمية ستفسد الملف، فتُستخدم مع /proc الحقيقي فقط
+        if use_triggers is None: use_triggers = os.path.realpath(proc_root) == "/proc"
+        if use_triggers: self._open_triggers()
+
+    def _pressure_path(self, resource):
+        return os.path.join(self.proc_root, "pressure", resource)
+
+    def available(self):
+        return os.path.exists(self._pressure_path("memory"))
+
+    def _open_triggers(self):
+        for resource, stall_us in (("memory", 150000), ("io", 300000)):
+            try: self.triggers[resource] = PressureTrigger(self._pressure_path(resource), stall_us).open()
+            except OSError: continue # نواة قديمة أو بلا صلاحية: القراءة الدورية تكفي
+        if self.triggers:
+            self.poller = select.poll()
+            for trigger in self.triggers.values(): self.poller.register(trigger, select.POLLPRI)
+
+    def wait(self, timeout):
+        # يعيد أسماء الموارد التي أطلقت مشغلاتها، أو () عند انتهاء المهلة
+        if not self.poller: time.sleep(timeout); return ()
+        events = self.poller.poll(timeout * 1000)
+        by_fd = {trigger.fd: name for name, trigger in self.triggers.items()}
+        for fd, mask in events:
+            # المشغل أو الـ cgroup زال: poll سيعود فوراً في كل مرة، فيُغلق ويكمل المورد بالقراءة الدورية
+            if mask & (select.POLLERR | select.POLLHUP | select.POLLNVAL) and fd in by_fd: self._drop_trigger(by_fd.pop(fd))
+        return tuple(by_fd[fd] for fd, mask in events if mask & select.POLLPRI and fd in by_fd)
+
+    def _drop_trigger(self, resource):
+        trigger = self.triggers.pop(resource)
+        self.poller.unregister(trigger.fd); trigger.close()
+        print(f"PSI trigger for {resource} failed; falling back to timed reads")
+        if not self.triggers: self.poller = None
+
+    def read(self, triggered=()):
+        now = time.monotonic()
+        memory = read_pressure(self._pressure_path("memory"))
+        try: io = read_pressure(self._pressure_path("io"))
+        except OSError: io = {}
+        vmstat = read_vmstat(os.path.join(self.proc_root, "vmstat"), ("pswpin", "pswpout"))
+        swap_in = swap_out = 0.0
+        if self._last:
+            elapsed = now - self._last[0]
+            if elapsed > 0:
+                swap_in = (vmstat.get("pswpin", 0) - self._last[1].get("pswpin", 0)) / elapsed
+                swap_out = (vmstat.get("pswpout", 0) - self._last[1].get("pswpout", 0)) / elapsed
+        self._last = (now, vmstat)
+        avg10 = lambda p: {kind: values["avg10"] for kind, values in p.items()}
+        return Signals(avg10(memory), avg10(io), swap_in, swap_out, triggered)
+
+    def close(self):
+        for trigger in self.triggers.values(): trigger.close()
+        self.triggers = {}; self.poller = None
+
+
+class Decision:
+    def __init__(self, key, old, new, reason, signals):
+        self.key = key
+        self.old = old
+        self.new = new
+        self.reason = reason # "memory-swap" أو "memory-cache" أو "io" أو "memory" أو "relax"
+        self.signals = signals
+
+
+class MemoryTuner:
+    # خطوة واحدة لكل مفتاح في كل قرار، ضمن BOUNDS، مع فترة تهدئة بين التغييرات
+    # swappiness: ضغط ذاكرة مع مبادلة داخلة كثيفة -> خفض (إبقاء الذاكرة المجهولة)،
+    #             ضغط ذاكرة دون مبادلة (كاش الملفات يُطرد) -> رفع؛ عند الهدوء العودة إلى القيمة الأصلية
+    # vfs_cache_pressure: ضغط إدخال/إخراج -> خفض (إبقاء dentry/inode)، ضغط ذاكرة وحده -> رفع
+    def __init__(self, baseline, bounds=None, thresholds=None, cooldown=30.0):
+        self.bounds = bounds or BOUNDS
+        self.thresholds = thresholds or THRESHOLDS
+        self.baseline = {key: min(max(value, self.bounds[key][0]), self.bounds[key][1]) for key, value in baseline.items() if key in self.bounds}
+        self.cooldown = cooldown
+        self.active = {name: False for name in self.thresholds}
+        self._changed = {} # المفتاح -> وقت آخر تغيير
+
+    @property
+    def keys(self):
+        return tuple(self.bounds)
+
+    def _update_state(self, signals):
+        levels = {"memory": signals.memory.get("some", 0.0), "io": signals.io.get("some", 0.0), "swap": signals.swap_in}
+        for name, level in levels.items():
+            enter, leave = self.thresholds[name]
+            if name in signals.triggered or level >= enter: self.active[name] = True
+            elif level < leave: self.active[name] = False
+
+    def _targets(self):
+        # المفتاح -> (الاتجاه، السبب)؛ الاتجاه 0 يعني العودة إلى القيمة الأصلية
+        memory, io, swap = self.active["memory"], self.active["io"], self.active["swap"]
+        targets = {}
+        if memory and swap: targets["vm.swappiness"] = (-1, "memory-swap")
+        elif memory: targets["vm.swappiness"] = (1, "memory-cache")
+        else: targets["vm.swappiness"] = (0, "relax")
+        if io: targets["vm.vfs_cache_pressure"] = (-1, "io")
+        elif memory: targets["vm.vfs_cache_pressure"] = (1, "memory")
+        else: targets["vm.vfs_cache_pressure"] = (0, "relax")
+        return targets
+
+    def decide(self, signals, current, now=None):
+        now = time.monotonic() if now is None else now
+        self._update_state(signals)
+        decisions = []
+        for key, (direction, reason) in self._targets().items():
+            if key not in current or key not in self.baseline: continue
+            if now - self._changed.get(key, float("-inf")) < self.cooldown: continue
+            low, high, step = self.bounds[key]; old = current[key]
+            if direction: new = min(max(old + direction * step, low), high)
+            elif old < self.baseline[key]: new = min(old + step, self.baseline[key])
+            else: new = max(old - step, self.baseline[key])
+            if new == old: continue
+            self._changed[key] = now
+            decisions.append(Decision(key, old, new, reason, signals))
+        return decisions
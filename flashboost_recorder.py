@@ -0,0 +1,164 @@
+import mmap
+import os
+import struct
+import threading
+import time
+import numpy as np
+
+MAGIC = b"FBREC\x00\x00\x01"
+# الترويسة: المعرف، عدد الأنوية، السعة، عدد السجلات المكتوبة، وقت الإنشاء
+HEADER = struct.Struct("<8sIIQd")
+HEADER_SIZE = 64
+COUNT_OFFSET = 16 # موضع عدد السجلات في الترويسة
+SUFFIX = ".fbrec"
+# الحقول بعد الطابع الزمني وأنوية المعالج (بترتيب الكتابة في append)، ثم psi: some avg10 لـ cpu و memory و io
+FIELDS = ("ram", "swap", "disk_read", "disk_write", "net_rx", "net_tx", "temp")
+
+
+def record_dtype(cores):
+    # سجل ثابت العرض دون حشو: يُكتب بـ struct ويُقرأ مباشرة كمصفوفة numpy منظمة
+    return np.dtype([("t", "<f8"), ("cpu", "<f4", (cores,))] + [(name, "<f4") for name in FIELDS] + [("psi", "<f4", (3,))])
+
+
+def default_directory():
+    return os.environ.get("FLASHBOOST_RECORD_DIR") or os.path.join(os.path.expanduser("~/.local/share"), "flashboost", "recordings")
+
+
+class MetricRecorder:
+    # ملفات مقاطع مخصصة مسبقاً ومربوطة بالذاكرة: الكتابة = struct.pack_into واحد + تحديث العداد
+    # عند امتلاء المقطع يُفتح مقطع جديد ويُحذف الأقدم بعد max_segments
+    def __init__(self, directory=None, cores=1, capacity=86400, max_segments=8):
+        self.directory = directory or default_directory()
+        self.cores = cores
+        self.capacity = capacity
+        self.max_segments = max_segments
+        self.dtype = record_dtype(cores)
+        self._record = struct.Struct("<d" + "f" * ((self.dtype.itemsize - 8) // 4))
+        self._mm = None
+        self._fd = None
+        self._count = 0
+        self.path = None
+        self._lock = threading.Lock() # الإضافة من خيط القياس والإغلاق من الواجهة
+
+    def _open_segment(self):
+        self._close_segment()
+        os.makedirs(self.directory, exist_ok=True)
+        now = time.time()
+        # الميكروثانية في الاسم: مقاطع تُفتح في الثانية نفسها تبقى مرتبة
+        name = time.strftime("flashboost-%Y%m%d-%H%M%S", time.localtime(now)) + f"-{int(now * 1e6) % 1000000:06d}"
+        path = os.path.join(self.directory, name + SUFFIX)
+        size = HEADER_SIZE + self.capacity * self.dtype.itemsize
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL | os.O_CLOEXEC, 0o644)
+        try: os.posix_fallocate(fd, 0, size) # حجز المساحة الآن: لا أخطاء SIGBUS عند امتلاء القرص لاحقاً
+        except OSError: os.ftruncate(fd, size)
+        self._mm = mmap.mmap(fd, size)
+        HEADER.pack_into(self._mm, 0, MAGIC, self.cores, self.capacity, 0, time.time())
+        self._fd = fd; self._count = 0; self.path = path
+        self._prune()
+
+    def _prune(self):
+        segments = list_segments(self.directory)
+        for path in segments[:max(0, len(segments) - self.max_segments)]:
+            try: os.unlink(path)
+            except OSError as e: print(f"Recorder prune error: {e}")
+
+    def append(self, timestamp, sample):
+        # sample: {المجموعة: القيم} كما يعيدها HistoryRecorder.collect
+        cpu = sample["cpu"].tolist() if hasattr(sample["cpu"], "tolist") else list(sample["cpu"])
+        if len(cpu) != self.cores: cpu = (cpu + [float("nan")] * self.cores)[:self.cores]
+        psi = sample["psi"]; memory = sample["memory"]; disk = sample["disk"]; net = sample["net"]
+        with self._lock:
+            if self._mm is None or self._count >= self.capacity: self._open_segment()
+            self._record.pack_into(self._mm, HEADER_SIZE + self._count * self.dtype.itemsize, timestamp, *cpu,
+                                   memory[0], memory[1], disk[0], disk[1], net[0], net[1], sample["temp"][0], psi[0], psi[1], psi[2])
+            self._count += 1
+            # العداد بعد السجل: القارئ لا يرى سجلاً نصف مكتوب
+            struct.pack_into("<Q", self._mm, COUNT_OFFSET, self._count)
+
+    def close(self):
+        with self._lock: self._close_segment()
+
+    def _close_segment(self):
+        if self._mm is not None:
+            self._mm.flush(); self._mm.close(); self._mm = None
+        if self._fd is not None: os.close(self._fd); self._fd = None
+
+
+def list_segments(directory):
+    # أسماء المقاطع تبدأ بوقت الإنشاء، فالترتيب الأبجدي = الترتيب الزمني
+    try: return sorted(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(SUFFIX))
+    except OSError: return []
+
+
+class Recording:
+    # مقطع واحد للقراءة: records مصفوفة numpy فوق الـ mmap مباشرة (دون نسخ)
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.cores, self.capacity, _, self.created = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC: self._mm.close(); raise ValueError(f"not a FlashBoost recording: {path}")
+        self.dtype = record_dtype(self.cores)
+        self.refresh()
+
+    def refresh(self):
+        # يعيد قراءة العداد (المقطع قد يكون قيد الكتابة)
+        count = min(struct.unpack_from("<Q", self._mm, COUNT_OFFSET)[0], self.capacity)
+        self.records = np.frombuffer(self._mm, self.dtype, count, HEADER_SIZE)
+        return count
+
+    def between(self, start=None, end=None):
+        # السجلات في [start, end) بالبحث الثنائي على الطوابع الزمنية؛ النتيجة عرض (view) وليست نسخة
+        times = self.records["t"]
+        i = 0 if start is None else int(np.searchsorted(times, start, "left"))
+        j = len(times) if end is None else int(np.searchsorted(times, end, "left"))
+        return self.records[i:j]
+
+    def close(self):
+        # العروض المعادة يجب ألا تُستخدم بعد الإغلاق
+        self.records = None
+        try: self._mm.close()
+        except BufferError: pass # ما زالت هناك عروض حية: يُغلق عند تحريرها
+
+
+class RecordingSet:
+    # كل مقاطع مجلد التسجيل (أو المقاطع المحددة) كسلسلة زمنية واحدة
+    def __init__(self, directory=None, paths=None):
+        self.directory = directory or default_directory()
+        self.segments = []
+        for path in sorted(paths) if paths else list_segments(self.directory):
+            try: self.segments.append(Recording(path))
+            except (OSError, ValueError) as e: print(f"Recording skipped ({path}): {e}")
+
+    def query(self, start=None, end=None):
+        # قائمة عروض (واحد لكل مقطع متقاطع مع المدى) دون نسخ
+        views = []
+        for segment in self.segments:
+            segment.refresh()
+            view = segment.between(start, end)
+            if len(view): views.append(view)
+        return views
+
+    def load(self, start=None, end=None):
+        # مصفوفة واحدة متصلة (نسخة)؛ المقاطع بعدد أنوية مختلف لا تُدمج
+        views = self.query(start, end)
+        if not views: return None
+        cores = views[-1].dtype["cpu"].shape[0]
+        return np.concatenate([v for v in views if v.dtype["cpu"].shape[0] == cores])
+
+    def close(self):
+        for segment in self.segments: segment.close()
+        self.segments = []
+
+
+def to_rings(records):
+    # سجلات مُحمّلة -> حلقات HistoryRing بنفس مجموعات HistoryRecorder (لعرضها في رسوم الواجهة)
+    from flashboost_history import HistoryRing
+    columns = {"cpu": records["cpu"].T, "memory": (records["ram"], records["swap"]), "disk": (records["disk_read"], records["disk_write"]),
+               "net": (records["net_rx"], records["net_tx"]), "temp": (records["temp"],), "psi": records["psi"].T}
+    rings = {}
+    for group, values in columns.items():
+        values = np.asarray(values, dtype=np.float32)
+        ring = rings[group] = HistoryRing(len(values), max(1, len(records)))
+        ring.data[:, :len(records)] = values; ring.total = len(records)
+    return rings
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import namedtuple
+from flashboost_trace import TRACER
+
+Sample = namedtuple("Sample", ["timestamp", "cpu", "ram", "disk", "temp"])
+
+# الفترات الافتراضية (بالثواني) لكل مقياس
+DEFAULT_INTERVALS = {"cpu": 1.0, "ram": 1.5, "disk": 10.0, "temp": 3.0}
+
+
+class SampleRing:
+    # حلقة ثابتة الحجم: تخصص الخانات مرة واحدة ثم يُكتب فوق الأقدم
+    def __init__(self, capacity=600):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def append(self, sample):
+        with self._lock:
+            self._slots[self._next] = sample
+            self._next = (self._next + 1) % self.capacity
+            if self._count < self.capacity: self._count += 1
+
+    def latest(self):
+        with self._lock:
+            if not self._count: return None
+            return self._slots[(self._next - 1) % self.capacity]
+
+    def snapshot(self):
+        # نسخة مرتبة من الأقدم إلى الأحدث
+        with self._lock:
+            if self._count < self.capacity: return self._slots[:self._count]
+            return self._slots[self._next:] + self._slots[:self._next]
+
+    def __len__(self):
+        return self._count
+
+
+class MetricSampler:
+    def __init__(self, system_info, intervals=None, capacity=600, disk_path='/', on_collect=None):
+        self.system_info = system_info
+        self.on_collect = on_collect # (المقياس، زمن القراءة بالثواني)
+        self.intervals = dict(DEFAULT_INTERVALS)
+        if intervals: self.intervals.update(intervals)
+        self.disk_path = disk_path
+        self.ring = SampleRing(capacity)
+        self._readers = {
+            "cpu": self.system_info.get_cpu_usage,
+            "ram": self.system_info.get_ram_usage,
+            "disk": lambda: self.system_info.get_disk_usage(self.disk_path),
+            "temp": self.system_info.get_temperature,
+        }
+        self._values = {"cpu": 0.0, "ram": 0.0, "disk": 0.0, "temp": "N/A"}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def set_interval(self, metric, seconds):
+        if metric not in self._readers: raise KeyError(metric)
+        if seconds <= 0: raise ValueError("interval must be positive")
+        self.intervals[metric] = seconds
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="flashboost-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread: self._thread.join(timeout); self._thread = None
+
+    def latest(self):
+        return self.ring.latest()
+
+    def sample_once(self, metrics=None):
+        with TRACER.span("sample", "sampler", metrics=",".join(metrics or self._readers)):
+            return self._sample(metrics)
+
+    def _sample(self, metrics):
+        for metric in (metrics or self._readers):
+            start = time.perf_counter()
+            try: self._values[metric] = self._readers[metric]()
+            except Exception as e: print(f"Sampler error ({metric}): {e}")
+            if self.on_collect: self.on_collect(metric, time.perf_counter() - start)
+        sample = Sample(time.time(), **self._values)
+        self.ring.append(sample)
+        return sample
+
+    def _run(self):
+        now = time.monotonic()
+        due = {metric: now for metric in self._readers}
+        while not self._stop.is_set():
+            now = time.monotonic()
+            ready = [m for m, t in due.items() if t <= now]
+            if ready:
+                self.sample_once(ready)
+                for metric in ready: due[metric] = now + self.intervals[metric]
+            self._stop.wait(max(0.0, min(due.values()) - time.monotonic()))
@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+
+# التردد (Hz)، المدة (ث)، معامل الشدة
+BUILTIN_TONES = {
+    "success": (523.25, 0.25, 0.4),
+    "error": (261.63, 0.4, 0.5),
+    "info": (659.25, 0.2, 0.3),
+}
+
+
+class ToneBank:
+    # الموجات تُولَّد مرة واحدة وتُحفظ؛ جهاز الصوت يُفتح عند أول استخدام ويُغلق بعد فترة خمول
+    def __init__(self, idle_timeout=15.0, sample_rate=44100, user_cache_size=16, log=None):
+        self.idle_timeout = idle_timeout
+        self.sample_rate = sample_rate
+        self.user_cache_size = user_cache_size
+        self.log = log or print
+        self.available = True
+        self._pygame = None
+        self._np = None
+        self._waves = {} # الأصوات المدمجة: المفتاح -> مصفوفة int16 (تبقى بعد إغلاق الجهاز)
+        self._user_waves = OrderedDict() # نغمات المستخدم (LRU)
+        self._sounds = {} # كائنات Sound صالحة فقط ما دام الجهاز مفتوحاً
+        self._idle_timer = None
+        self._lock = threading.RLock()
+
+    def _import(self):
+        if self._pygame is not None: return True
+        try:
+            import numpy
+            import pygame
+        except ImportError as e:
+            self.available = False
+            self.log(f"⚠️ الصوت غير متاح (مكتبة غير موجودة: {e.name}).")
+            return False
+        self._np, self._pygame = numpy, pygame
+        return True
+
+    def _open(self):
+        mixer = self._pygame.mixer
+        if mixer.get_init(): return True
+        try:
+            mixer.init(frequency=self.sample_rate, size=-16, channels=2, buffer=512)
+            return True
+        except self._pygame.error as e:
+            self.available = False
+            self.log(f"⚠️ فشل تهيئة pygame.mixer: {e}.")
+            return False
+
+    def _render(self, freq, dur, amp_f):
+        np = self._np
+        sr = self.sample_rate; ns = int(sr * dur)
+        if ns <= 0: return None
+        t = np.linspace(0., dur, ns, endpoint=False); amp = np.iinfo(np.int16).max * amp_f
+        s = amp * np.sin(2. * np.pi * freq * t); fl = int(sr * 0.02)
+        if ns > fl * 2: s[:fl] *= np.linspace(0., 1., fl); s[-fl:] *= np.linspace(1., 0., fl)
+        sa = s.astype(np.int16)
+        return np.ascontiguousarray(np.column_stack((sa, sa)))
+
+    def _wave(self, key):
+        if key in BUILTIN_TONES:
+            wave = self._waves.get(key)
+            if wave is None: wave = self._waves[key] = self._render(*BUILTIN_TONES[key])
+            return wave
+        wave = self._user_waves.get(key)
+        if wave is not None:
+            self._user_waves.move_to_end(key)
+            return wave
+        wave = self._user_waves[key] = self._render(*key)
+        while len(self._user_waves) > self.user_cache_size:
+            old_key, _ = self._user_waves.popitem(last=False)
+            self._sounds.pop(old_key, None)
+        return wave
+
+    def _sound(self, key):
+        sound = self._sounds.get(key)
+        if sound is None:
+            wave = self._wave(key)
+            if wave is None: return None
+            sound = self._sounds[key] = self._pygame.sndarray.make_sound(wave)
+        return sound
+
+    def _play(self, key):
+        with self._lock:
+            if not self.available or not self._import() or not self._open(): return
+            try:
+                sound = self._sound(key)
+                if sound: sound.play()
+            except Exception as e: print(f"Sound Error: {type(e).__name__} - {e}")
+            self._schedule_close()
+
+    def play(self, sound_type):
+        if sound_type in BUILTIN_TONES: self._play(sound_type)
+
+    def play_tone(self, freq, dur, amp_f=0.4):
+        self._play((float(freq), float(dur), float(amp_f)))
+
+    def preload(self):
+        # توليد الموجات المدمجة مسبقاً دون فتح جهاز الصوت
+        with self._lock:
+            if self._import():
+                for key in BUILTIN_TONES: self._wave(key)
+
+    def _schedule_close(self):
+        if self._idle_timer: self._idle_timer.cancel()
+        self._idle_timer = threading.Timer(self.idle_timeout, self._close_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _close_if_idle(self):
+        with self._lock:
+            mixer = self._pygame.mixer
+            if mixer.get_init() and mixer.get_busy(): self._schedule_close(); return
+            self._close_device()
+
+    def _close_device(self):
+        self._sounds.clear()
+        if self._pygame and self._pygame.mixer.get_init(): self._pygame.mixer.quit()
+
+    def close(self):
+        with self._lock:
+            if self._idle_timer: self._idle_timer.cancel(); self._idle_timer = None
+            self._close_device()
@@ -0,0 +1,124 @@
+import json
+import os
+import re
+import threading
+
+# مفاتيح موجودة لكنها بلا تأثير ابتداءً من إصدار النواة المذكور
+NOOP_KEYS = {
+    "net.ipv4.tcp_low_latency": (4, 14),
+}
+# مفاتيح إضافية مسموحة لملفات التطبيقات (فوق مفاتيح الضبط الأولي وتعزيز الشبكة والضبط التلقائي)
+PROFILE_SYSCTL_KEYS = frozenset({
+    "vm.swappiness", "vm.vfs_cache_pressure", "vm.dirty_ratio", "vm.dirty_background_ratio",
+    "vm.dirty_expire_centisecs", "vm.dirty_writeback_centisecs", "vm.page-cluster",
+    "net.core.netdev_max_backlog", "net.core.rmem_max", "net.core.wmem_max", "net.core.busy_poll", "net.core.busy_read",
+    "net.ipv4.tcp_low_latency", "net.ipv4.tcp_timestamps", "net.ipv4.tcp_sack", "net.ipv4.tcp_fastopen",
+})
+
+
+class SysctlError(Exception):
+    pass
+
+
+def kernel_version(release=None):
+    match = re.match(r"^(\d+)\.(\d+)", release or os.uname().release)
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+
+def _normalize(value):
+    # القيم متعددة الحقول تُقرأ مفصولة بمسافات الجدولة
+    return " ".join(str(value).split())
+
+
+class SysctlEngine:
+    # كتابة مباشرة إلى /proc/sys مع التحقق، ولقطات مسماة للتراجع
+    # allowed: المفاتيح المسموحة فقط (المساعد)؛ يشمل ذلك استعادة اللقطات
+    def __init__(self, proc_root='/proc', state_path=None, kernel=None, allowed=None):
+        self.proc_root = proc_root
+        self.state_path = state_path
+        self.kernel = kernel or kernel_version()
+        self.allowed = allowed
+        self._lock = threading.Lock()
+
+    def path(self, key):
+        if not isinstance(key, str) or not re.match(r"^[a-z0-9_]+(\.[a-zA-Z0-9_\-]+)+$", key): raise SysctlError(f"invalid sysctl key: {key!r}")
+        if self.allowed is not None and key not in self.allowed: raise SysctlError(f"sysctl key not allowed: {key}")
+        return os.path.join(self.proc_root, "sys", *key.split("."))
+
+    def read(self, key):
+        try:
+            with open(self.path(key)) as f: return _normalize(f.read())
+        except FileNotFoundError: return None
+
+    def write(self, key, value):
+        value = _normalize(value)
+        with open(self.path(key), "w") as f: f.write(value)
+        actual = self.read(key)
+        if actual != value: raise SysctlError(f"{key}: wrote {value!r} but kernel reports {actual!r}")
+        return actual
+
+    def probe(self, key):
+        # "ok" أو "missing" أو "noop" (لا تأثير على النواة الحالية)
+        if not os.path.exists(self.path(key)): return "missing"
+        noop_since = NOOP_KEYS.get(key)
+        if noop_since and self.kernel >= noop_since: return "noop"
+        return "ok"
+
+    def apply(self, settings, snapshot=None):
+        # تطبيق مجموعة كاملة أو لا شيء: عند فشل أي مفتاح تُستعاد القيم السابقة
+        with self._lock:
+            applied, skipped, previous = {}, {}, {}
+            for key, value in settings.items():
+                status = self.probe(key)
+                if status != "ok": skipped[key] = status; continue
+                previous[key] = self.read(key)
+            written = []
+            try:
+                for key in previous:
+                    new = self.write(key, settings[key])
+                    written.append(key); applied[key] = (previous[key], new)
+            except (OSError, SysctlError) as e:
+                errors = self._rollback({k: previous[k] for k in written})
+                detail = f"; rollback failed for {', '.join(errors)}" if errors else ""
+                raise SysctlError(f"failed to apply {key}: {e}{detail}") from e
+            if snapshot and applied: self._save_snapshot(snapshot, {k: old for k, (old, _) in applied.items()})
+            return {"applied": applied, "skipped": skipped}
+
+    def _rollback(self, values):
+        errors = []
+        for key in reversed(list(values)):
+            try: self.write(key, values[key])
+            except (OSError, SysctlError): errors.append(key)
+        return errors
+
+    def restore(self, name):
+        with self._lock: values = self._load_snapshots().get(name)
+        if values is None: raise SysctlError(f"no snapshot named {name!r}")
+        result = self.apply({k: v for k, v in values.items() if v is not None})
+        with self._lock:
+            snapshots = self._load_snapshots(); snapshots.pop(name, None); self._store_snapshots(snapshots)
+        return result
+
+    def snapshots(self):
+        with self._lock: return self._load_snapshots()
+
+    def _load_snapshots(self):
+        if not self.state_path: return {}
+        try:
+            with open(self.state_path) as f: return json.load(f)
+        except FileNotFoundError: return {}
+        except ValueError: print(f"Corrupt sysctl snapshot file: {self.state_path}"); return {}
+
+    def _store_snapshots(self, snapshots):
+        if not self.state_path: return
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w") as f: json.dump(snapshots, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.state_path)
+
+    def _save_snapshot(self, name, values):
+        # القيمة الأصلية الأولى تبقى: تكرار التعزيز لا يستبدل الإعدادات الافتراضية
+        snapshots = self._load_snapshots()
+        saved = snapshots.setdefault(name, {})
+        for key, value in values.items(): saved.setdefault(key, value)
+        self._store_snapshots(snapshots)
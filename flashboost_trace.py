@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from collections import deque
+
+now = time.perf_counter_ns
+
+
+class _NullSpan:
+    # يُعاد عند تعطيل التتبع: لا وقت ولا تخصيص
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = now()
+        return self
+
+    def set(self, **args):
+        # نتيجة تُعرف أثناء التنفيذ (رمز الخروج، عدد العمليات...)
+        self.args.update(args)
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None: self.args["error"] = exc_type.__name__
+        self.tracer.record(self.name, self.cat, self.start, now(), self.args)
+        return False
+
+
+class Tracer:
+    # مخزن حلقي في الذاكرة: كل حدث tuple واحد في deque (الإضافة ذرية دون قفل)، والأقدم يُسقط عند الامتلاء
+    def __init__(self, capacity=100000, enabled=False):
+        self.enabled = enabled
+        self.events = deque(maxlen=capacity)
+        self.recorded = 0
+        self._threads = {} # معرف الخيط في النظام -> الاسم
+        self._lock = threading.Lock() # للعداد وأول ظهور لكل خيط؛ الإضافة إلى deque لا تحتاجه
+        self._origin = now()
+
+    def enable(self, clear=True):
+        if clear: self.clear()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        with self._lock: self.events.clear(); self._threads.clear(); self.recorded = 0
+
+    def span(self, name, cat="app", **args):
+        return Span(self, name, cat, args) if self.enabled else NULL_SPAN
+
+    def record(self, name, cat, start, end, args=None):
+        # end = None لحدث لحظي
+        if not self.enabled: return
+        tid = threading.get_native_id()
+        with self._lock:
+            if tid not in self._threads: self._threads[tid] = threading.current_thread().name
+            self.recorded += 1
+        self.events.append((name, cat, start, end, tid, args or None))
+
+    def instant(self, name, cat="app", **args):
+        self.record(name, cat, now(), None, args)
+
+    @property
+    def dropped(self):
+        return self.recorded - len(self.events)
+
+    def chrome_trace(self):
+        # صيغة Trace Event (chrome://tracing و Perfetto): أحداث "X" بمدة، و "i" لحظية، و "M" لأسماء الخيوط
+        pid = os.getpid()
+        with self._lock: threads = dict(self._threads)
+        trace = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "flashboost"}}]
+        trace += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}} for tid, name in threads.items()]
+        for name, cat, start, end, tid, args in list(self.events):
+            event = {"name": name, "cat": cat, "ph": "X" if end is not None else "i", "ts": (start - self._origin) / 1000, "pid": pid, "tid": tid}
+            if end is not None: event["dur"] = (end - start) / 1000
+            else: event["s"] = "t"
+            if args: event["args"] = args
+            trace.append(event)
+        return {"traceEvents": trace, "displayTimeUnit": "ms", "otherData": {"recorded": self.recorded, "dropped": self.dropped}}
+
+    def export(self, path):
+        # كتابة ذرية؛ يعيد عدد الأحداث
+        import json
+        data = self.chrome_trace()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f: json.dump(data, f, ensure_ascii=False, default=str)
+        os.replace(tmp, path)
+        return len(data["traceEvents"])
+
+
+def summarize(events):
+    # (الفئة، الاسم) -> [العدد، المجموع، الأعلى] بالمللي ثانية، من أحداث Chrome trace
+    totals = {}
+    for event in events:
+        if event.get("ph") != "X": continue
+        entry = totals.setdefault((event.get("cat", ""), event["name"]), [0, 0.0, 0.0])
+        duration = event.get("dur", 0) / 1000
+        entry[0] += 1; entry[1] += duration; entry[2] = max(entry[2], duration)
+    return totals
+
+
+def default_path():
+    return os.environ.get("FLASHBOOST_TRACE_FILE") or os.path.join(os.path.expanduser("~/.cache"), "flashboost", time.strftime("trace-%Y%m%d-%H%M%S.json"))
+
+
+# متتبع واحد للعملية: الوحدات (المجدول، المشغّل، المساعد، العيّنات، الواجهة) تسجل فيه مباشرة
+TRACER = Tracer(enabled=os.environ.get("FLASHBOOST_TRACE") == "1")
+span = TRACER.span
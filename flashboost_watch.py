@@ -0,0 +1,269 @@
+import errno
+import json
+import os
+import re
+import select
+import socket
+import struct
+import time
+from flashboost_procfs import PersistentFile
+from flashboost_sysctl import PROFILE_SYSCTL_KEYS
+
+NETLINK_CONNECTOR = 11
+CN_IDX_PROC = 1
+CN_VAL_PROC = 1
+PROC_CN_MCAST_LISTEN = 1
+PROC_CN_MCAST_IGNORE = 2
+NLMSG_DONE = 3
+PROC_EVENT_EXEC = 0x00000002
+PROC_EVENT_COMM = 0x00000200
+PROC_EVENT_EXIT = 0x80000000
+NLMSG_HEADER = struct.Struct("=IHHII")
+CN_MSG = struct.Struct("=IIIIHH")
+PROC_EVENT = struct.Struct("=IIQii") # what، cpu، timestamp_ns، ثم pid و tgid (أول حقلين في كل أنواع الأحداث)
+SOURCES = ("auto", "connector", "poll")
+PROFILE_KEYS = ("match", "nice", "sysctl", "governor", "wifi_power_save")
+
+
+class WatchError(Exception):
+    pass
+
+
+class AppProfile:
+    # match: أسماء البرامج (comm أو اسم الملف التنفيذي، دون حساسية لحالة الأحرف)
+    def __init__(self, name, match, nice=None, sysctl=None, governor=None, wifi_power_save=None):
+        self.name = name
+        self.match = {m.lower() for m in match}
+        self.nice = nice
+        self.sysctl = dict(sysctl or {})
+        self.governor = governor
+        self.wifi_power_save = wifi_power_save
+
+
+def default_profiles_path():
+    return os.environ.get("FLASHBOOST_PROFILES") or os.path.join(os.path.expanduser("~/.config"), "flashboost", "profiles.json")
+
+
+def load_profiles(path=None):
+    # {"اسم": {"match": [...], "nice": -5, "sysctl": {...}, "governor": "performance", "wifi_power_save": false}}
+    path = path or default_profiles_path()
+    try:
+        with open(path) as f: data = json.load(f)
+    except FileNotFoundError: return []
+    except ValueError as e: raise WatchError(f"{path}: {e}")
+    if not isinstance(data, dict): raise WatchError(f"{path}: expected an object of profiles")
+    profiles = []
+    for name, spec in data.items():
+        if not isinstance(spec, dict) or not isinstance(spec.get("match"), list) or not spec["match"]: raise WatchError(f"profile {name!r}: 'match' must be a non-empty list")
+        unknown = set(spec) - set(PROFILE_KEYS)
+        if unknown: raise WatchError(f"profile {name!r}: unknown keys {', '.join(sorted(unknown))}")
+        nice = spec.get("nice")
+        if nice is not None and (not isinstance(nice, int) or not -20 <= nice <= 19): raise WatchError(f"profile {name!r}: invalid nice {nice!r}")
+        if not isinstance(spec.get("sysctl", {}), dict): raise WatchError(f"profile {name!r}: 'sysctl' must be an object")
+        # المساعد يرفض غيرها: الخطأ هنا عند التحميل أوضح من فشل عند تشغيل التطبيق
+        disallowed = set(spec.get("sysctl", {})) - PROFILE_SYSCTL_KEYS
+        if disallowed: raise WatchError(f"profile {name!r}: sysctl keys not allowed: {', '.join(sorted(disallowed))}")
+        profiles.append(AppProfile(name, [str(m) for m in spec["match"]], nice, spec.get("sysctl"), spec.get("governor"), spec.get("wifi_power_save")))
+    return profiles
+
+
+def list_pids(proc_root='/proc'):
+    return {int(p) for p in os.listdir(proc_root) if p.isdigit()}
+
+
+def process_names(proc_root, pid):
+    # {comm، اسم argv[0]}؛ comm مقتطع إلى 15 حرفاً، و argv[0] يغطي الأسماء الطويلة وبرامج wine (C:\...\game.exe)
+    base = os.path.join(proc_root, str(pid))
+    try:
+        with open(os.path.join(base, "comm"), "rb") as f: names = {f.read().strip().decode("utf-8", "replace").lower()}
+        with open(os.path.join(base, "cmdline"), "rb") as f: argv0 = f.read(4096).split(b"\0", 1)[0]
+    except OSError: return None
+    if not argv0: return None # خيوط النواة والعمليات المنتهية (zombie) بلا cmdline
+    names.add(re.split(r"[\\/]", argv0.decode("utf-8", "replace"))[-1].lower())
+    return names
+
+
+class ProcConnector:
+    # أحداث exec/exit من النواة لحظة حدوثها عبر netlink (تتطلب CAP_NET_ADMIN)
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM | socket.SOCK_CLOEXEC, NETLINK_CONNECTOR)
+        try:
+            self.sock.bind((0, CN_IDX_PROC))
+            self._send(PROC_CN_MCAST_LISTEN)
+        except OSError: self.sock.close(); raise
+        self.sock.setblocking(False)
+
+    def _send(self, op):
+        payload = struct.pack("=I", op)
+        message = CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(payload), 0) + payload
+        self.sock.send(NLMSG_HEADER.pack(NLMSG_HEADER.size + len(message), NLMSG_DONE, 0, 0, os.getpid()) + message)
+
+    def scan(self, proc_root):
+        return list_pids(proc_root)
+
+    def track(self, pid):
+        pass
+
+    def untrack(self, pid):
+        pass
+
+    def wait(self, timeout):
+        # [("exec" أو "exit"، PID)]؛ None عند فقدان أحداث (ENOBUFS) فيلزم فحص كامل
+        events = []
+        if not select.select([self.sock], [], [], timeout)[0]: return events
+        while True:
+            try: data = self.sock.recv(65536)
+            except BlockingIOError: return events
+            except OSError as e:
+                if e.errno == errno.ENOBUFS: return None
+                raise
+            offset = 0
+            while offset + NLMSG_HEADER.size + CN_MSG.size + PROC_EVENT.size <= len(data):
+                length = NLMSG_HEADER.unpack_from(data, offset)[0]
+                what, _, _, pid, tgid = PROC_EVENT.unpack_from(data, offset + NLMSG_HEADER.size + CN_MSG.size)
+                # أحداث الخيوط تُتجاهل؛ exec يحدث دائماً في قائد مجموعة الخيوط
+                if pid == tgid:
+                    if what in (PROC_EVENT_EXEC, PROC_EVENT_COMM): events.append(("exec", tgid))
+                    elif what == PROC_EVENT_EXIT: events.append(("exit", tgid))
+                offset += max(NLMSG_HEADER.size, (length + 3) & ~3)
+
+    def close(self):
+        try: self._send(PROC_CN_MCAST_IGNORE)
+        except OSError: pass
+        self.sock.close()
+
+
+class ProcPoller:
+    # دون صلاحيات: قائمة /proc تُقرأ فقط عندما يتغير آخر PID في /proc/loadavg (أي أُنشئت عملية)،
+    # والعمليات الحديثة (أقل من settle ثوانٍ) يُعاد فحص اسمها لأن السكربتات الغلافية تنفذ exec للبرنامج بعد البدء.
+    # خروج العمليات المتابعة عبر pidfd (poll) فور حدوثه
+    def __init__(self, proc_root='/proc', interval=0.5, settle=3.0):
+        self.proc_root = proc_root
+        self.interval = interval
+        self.settle = settle
+        self._loadavg = PersistentFile(os.path.join(proc_root, "loadavg"), 256)
+        self._last_pid = None
+        self._known = set()
+        self._fresh = {} # PID -> وقت الظهور
+        self._tracked = {} # PID -> pidfd أو None
+        self._poller = select.poll()
+        # pidfd لعمليات حقيقية فقط: على شجرة وهمية قد يشير الرقم إلى عملية أخرى
+        self._use_pidfd = os.path.realpath(proc_root) == "/proc" and hasattr(os, "pidfd_open")
+        self._due = time.monotonic()
+
+    def _read_last_pid(self):
+        n = self._loadavg.read()
+        return self._loadavg.buf[:n].split()[-1]
+
+    def scan(self, proc_root=None):
+        self._last_pid = self._read_last_pid()
+        self._known = list_pids(self.proc_root)
+        return set(self._known)
+
+    def track(self, pid):
+        if pid in self._tracked: return
+        fd = None
+        if self._use_pidfd:
+            try: fd = os.pidfd_open(pid); self._poller.register(fd, select.POLLIN)
+            except OSError: fd = None
+        self._tracked[pid] = fd
+
+    def untrack(self, pid):
+        fd = self._tracked.pop(pid, None)
+        if fd is not None: self._poller.unregister(fd); os.close(fd)
+
+    def wait(self, timeout):
+        timeout = min(timeout, max(0.0, self._due - time.monotonic()))
+        events = []
+        if any(fd is not None for fd in self._tracked.values()):
+            ready = {fd for fd, _ in self._poller.poll(timeout * 1000)}
+            events += [("exit", pid) for pid, fd in self._tracked.items() if fd in ready]
+        elif timeout: time.sleep(timeout)
+        now = time.monotonic()
+        if now < self._due: return events
+        self._due = now + self.interval
+        events += [("exit", pid) for pid, fd in self._tracked.items() if fd is None and not os.path.exists(os.path.join(self.proc_root, str(pid)))]
+        last_pid = self._read_last_pid()
+        new = set()
+        if last_pid != self._last_pid:
+            self._last_pid = last_pid
+            current = list_pids(self.proc_root)
+            new = current - self._known; self._known = current
+            for pid in new: self._fresh[pid] = now
+        for pid, seen in list(self._fresh.items()):
+            if now - seen > self.settle or pid not in self._known: del self._fresh[pid]
+        events += [("exec", pid) for pid in self._fresh]
+        return events
+
+    def close(self):
+        for pid in list(self._tracked): self.untrack(pid)
+        self._loadavg.close()
+
+
+def open_source(proc_root='/proc', source="auto", interval=0.5):
+    # proc connector عند توفر الصلاحية (على /proc الحقيقي فقط)، وإلا الفحص الدوري
+    if source not in SOURCES: raise WatchError(f"unknown source: {source!r}")
+    if source != "poll" and os.path.realpath(proc_root) == "/proc":
+        try: return ProcConnector()
+        except OSError as e:
+            if source == "connector": raise WatchError(f"proc connector unavailable: {e}")
+    elif source == "connector": raise WatchError("proc connector needs the real /proc")
+    return ProcPoller(proc_root, interval)
+
+
+class AppWatcher:
+    # on_start(ملف، PID) عند أول عملية مطابقة، on_match(ملف، PID) لكل عملية مطابقة، on_stop(ملف) عند خروج آخرها
+    def __init__(self, profiles, on_start, on_stop, on_match=None, proc_root='/proc', source="auto", interval=0.5):
+        self.profiles = profiles
+        self.on_start = on_start
+        self.on_stop = on_stop
+        self.on_match = on_match
+        self.proc_root = proc_root
+        self.source = open_source(proc_root, source, interval)
+        self.active = {} # اسم الملف -> {PID}
+        self._owner = {} # PID -> الملف
+
+    @property
+    def source_name(self):
+        return "connector" if isinstance(self.source, ProcConnector) else "poll"
+
+    def match(self, pid):
+        names = process_names(self.proc_root, pid)
+        if not names: return None
+        for profile in self.profiles:
+            if names & profile.match: return profile
+        return None
+
+    def _launched(self, pid):
+        if pid in self._owner: return
+        profile = self.match(pid)
+        if profile is None: return
+        self._owner[pid] = profile; self.source.track(pid)
+        pids = self.active.setdefault(profile.name, set()); pids.add(pid)
+        if len(pids) == 1: self.on_start(profile, pid)
+        if self.on_match: self.on_match(profile, pid)
+
+    def _exited(self, pid):
+        profile = self._owner.pop(pid, None)
+        if profile is None: return
+        self.source.untrack(pid)
+        pids = self.active.get(profile.name, set()); pids.discard(pid)
+        if not pids: self.active.pop(profile.name, None); self.on_stop(profile)
+
+    def rescan(self):
+        # فحص كامل: عند البدء وبعد فقدان أحداث
+        current = self.source.scan(self.proc_root)
+        for pid in [p for p in self._owner if p not in current]: self._exited(pid)
+        for pid in sorted(current): self._launched(pid)
+
+    def run(self, stop, timeout=1.0):
+        self.rescan()
+        while not stop.is_set():
+            events = self.source.wait(timeout)
+            if events is None: self.rescan(); continue
+            for kind, pid in events:
+                if kind == "exec": self._launched(pid)
+                else: self._exited(pid)
+
+    def close(self):
+        self.source.close()
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    # شجرة وهمية: tree("proc/sys/vm/swappiness", "60") ينشئ الملف ومجلداته ويعيد مساره
+    def write(relative, content=""):
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        return path
+    write.root = tmp_path
+    return write
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from flashboost_cgroups import CgroupEngine, CgroupError, PAGE_SIZE
+
+UID = 1000
+USER_BG = f"user.slice/user-{UID}.slice/user@{UID}.service/background.slice"
+APP = f"user.slice/user-{UID}.slice/user@{UID}.service/app.slice/game.scope"
+
+
+@pytest.fixture
+def engine(tree):
+    tree("proc/meminfo", "MemTotal:        1000000 kB\n")
+    tree("proc/4242/cgroup", f"0::/{APP}\n")
+    for group in ("system.slice", USER_BG, APP):
+        tree(f"cg/{group}/cpu.weight", "100\n")
+        tree(f"cg/{group}/io.weight", "default 100\n")
+        tree(f"cg/{group}/memory.high", "max\n")
+    return CgroupEngine(str(tree.root / "cg"), str(tree.root / "state.json"), str(tree.root / "proc"))
+
+
+def read(tree, group, name):
+    return (tree.root / "cg" / group / name).read_text()
+
+
+def test_apply_boost_targets_background_and_foreground(engine, tree):
+    result = engine.apply("boost", pid=4242, uid=UID)
+    assert read(tree, "system.slice", "cpu.weight") == "25"
+    assert read(tree, "system.slice", "io.weight") == "default 25"
+    assert int(read(tree, "system.slice", "memory.high")) == 1000000 * 1024 * 75 // 100 // PAGE_SIZE * PAGE_SIZE
+    assert read(tree, APP, "cpu.weight") == "1000"
+    assert result["applied"][f"{USER_BG}/cpu.weight"] == ("100", "10")
+    assert engine.active()["boost"]["system.slice/memory.high"] == "max"
+
+
+def test_missing_controllers_and_uid_are_skipped(engine, tree):
+    os.unlink(tree.root / "cg/system.slice/io.weight")
+    result = engine.apply("boost")
+    assert result["skipped"]["system.slice/io.weight"] == "missing"
+    assert result["skipped"]["user.slice/user-{uid}.slice/user@{uid}.service/background.slice"] == "no-uid"
+
+
+def test_failed_write_rolls_back(engine, tree, monkeypatch):
+    write = engine.write
+    def failing(group, name, value):
+        if group == USER_BG and name == "memory.high": raise OSError("device busy")
+        return write(group, name, value)
+    monkeypatch.setattr(engine, "write", failing)
+    with pytest.raises(CgroupError, match="memory.high"): engine.apply("boost", uid=UID)
+    assert read(tree, "system.slice", "cpu.weight") == "100"
+    assert read(tree, USER_BG, "io.weight") == "default 100"
+    assert engine.active() == {}
+
+
+def test_verify_rejects_values_the_kernel_did_not_take(engine, monkeypatch):
+    monkeypatch.setattr(engine, "read", lambda group, name: "100")
+    with pytest.raises(CgroupError, match="kernel reports"): engine.write("system.slice", "cpu.weight", 25)
+
+
+def test_revert_restores_and_tolerates_gone_groups(engine, tree):
+    engine.apply("boost", pid=4242, uid=UID)
+    for name in ("cpu.weight", "io.weight", "memory.high"): os.unlink(tree.root / "cg" / APP / name)
+    result = engine.revert("boost")
+    assert read(tree, "system.slice", "cpu.weight") == "100" and read(tree, "system.slice", "memory.high") == "max"
+    assert f"{APP}/cpu.weight" in result["gone"]
+    assert engine.active() == {}
+
+
+@pytest.mark.parametrize("group, name", [("../etc", "cpu.weight"), ("system.slice", "cgroup.procs"), ("a/../b", "cpu.weight")])
+def test_paths_are_restricted(engine, group, name):
+    with pytest.raises(CgroupError): engine.path(group, name)
+
+
+def test_helper_uses_session_uid_and_owned_pids(engine, tree):
+    from flashboost_helper import HelperOps, HelperError
+    os.makedirs(tree.root / "sys/fs", exist_ok=True)
+    os.symlink(tree.root / "cg", tree.root / "sys/fs/cgroup")
+    ops = HelperOps(str(tree.root), allowed_uid=os.stat(tree.root / "proc/4242").st_uid + 1)
+    with pytest.raises(HelperError, match="not owned"): ops.op_apply_cgroup_profile("boost", pid=4242)
+    ops = HelperOps(str(tree.root), allowed_uid=UID)
+    with pytest.raises(HelperError, match="bad arguments"): ops.execute({"op": "apply_cgroup_profile", "profile": "boost", "uid": 0})
+    result = ops.op_apply_cgroup_profile("quiet-background")
+    assert f"{USER_BG}/cpu.weight" in result["applied"]
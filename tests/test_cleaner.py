@@ -0,0 +1,66 @@
+import os
+
+from flashboost_cleaner import CacheCleaner, CachePolicies, CleanPolicy, DAY
+
+NOW = 1_000_000_000.0
+
+
+def make(tree, relative, size, age_days):
+    path = tree(relative, "x" * size)
+    os.utime(path, (NOW - age_days * DAY, NOW - age_days * DAY))
+    return path
+
+
+def test_dry_run_reports_without_deleting(tree):
+    make(tree, "cache/app/a", 10, 1); make(tree, "cache/app/sub/b", 20, 1)
+    report = CacheCleaner(str(tree.root / "cache"), dry_run=True, now=NOW).run()
+    assert (report.files, report.bytes) == (2, 30)
+    assert report.per_entry["app"] == [2, 30]
+    assert (tree.root / "cache/app/sub/b").exists()
+
+
+def set_age(path, days):
+    os.utime(path, (NOW - days * DAY, NOW - days * DAY))
+
+
+def test_min_age_keeps_recent_files_and_removes_empty_dirs(tree):
+    make(tree, "cache/app/old/a", 10, 30); make(tree, "cache/app/new", 10, 1)
+    set_age(tree.root / "cache/app/old", 30)
+    policies = CachePolicies(CleanPolicy(min_age_days=14))
+    report = CacheCleaner(str(tree.root / "cache"), policies, now=NOW).run()
+    assert report.files == 1
+    assert not (tree.root / "cache/app/old").exists() and (tree.root / "cache/app/new").exists()
+
+
+def test_max_size_trims_oldest_first(tree):
+    for i, age in enumerate((1, 2, 3, 4)): make(tree, f"cache/thumbnails/{i}", 100, age)
+    policies = CachePolicies(CleanPolicy(min_age_days=99), overrides={"thumbnails": CleanPolicy(max_size=250)})
+    CacheCleaner(str(tree.root / "cache"), policies, now=NOW).run()
+    assert sorted(os.listdir(tree.root / "cache/thumbnails")) == ["0", "1"]
+
+
+def test_deny_and_allow_patterns(tree):
+    make(tree, "cache/fontconfig/a", 10, 1); make(tree, "cache/mesa/b", 10, 1); make(tree, "cache/other/c", 10, 1)
+    CacheCleaner(str(tree.root / "cache"), CachePolicies(deny=("fontconfig",), allow=("fontconfig", "mesa")), now=NOW).run()
+    assert (tree.root / "cache/fontconfig/a").exists() and (tree.root / "cache/other/c").exists()
+    assert not (tree.root / "cache/mesa/b").exists()
+
+
+def test_symlinks_are_not_followed(tree):
+    outside = make(tree, "outside/keep", 10, 30)
+    make(tree, "cache/app/a", 10, 30)
+    os.symlink(outside.parent, tree.root / "cache/app/link")
+    CacheCleaner(str(tree.root / "cache"), now=NOW).run()
+    assert outside.exists()
+
+
+def test_min_age_applies_to_empty_dirs_and_keeps_the_entry(tree):
+    make(tree, "cache/app/old/deeper/a", 10, 30)
+    for path in ("app/young", "app/stale", "empty"): (tree.root / "cache" / path).mkdir()
+    for path in ("app/old/deeper", "app/old", "app/stale", "app", "empty"): set_age(tree.root / "cache" / path, 30)
+    report = CacheCleaner(str(tree.root / "cache"), CachePolicies(CleanPolicy(min_age_days=14)), now=NOW).run()
+    assert report.files == 1 and report.dirs_removed == 3
+    assert os.listdir(tree.root / "cache/app") == ["young"]
+    # دون min_age: كل المجلدات الفارغة تحت كل مدخل، لكن المدخل نفسه يبقى
+    CacheCleaner(str(tree.root / "cache"), now=NOW).run()
+    assert os.listdir(tree.root / "cache/app") == [] and (tree.root / "cache/empty").is_dir()
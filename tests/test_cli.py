@@ -0,0 +1,26 @@
+import signal
+
+import pytest
+
+import flashboost_diskindex
+from flashboost_cli import main
+
+
+@pytest.fixture(autouse=True)
+def headless(monkeypatch):
+    monkeypatch.setenv("FLASHBOOST_METRICS_BACKEND", "procfs")
+    handler = signal.getsignal(signal.SIGUSR1)
+    yield
+    signal.signal(signal.SIGUSR1, handler)
+
+
+def test_run_with_nothing_to_repair_succeeds(tree, monkeypatch, capsys):
+    tree("var/lib/dpkg/status", "Package: libc6\nStatus: install ok installed\nArchitecture: amd64\nVersion: 2.36-9\n")
+    monkeypatch.setenv("FLASHBOOST_DPKG_ROOT", str(tree.root))
+    assert main(["run", "fix-packages"]) == 0
+    assert "apt-get" not in capsys.readouterr().out
+
+
+def test_run_fails_when_the_plan_cannot_be_built(monkeypatch):
+    monkeypatch.setattr(flashboost_diskindex, "list_mounts", lambda: [])
+    assert main(["run", "analyze-disk"]) == 1
@@ -0,0 +1,25 @@
+from flashboost_diskindex import DiskIndex
+
+
+def test_top_excludes_the_root_mount(tmp_path):
+    index = DiskIndex("/", str(tmp_path / "root.idx"))
+    index.dirs = {"/": [0, 0, 100, ["/a"]], "/a": [0, 20, 50, ["/a/b"]], "/a/b": [0, 30, 30, []]}
+    assert index.top(5) == [("/a", 50), ("/a/b", 30)]
+    assert index.top(5, max_depth=1) == [("/a", 50)]
+    assert index.top(5, under="/a") == [("/a/b", 30)]
+
+
+def test_refresh_save_and_load(tree):
+    tree("data/a/one", "x" * 8192)
+    tree("data/a/b/two", "x" * 8192)
+    tree("data/c/three", "")
+    root = str(tree.root / "data")
+    index = DiskIndex(root, str(tree.root / "data.idx"))
+    scanned, reused, _ = index.refresh()
+    assert (scanned, reused) == (4, 0)
+    assert [path for path, _ in index.top(2, max_depth=1)] == [f"{root}/a", f"{root}/c"]
+    assert index.size_of(root) >= index.size_of(f"{root}/a") > index.size_of(f"{root}/a/b") > 0
+    index.save()
+    loaded = DiskIndex(root, index.index_path)
+    assert loaded.load() and {p: r[2] for p, r in loaded.dirs.items()} == {p: r[2] for p, r in index.dirs.items()}
+    assert loaded.refresh()[:2] == (0, 4)
@@ -0,0 +1,127 @@
+import os
+import time
+
+import pytest
+
+from flashboost_dpkg import PackageDB, compare_versions, parse_dependencies, version_satisfies
+
+
+@pytest.mark.parametrize("older, newer", [
+    ("1.0~rc1", "1.0"), ("1.0~~", "1.0~"), ("1.0~", "1.0"), ("1.0", "1.0a"), ("1.0a", "1.0+"), ("1.0", "1.0+b1"),
+    ("1.2.9", "1.2.10"), ("9.9", "1:0.1"), ("1:9.9", "2:0"), ("1.0-1", "1.0-2"), ("1.0-9", "1.0-10"),
+    ("1.0-1", "1.0-1ubuntu1"), ("1.0-1~bpo1", "1.0-1"), ("1.0-beta-1", "1.0-beta-2"), ("1:2.0:1-1", "1:2.0:2-1"),
+])
+def test_version_ordering(older, newer):
+    assert compare_versions(older, newer) == -1
+    assert compare_versions(newer, older) == 1
+
+
+@pytest.mark.parametrize("a, b", [("0:1.0", "1.0"), ("1.0", "1.0-0"), ("1.00", "1.0"), ("1:2.0:1-1", "1:2.0:1-1")])
+def test_equal_versions(a, b):
+    assert compare_versions(a, b) == 0
+
+
+@pytest.mark.parametrize("version, relation, wanted, expected", [
+    ("1.0", "<<", "1.1", True), ("1.1", "<<", "1.1", False), ("1.1", "<=", "1.1", True), ("1.1", "=", "1.1-0", True),
+    ("1.1", ">=", "1.1~", True), ("1.1", ">>", "1.1", False), ("1.2", ">", "1.1", True),
+])
+def test_relations(version, relation, wanted, expected):
+    assert version_satisfies(version, relation, wanted) is expected
+
+
+def test_parse_dependencies():
+    assert parse_dependencies("a (>= 1.0) | b, c:any, d [amd64]") == [
+        [("a", None, ">=", "1.0"), ("b", None, None, None)], [("c", "any", None, None)], [("d", None, None, None)]]
+
+
+def stanza(name, version="1.0", status="install ok installed", arch="amd64", **fields):
+    lines = [f"Package: {name}", f"Status: {status}", f"Architecture: {arch}", f"Version: {version}"]
+    lines += [f"{key.replace('_', '-')}: {value}" for key, value in fields.items()]
+    return "\n".join(lines + [" continuation line: ignored"])
+
+
+@pytest.fixture
+def db(tree):
+    status = [
+        stanza("libc6", "2.36-9"),
+        stanza("app", Depends="libc6 (>= 2.34), libold (>= 2.0) | libnew, mta"),
+        stanza("libold", "1.5"),
+        stanza("postfix", Provides="mail-transport-agent, mta (= 1.0)"),
+        stanza("needs-virtual", Depends="mail-transport-agent, mta (>= 2.0)"),
+        stanza("half", status="install ok unpacked"),
+        stanza("trig", status="install ok triggers-pending"),
+        stanza("broken-install", status="reinstreq reinstreq half-installed"),
+        stanza("removed", status="deinstall ok config-files", Depends="nothing-here"),
+        stanza("uses-removed", Depends="removed"),
+        stanza("multi", Depends="libc6:any, libc6:i386"),
+    ]
+    tree("var/lib/dpkg/status", "\n\n".join(status) + "\n")
+    return PackageDB(str(tree.root))
+
+
+def test_find_issues(db):
+    health = db.check()
+    assert health.packages == 11
+    assert sorted(health.unconfigured) == [("half", "unpacked"), ("trig", "triggers-pending")]
+    assert health.reinstall == ["broken-install"]
+    assert health.broken == {"app": ["libold (>= 2.0) | libnew"], "needs-virtual": ["mta (>= 2.0)"],
+                             "uses-removed": ["removed"], "multi": ["libc6"]}
+    assert health.needs_configure and health.needs_fix_broken and not health.healthy
+
+
+def test_reload_only_when_status_changes(db, tree):
+    db.check()
+    assert db.load() is False
+    path = tree.root / "var/lib/dpkg/status"
+    tree("var/lib/dpkg/status", stanza("libc6"))
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+    health = db.check()
+    assert health.packages == 1 and health.healthy
+
+
+def test_interrupted_journal(db, tree):
+    tree("var/lib/dpkg/updates/0001", "")
+    assert db.check().interrupted
+
+
+def test_update_status(tree):
+    db = PackageDB(str(tree.root))
+    assert db.update_status() == (False, "no-sources")
+    sources = tree("etc/apt/sources.list.d/debian.sources", "Types: deb")
+    assert db.update_status() == (True, "missing-lists")
+    tree("var/lib/apt/lists/lock", "")
+    assert db.update_status() == (True, "missing-lists")
+    lists = tree("var/lib/apt/lists/deb.debian.org_debian_dists_stable_main_binary-amd64_Packages.lz4", "")
+    os.utime(sources, (1000, 1000)); os.utime(lists, (2000, 2000))
+    assert db.update_status(now=2000 + 3600) == (False, "fresh")
+    assert db.update_status(now=2000 + 2 * 86400) == (True, "stale")
+    os.utime(sources, (3000, 3000))
+    assert db.update_status(now=3000) == (True, "sources-changed")
+
+
+@pytest.fixture
+def core(tree):
+    from flashboost_core import FlashBoostCore, SystemInfo
+    core = FlashBoostCore(log=lambda msg: None, system_info=SystemInfo(backend="procfs"))
+    core.dpkg_root = str(tree.root)
+    yield core
+    core.close()
+
+
+def repairs(core, tree, *stanzas):
+    tree("var/lib/dpkg/status", "\n\n".join(stanzas) + "\n")
+    tree("etc/apt/sources.list.d/debian.sources", "Types: deb") # مصادر دون قوائم: update_needed صحيح
+    health = core.package_health()
+    assert health.update_needed
+    return core.package_repairs(health)
+
+
+def test_missing_lists_alone_do_not_trigger_apt_update(core, tree):
+    assert repairs(core, tree, stanza("libc6")) == []
+    assert core.plan_fix_packages() == []
+
+
+def test_update_only_before_fix_broken(core, tree):
+    assert repairs(core, tree, stanza("half", status="install ok unpacked")) == ["configure"]
+    assert repairs(core, tree, stanza("app", Depends="missing")) == ["update", "fix-broken"]
+    assert core.package_repairs(None) == ["update", "configure", "fix-broken"]
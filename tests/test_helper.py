@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from flashboost_helper import HelperError, HelperOps
+
+INTERRUPTS = """           CPU0       CPU1
+  0:         10          0   IO-APIC   2-edge      timer
+ 30:        500        100   PCI-MSI 524288-edge      eth0-rx-0
+ 40:          5          5   PCI-MSI 1-edge      nvme0q0
+"""
+
+
+@pytest.fixture
+def ops(tree):
+    tree("proc/interrupts", INTERRUPTS)
+    tree("sys/class/net/eth0/device/msi_irqs/30", "msix")
+    tree("sys/class/net/eth0/queues/rx-0/rps_cpus", "00\n")
+    tree("sys/class/net/lo/queues/rx-0/rps_cpus", "00\n")
+    for irq in (0, 30, 40): tree(f"proc/irq/{irq}/smp_affinity_list", "0-1\n")
+    return HelperOps(str(tree.root), allowed_uid=os.getuid())
+
+
+def test_affinity_accepts_nic_irqs_and_queues(ops, tree):
+    result = ops.op_apply_affinity(irqs={"30": [1]}, rps={"eth0/rx-0": [0]}, snapshot="game-boost")
+    assert result["applied"]["irq:30"] == ("0-1", "1")
+    assert (tree.root / "proc/irq/30/smp_affinity_list").read_text() == "1"
+
+
+@pytest.mark.parametrize("request_args", [{"irqs": {"40": [1]}}, {"irqs": {"0": [1]}}, {"irqs": {"99": [1]}},
+                                          {"rps": {"lo/rx-0": [1]}}, {"rps": {"../rx-0": [1]}}, {"xps": {"eth1/tx-0": [1]}}])
+def test_affinity_rejects_other_devices(ops, tree, request_args):
+    with pytest.raises(HelperError): ops.op_apply_affinity(**request_args)
+    assert (tree.root / "proc/irq/40/smp_affinity_list").read_text() == "0-1\n"
+    assert ops.affinity.snapshots() == {}
+
+
+def test_sysctl_allowlist(ops, tree):
+    from flashboost_core import FlashBoostCore
+    from flashboost_helper import SYSCTL_KEYS
+    assert set(FlashBoostCore.STARTUP_SYSCTL) | set(FlashBoostCore.NETWORK_TWEAKS) <= SYSCTL_KEYS
+    tree("proc/sys/vm/swappiness", "60\n")
+    tree("proc/sys/kernel/core_pattern", "core\n")
+    assert ops.op_write_sysctl("vm.swappiness", 10)
+    assert (tree.root / "proc/sys/vm/swappiness").read_text().strip() == "10"
+    for key, value in (("kernel.core_pattern", "|/tmp/x"), ("kernel.modprobe", "/tmp/x"), ("vm.swappiness", "10 20"), ("vm.swappiness", -1)):
+        with pytest.raises(HelperError): ops.op_write_sysctl(key, value)
+    with pytest.raises(HelperError): ops.op_apply_sysctl({"vm.swappiness": 30, "kernel.core_pattern": "x"})
+    assert (tree.root / "proc/sys/vm/swappiness").read_text().strip() == "10"
+    assert (tree.root / "proc/sys/kernel/core_pattern").read_text() == "core\n"
+
+
+def test_governor_allowlist(ops, tree):
+    for cpu in (0, 1): tree(f"sys/devices/system/cpu/cpu{cpu}/cpufreq/scaling_governor", "powersave\n")
+    assert ops.op_set_governor("performance") == 2
+    assert (tree.root / "sys/devices/system/cpu/cpu1/cpufreq/scaling_governor").read_text() == "performance"
+    for governor in ("turbo", "performance\n", None):
+        with pytest.raises(HelperError): ops.op_set_governor(governor)
+
+
+def test_interface_names(ops):
+    assert ops.op_wifi_power_save("wlp2s0", False) is False
+    assert ops.simulated_calls == [["iw", "dev", "wlp2s0", "set", "power_save", "off"]]
+    for iface in ("wlan0; reboot", "a" * 16, "", "wlan0/x", 0):
+        with pytest.raises(HelperError): ops.op_wifi_power_save(iface, True)
+    assert len(ops.simulated_calls) == 1
+
+
+def test_pids_must_belong_to_the_allowed_user(ops, tree):
+    tree("proc/4242/stat", "")
+    ops._check_pid(4242)
+    for pid, message in ((4243, "no such process"), (0, "invalid pid"), (True, "invalid pid"), ("4242", "invalid pid")):
+        with pytest.raises(HelperError, match=message): ops._check_pid(pid)
+    other = HelperOps(str(tree.root), allowed_uid=os.getuid() + 1)
+    with pytest.raises(HelperError, match="not owned"): other.op_renice(4242, -5)
+    assert other.execute_batch([{"op": "ionice", "pid": 4242, "ioclass": "idle"}])[0]["ok"] is False
+
+
+def test_package_repairs_are_fixed_commands(ops):
+    assert ops.execute_batch([{"op": "repair_packages", "step": "configure"}]) == [{"ok": True, "value": []}]
+    assert ops.simulated_calls == [["dpkg", "--configure", "-a"]]
+    for step in ("upgrade", "update; reboot", ["update"]):
+        assert ops.execute_batch([{"op": "repair_packages", "step": step}])[0]["ok"] is False
+
+
+def test_package_repair_progress_reaches_the_client(tree, monkeypatch):
+    import threading
+    import flashboost_helper
+    from flashboost_helper import HelperServer, PrivilegedHelper
+    monkeypatch.setitem(flashboost_helper.PACKAGE_REPAIRS, "update", ["sh", "-c", "echo pmstatus:apt:50:Unpacking; echo done"])
+    run_dir = tree.root / "run"; run_dir.mkdir(mode=0o700)
+    server = HelperServer(str(run_dir / "helper.sock"), os.getuid(), str(tree.root))
+    server.ops.simulate = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True); thread.start()
+    client = PrivilegedHelper(str(run_dir / "helper.sock"), launcher=())
+    progress = []
+    try: results = client.call([{"op": "repair_packages", "step": "update"}], on_progress=lambda *p: progress.append(p))
+    finally: client.close(); thread.join(5); server.server_close()
+    assert progress == [(50.0, "Unpacking")]
+    assert results == [{"ok": True, "value": ["done"]}]
@@ -0,0 +1,114 @@
+import errno
+import os
+import shutil
+
+import pytest
+
+from flashboost_irq import AffinityEngine, AffinityError, format_cpu_list, format_cpu_mask, parse_cpu_mask, plan_affinity
+
+INTERRUPTS = """           CPU0       CPU1
+  0:         10          0   IO-APIC   2-edge      timer
+ 30:        500        100   PCI-MSI 524288-edge      eth0-rx-0
+ 31:        400        300   PCI-MSI 524289-edge      eth0-tx-0
+ 40:          5          5   PCI-MSI 1-edge      nvme0q0
+NMI:          0          0   Non-maskable interrupts
+"""
+
+
+@pytest.fixture
+def system(tree):
+    tree("sys/devices/system/cpu/online", "0-7\n")
+    tree("proc/interrupts", INTERRUPTS)
+    for irq in (30, 31): tree(f"sys/class/net/eth0/device/msi_irqs/{irq}", "msix")
+    tree("sys/class/net/lo/queues/rx-0/rps_cpus", "0")
+    tree("sys/class/net/eth0/queues/rx-0/rps_cpus", "00\n")
+    for queue in ("tx-0", "tx-1"): tree(f"sys/class/net/eth0/queues/{queue}/xps_cpus", "00\n")
+    for irq in (30, 31): tree(f"proc/irq/{irq}/smp_affinity_list", "0-7\n")
+    return tree
+
+
+def test_cpu_list_and_mask_formats():
+    assert format_cpu_list([6, 0, 1, 2, 3, 3]) == "0-3,6"
+    assert parse_cpu_mask("00000000,0000000f") == [0, 1, 2, 3]
+    assert format_cpu_mask([0, 33]) == "00000002,00000001"
+    assert parse_cpu_mask(format_cpu_mask([1, 40])) == [1, 40]
+
+
+def test_plan_isolate(system):
+    plan = plan_affinity(str(system.root / "proc"), str(system.root / "sys"), "isolate", pid=1234)
+    assert plan.nics == {"eth0": [30, 31]}
+    assert plan.irq_cpus == [0, 1] and plan.app_cpus == [2, 3, 4, 5, 6, 7]
+    assert plan.irqs == {30: [0], 31: [1]}
+    assert plan.rps == {"eth0/rx-0": [0, 1]}
+    assert plan.xps == {"eth0/tx-0": [0, 2, 4, 6], "eth0/tx-1": [1, 3, 5, 7]}
+    assert plan.threads == {1234: [2, 3, 4, 5, 6, 7]}
+    with pytest.raises(AffinityError): plan_affinity(str(system.root / "proc"), str(system.root / "sys"), irq_cpus=[0, 9])
+
+
+def test_plan_spread_and_single_cpu(system):
+    plan = plan_affinity(str(system.root / "proc"), str(system.root / "sys"), "spread", pid=1234)
+    assert plan.irqs == {30: [0], 31: [1]}
+    assert plan.rps == {"eth0/rx-0": [1, 2, 3, 4, 5, 6, 7]}
+    assert plan.skipped["pid:1234"] == "spread"
+    system("sys/devices/system/cpu/online", "0\n")
+    assert plan_affinity(str(system.root / "proc"), str(system.root / "sys")).skipped == {"cpus": "single-cpu"}
+
+
+def engine_for(system):
+    return AffinityEngine(str(system.root / "proc"), str(system.root / "sys"), str(system.root / "state.json"))
+
+
+def test_apply_and_restore(system):
+    engine = engine_for(system)
+    result = engine.apply({"30": [0], "31": [1]}, {"eth0/rx-0": [0, 1]}, {"eth0/tx-0": [0, 2]}, snapshot="game-boost")
+    assert result["applied"]["irq:30"] == ("0-7", "0")
+    assert (system.root / "proc/irq/31/smp_affinity_list").read_text() == "1"
+    assert (system.root / "sys/class/net/eth0/queues/rx-0/rps_cpus").read_text() == "00000003"
+    engine.apply({"30": [1]}, snapshot="game-boost")
+    assert engine.snapshots()["game-boost"]["irq:30"] == "0-7"
+    shutil.rmtree(system.root / "sys/class/net/eth0/queues/tx-0")
+    restored = engine.restore("game-boost")
+    assert restored["gone"] == ["xps:eth0/tx-0"]
+    assert (system.root / "proc/irq/30/smp_affinity_list").read_text() == "0-7"
+    assert (system.root / "sys/class/net/eth0/queues/rx-0/rps_cpus").read_text() == "00000000"
+    assert engine.snapshots() == {}
+
+
+def test_failure_rolls_back_written_values(system, monkeypatch):
+    engine = engine_for(system)
+    write = engine.write
+    def failing(kind, key, cpus):
+        if kind == "rps": raise OSError(errno.EINVAL, "Invalid argument")
+        return write(kind, key, cpus)
+    monkeypatch.setattr(engine, "write", failing)
+    with pytest.raises(AffinityError, match="rps"): engine.apply({"30": [0], "31": [1]}, {"eth0/rx-0": [0]}, snapshot="game-boost")
+    assert (system.root / "proc/irq/30/smp_affinity_list").read_text() == "0-7"
+    assert (system.root / "proc/irq/31/smp_affinity_list").read_text() == "0-7"
+    assert engine.snapshots() == {}
+
+
+def test_managed_irqs_and_gone_threads_are_skipped(system, monkeypatch):
+    engine = engine_for(system)
+    write = engine.write
+    def managed(kind, key, cpus):
+        if kind == "irq" and key == "31": raise OSError(errno.EIO, "Input/output error")
+        return write(kind, key, cpus)
+    monkeypatch.setattr(engine, "write", managed)
+    result = engine.apply({"30": [0], "31": [1]}, threads={999999: [0]})
+    assert result["skipped"] == {"irq:31": "managed", "pid:999999": "gone"}
+    assert result["applied"] == {"irq:30": ("0-7", "0")}
+
+
+def test_thread_affinity_round_trip(system):
+    pid = os.getpid(); cpus = sorted(os.sched_getaffinity(0))
+    system(f"proc/{pid}/task/{pid}/stat", "")
+    engine = engine_for(system)
+    result = engine.apply(threads={pid: cpus[:1]}, snapshot="game-boost")
+    assert f"task:{pid}/{pid}" in result["applied"]
+    engine.restore("game-boost")
+    assert sorted(os.sched_getaffinity(0)) == cpus
+
+
+@pytest.mark.parametrize("kind, key", [("irq", "../1"), ("rps", "eth0/tx-0"), ("xps", "../../x/tx-0"), ("rps", "eth0/rx-0/../..")])
+def test_paths_are_restricted(system, kind, key):
+    with pytest.raises(AffinityError): engine_for(system).path(kind, key)
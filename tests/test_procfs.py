@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+from flashboost_procfs import ProcReader, ThermalSensors
+
+MEMINFO = "MemTotal:       16000000 kB\nMemFree:         2000000 kB\nMemAvailable:    4000000 kB\nSwapTotal:       2000000 kB\nSwapFree:        1500000 kB\n"
+
+
+def stat(*cpus):
+    # cpus[0] هو السطر الكلي "cpu"
+    lines = [f"cpu{'' if i == 0 else i - 1}  " + " ".join(map(str, values)) for i, values in enumerate(cpus)]
+    return "\n".join(lines + ["intr 12345 0 0", "ctxt 999", "btime 1700000000"]) + "\n"
+
+
+def test_cpu_and_ram_percent(tree):
+    tree("proc/stat", stat([100, 0, 100, 700, 100, 0, 0, 0, 50, 0]))
+    tree("proc/meminfo", MEMINFO)
+    reader = ProcReader(str(tree.root / "proc"), str(tree.root / "sys"))
+    try:
+        assert reader.cpu_times() == (1000, 800)
+        assert reader.cpu_percent() == 0.0 # أول قراءة
+        # 200 وحدة جديدة، 50 منها خاملة (idle + iowait)
+        tree("proc/stat", stat([250, 0, 100, 740, 110, 0, 0, 0, 50, 0]))
+        assert reader.cpu_percent() == 75.0
+        assert reader.cpu_percent() == 0.0 # دون تغيير
+        assert reader.ram_percent() == 75.0
+        assert 0.0 <= reader.disk_percent(str(tree.root)) <= 100.0
+    finally: reader.close()
+
+
+def test_meminfo_without_available_field(tree):
+    tree("proc/meminfo", "MemTotal: 1000 kB\nMemFree: 10 kB\n")
+    reader = ProcReader(str(tree.root / "proc"))
+    with pytest.raises(KeyError): reader.ram_percent()
+    reader.close()
+
+
+def hwmon(tree, dev, chip, *sensors):
+    tree(f"sys/class/hwmon/{dev}/name", chip + "\n")
+    for index, (label, millidegrees) in enumerate(sensors, 1):
+        tree(f"sys/class/hwmon/{dev}/temp{index}_input", f"{millidegrees}\n")
+        if label: tree(f"sys/class/hwmon/{dev}/temp{index}_label", label + "\n")
+
+
+def test_hwmon_discovery_prefers_the_cpu_package(tree):
+    hwmon(tree, "hwmon0", "acpitz", (None, 40000))
+    hwmon(tree, "hwmon1", "nvme", ("Composite", 35000))
+    hwmon(tree, "hwmon2", "coretemp", ("Core 0", 51000), ("Core 1", 53000), ("Package id 0", 55000))
+    sensors = ThermalSensors(str(tree.root / "sys"))
+    try:
+        assert sensors.read_primary() == 55.0
+        assert sensors.read_cores() == [("Core 0", 51.0), ("Core 1", 53.0)]
+        assert ("nvme", "Composite", 35.0) in sensors.read_all()
+        tree("sys/class/hwmon/hwmon2/temp3_input", "60000\n")
+        assert sensors.read_primary() == 60.0 # الملف نفسه يُعاد قراءته
+    finally: sensors.close()
+
+
+def test_hwmon_rescans_when_devices_change(tree):
+    hwmon(tree, "hwmon0", "acpitz", (None, 40000))
+    sensors = ThermalSensors(str(tree.root / "sys"), rescan_interval=0.0)
+    try:
+        assert sensors.read_primary() == 40.0
+        hwmon(tree, "hwmon1", "k10temp", ("Tctl", 70000), ("Tdie", 65000), ("Tccd1", 60000))
+        assert sensors.read_primary() == 65.0
+        assert sensors.read_cores() == [("Tccd1", 60.0)]
+        for name in os.listdir(tree.root / "sys/class/hwmon/hwmon1"): os.unlink(tree.root / "sys/class/hwmon/hwmon1" / name)
+        os.rmdir(tree.root / "sys/class/hwmon/hwmon1")
+        assert sensors.read_primary() == 40.0
+    finally: sensors.close()
+
+
+def test_no_hwmon(tree):
+    assert ThermalSensors(str(tree.root / "sys")).read_primary() is None
+
+
+DISKSTATS = """   7       0 loop0 10 0 800 0 0 0 0 0 0 0 0
+ 259       0 nvme0n1 100 0 {read} 0 50 0 {written} 0 0 0 0
+ 259       1 nvme0n1p1 90 0 {read} 0 40 0 {written} 0 0 0 0
+   8       0 sda 10 0 500 0 5 0 100 0 0 0 0
+"""
+NET_DEV = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo: 5000 10 0 0 0 0 0 0 5000 10 0 0 0 0 0 0
+  eth0: {rx} 100 0 0 0 0 0 0 {tx} 80 0 0 0 0 0 0
+"""
+
+
+def test_history_disk_and_network_rates(tree):
+    from flashboost_core import SystemInfo
+    from flashboost_history import HistoryRecorder
+    tree("proc/stat", stat([1] * 10, [1] * 10, [1] * 10))
+    tree("proc/diskstats", DISKSTATS.format(read=1000, written=2000))
+    tree("proc/net/dev", NET_DEV.format(rx=10000, tx=20000))
+    for disk in ("loop0", "nvme0n1", "sda"): os.makedirs(tree.root / "sys/block" / disk)
+    info = SystemInfo(backend="procfs", proc_root=str(tree.root / "proc"), sys_root=str(tree.root / "sys"))
+    history = HistoryRecorder(info, capacity=4)
+    try:
+        assert history.cores == 2
+        assert all(v != v for v in history._disk(1.0)) # أول قراءة: NaN
+        history._net(1.0)
+        tree("proc/diskstats", DISKSTATS.format(read=3000, written=2500))
+        tree("proc/net/dev", NET_DEV.format(rx=15000, tx=20400))
+        # القرص الكامل فقط (لا loop ولا الأقسام): sda ثابت، nvme0n1 زاد 2000/500 قطاع في ثانيتين
+        assert list(history._disk(3.0)) == [2000 * 512 / 2, 500 * 512 / 2]
+        assert list(history._net(3.0)) == [2500.0, 200.0]
+    finally: history.stop(); info.close()
@@ -0,0 +1,27 @@
+import os
+
+from flashboost_core import FlashBoostCore, SystemInfo
+
+PRESSURE = "some avg10=1.00 avg60=0.50 avg300=0.10 total=1000\nfull avg10=0.00 avg60=0.00 avg300=0.00 total=10\n"
+
+
+def test_autotune_stops_cleanly_when_pressure_disappears(tree):
+    tree("proc/pressure/memory", PRESSURE)
+    tree("proc/pressure/io", PRESSURE)
+    tree("proc/vmstat", "pswpin 0\npswpout 0\n")
+    tree("proc/sys/vm/swappiness", "60\n")
+    tree("proc/sys/vm/vfs_cache_pressure", "100\n")
+    logs = []
+    core = FlashBoostCore(log=logs.append, system_info=SystemInfo(backend="procfs", proc_root=str(tree.root / "proc"), sys_root=str(tree.root / "sys")))
+    try:
+        thread = core.start_autotune(interval=0.01, dry_run=True)
+        assert thread is not None and core.start_autotune() is thread
+        os.unlink(tree.root / "proc/pressure/memory")
+        thread.join(5)
+        assert not thread.is_alive()
+        assert core._autotune is None
+        assert any("PSI" in msg and "proc/pressure/memory" in msg for msg in logs[1:])
+        # يمكن تشغيله من جديد بعد عودة الملف
+        tree("proc/pressure/memory", PRESSURE)
+        assert core.start_autotune(interval=0.01, dry_run=True) is not thread
+    finally: core.close()
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from flashboost_sysctl import SysctlEngine, SysctlError
+
+
+@pytest.fixture
+def engine(tree):
+    tree("proc/sys/vm/swappiness", "60\n")
+    tree("proc/sys/vm/vfs_cache_pressure", "100\n")
+    tree("proc/sys/net/ipv4/tcp_low_latency", "0\n")
+    return SysctlEngine(str(tree.root / "proc"), str(tree.root / "state.json"), kernel=(4, 9))
+
+
+def read(tree, key):
+    return (tree.root / "proc" / "sys" / key.replace(".", "/")).read_text()
+
+
+def test_apply_writes_and_snapshots_first_original(engine, tree):
+    result = engine.apply({"vm.swappiness": 10, "vm.dirty_ratio": 5}, snapshot="startup")
+    assert result["applied"] == {"vm.swappiness": ("60", "10")}
+    assert result["skipped"] == {"vm.dirty_ratio": "missing"}
+    engine.apply({"vm.swappiness": 20}, snapshot="startup")
+    assert read(tree, "vm.swappiness") == "20"
+    assert engine.snapshots() == {"startup": {"vm.swappiness": "60"}}
+
+
+def test_restore_returns_originals_and_drops_snapshot(engine, tree):
+    engine.apply({"vm.swappiness": 10, "vm.vfs_cache_pressure": 50}, snapshot="boost")
+    engine.restore("boost")
+    assert read(tree, "vm.swappiness") == "60" and read(tree, "vm.vfs_cache_pressure") == "100"
+    assert engine.snapshots() == {}
+    with pytest.raises(SysctlError): engine.restore("boost")
+
+
+def test_failed_write_rolls_back_earlier_keys(engine, tree, monkeypatch):
+    write = engine.write
+    def failing(key, value):
+        if key == "net.ipv4.tcp_low_latency": raise OSError("read-only")
+        return write(key, value)
+    monkeypatch.setattr(engine, "write", failing)
+    with pytest.raises(SysctlError, match="tcp_low_latency"):
+        engine.apply({"vm.swappiness": 10, "vm.vfs_cache_pressure": 50, "net.ipv4.tcp_low_latency": 1}, snapshot="boost")
+    assert read(tree, "vm.swappiness") == "60" and read(tree, "vm.vfs_cache_pressure") == "100"
+    assert engine.snapshots() == {}
+
+
+def test_kernel_mismatch_is_an_error(engine, monkeypatch):
+    monkeypatch.setattr(engine, "read", lambda key: "0")
+    with pytest.raises(SysctlError, match="kernel reports"): engine.write("vm.swappiness", 10)
+
+
+def test_noop_keys_are_skipped_on_newer_kernels(tree):
+    tree("proc/sys/net/ipv4/tcp_low_latency", "0")
+    engine = SysctlEngine(str(tree.root / "proc"), kernel=(5, 15))
+    assert engine.apply({"net.ipv4.tcp_low_latency": 1}) == {"applied": {}, "skipped": {"net.ipv4.tcp_low_latency": "noop"}}
+
+
+def test_allowlist_also_guards_restored_snapshots(tree):
+    tree("proc/sys/kernel/core_pattern", "core")
+    tree("proc/sys/vm/swappiness", "60")
+    tree("state.json", json.dumps({"evil": {"vm.swappiness": "1", "kernel.core_pattern": "|/tmp/x"}}))
+    engine = SysctlEngine(str(tree.root / "proc"), str(tree.root / "state.json"), allowed={"vm.swappiness"})
+    with pytest.raises(SysctlError, match="not allowed"): engine.restore("evil")
+    assert (tree.root / "proc/sys/kernel/core_pattern").read_text() == "core"
+    assert (tree.root / "proc/sys/vm/swappiness").read_text() == "60"
+
+
+@pytest.mark.parametrize("key", ["vm", "../etc.passwd", "vm./swappiness", "Vm.swappiness"])
+def test_invalid_keys_are_rejected(engine, key):
+    with pytest.raises(SysctlError): engine.path(key)
@@ -0,0 +1,69 @@
+import json
+import shutil
+import threading
+
+import pytest
+
+from flashboost_watch import AppWatcher, WatchError, load_profiles, process_names
+
+
+def proc(tree, pid, comm, *argv):
+    tree(f"proc/{pid}/comm", comm + "\n")
+    tree(f"proc/{pid}/cmdline", "".join(arg + "\0" for arg in argv))
+
+
+def profiles_file(tree, data):
+    return str(tree("profiles.json", json.dumps(data) if not isinstance(data, str) else data))
+
+
+def test_load_profiles(tree):
+    assert load_profiles(str(tree.root / "missing.json")) == []
+    [profile] = load_profiles(profiles_file(tree, {"game": {"match": ["Game.exe", "game"], "nice": -5, "sysctl": {"vm.swappiness": 10}}}))
+    assert profile.name == "game" and profile.match == {"game.exe", "game"} and profile.nice == -5 and profile.sysctl == {"vm.swappiness": 10}
+
+
+@pytest.mark.parametrize("data, message", [
+    ("{not json", "profiles.json"), ([], "expected an object"), ({"g": {"match": []}}, "non-empty list"),
+    ({"g": {"match": ["g"], "renice": 1}}, "unknown keys renice"), ({"g": {"match": ["g"], "nice": -30}}, "invalid nice"),
+    ({"g": {"match": ["g"], "sysctl": ["vm.swappiness"]}}, "must be an object"),
+    ({"g": {"match": ["g"], "sysctl": {"kernel.core_pattern": "|/tmp/x"}}}, "not allowed: kernel.core_pattern"),
+])
+def test_load_profiles_rejects_invalid_files(tree, data, message):
+    with pytest.raises(WatchError, match=message): load_profiles(profiles_file(tree, data))
+
+
+def test_process_names(tree):
+    proc(tree, 10, "game-launcher-b", "/opt/games/game-launcher-binary", "--fullscreen")
+    proc(tree, 11, "Game.exe", "C:\\Program Files\\Game\\Game.exe")
+    proc(tree, 12, "kworker/0:1")
+    root = str(tree.root / "proc")
+    assert process_names(root, 10) == {"game-launcher-b", "game-launcher-binary"}
+    assert process_names(root, 11) == {"game.exe"}
+    assert process_names(root, 12) is None
+    assert process_names(root, 13) is None
+
+
+def test_watcher_starts_on_first_match_and_stops_after_last_exit(tree):
+    tree("proc/loadavg", "0.00 0.00 0.00 1/100 1\n")
+    proc(tree, 1, "systemd", "/sbin/init")
+    [profile] = load_profiles(profiles_file(tree, {"game": {"match": ["game"]}}))
+    events = []; started = threading.Event(); stop = threading.Event()
+    def on_start(p, pid): events.append(("start", pid)); started.set()
+    def on_stop(p): events.append(("stop",)); stop.set()
+    watcher = AppWatcher([profile], on_start, on_stop, lambda p, pid: events.append(("match", pid)), str(tree.root / "proc"), "poll", 0.01)
+    thread = threading.Thread(target=watcher.run, args=(stop, 0.01), daemon=True); thread.start()
+    try:
+        # أول عملية مطابقة (آخر PID في loadavg تغير)، ثم ثانية، ثم خروجهما بالترتيب
+        proc(tree, 100, "game", "/usr/bin/game"); proc(tree, 101, "game", "/usr/bin/game")
+        tree("proc/loadavg", "0.00 0.00 0.00 1/100 101\n")
+        assert started.wait(5)
+        shutil.rmtree(tree.root / "proc/100")
+        thread.join(0.3)
+        assert not stop.is_set()
+        shutil.rmtree(tree.root / "proc/101")
+        assert stop.wait(5)
+    finally:
+        stop.set(); thread.join(5); watcher.close()
+    assert events[0] == ("start", 100) and events[-1] == ("stop",)
+    assert sorted(e for e in events if e[0] == "match") == [("match", 100), ("match", 101)]
+    assert watcher.active == {}